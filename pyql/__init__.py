@@ -8,10 +8,12 @@ __author__ = "Jhene Ekuwem"
 from .parser import CSVParser
 from .dataframe import DataFrame
 from .filters import BooleanMask, compare
+from .query import sql
 
 __all__ = [
     'CSVParser',
     'DataFrame',
     'BooleanMask',
-    'compare'
+    'compare',
+    'sql'
 ]
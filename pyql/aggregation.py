@@ -2,6 +2,23 @@
 Aggregation and GroupBy Operations
 """
 
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, compress, islice
+from operator import le
+
+# aggregation functions understood by GroupBy.agg
+AGG_FUNCTIONS = ('sum', 'mean', 'avg', 'max', 'min', 'count', 'size', 'std', 'var', 'first', 'last', 'nunique')
+AGG_ALIASES = {'avg': 'mean'}
+
+# groupby engines, see GroupBy._choose_engine for what 'auto' picks
+GROUPBY_ENGINES = ('auto', 'hash', 'sort')
+SORT_ENGINE_MIN_GROUP_ROWS = 16 # average rows per group needed before 'auto' sorts
+PARALLEL_MIN_ROWS = 100000 # smaller inputs are not worth shipping to workers
+
 
 class AggregationMixin:
     """Mixin for aggregation operations"""
@@ -10,128 +27,356 @@ class AggregationMixin:
         """Sum of column values"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
-        return sum(self.data[column])
+        return sum(self.data[column].valid_values())
     
     def mean(self, column):
         """Mean of column values"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
-        values = self.data[column]
+        values = self.data[column].valid_values()
         return sum(values) / len(values) if values else 0
     
     def max(self, column):
         """Maximum of column values"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
-        return max(self.data[column])
+        return max(self.data[column].valid_values())
     
     def min(self, column):
         """Minimum of column values"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
-        return min(self.data[column])
+        return min(self.data[column].valid_values())
     
     def count(self, column):
         """Count of non-null values"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
-        return len(self.data[column])
+        return len(self.data[column].valid_values())
     
-    def groupby(self, by_column):
+    def groupby(self, by_column, engine='auto', workers=None):
         """
         Group DataFrame by column
         
         Args:
-            by_column: column name to group by
+            by_column: column name to group by, or a list of column names
+                       to group by their combination, e.g. ['year', 'gender']
+                       (an empty list aggregates the whole DataFrame as one group)
+            engine: 'hash' (stream rows into per-group accumulators), 'sort'
+                    (sort rows into contiguous group ranges) or 'auto'
+            workers: number of processes to spread a sort-engine aggregation
+                     over (None = run in this process)
         
         Returns:
             GroupBy object
         """
-        if by_column not in self.columns:
-            raise KeyError(f"Column '{by_column}' not found")
+        for col in _as_list(by_column):
+            if col not in self.columns:
+                raise KeyError(f"Column '{col}' not found")
         
-        return GroupBy(self, by_column)
+        return GroupBy(self, by_column, engine=engine, workers=workers)
 
 
 class GroupBy:
     """GroupBy object for aggregation operations"""
     
-    def __init__(self, df, by_column):
+    def __init__(self, df, by_column, engine='auto', workers=None):
         """
         Initialize GroupBy
         
         Args:
             df: DataFrame to group
-            by_column: column to group by
+            by_column: column to group by, or list of columns
+            engine: 'auto', 'hash' or 'sort'
+            workers: process count for the sort engine (None = serial)
         """
+        if engine not in GROUPBY_ENGINES:
+            raise ValueError(f"Unknown groupby engine: {engine}")
+        
         self.df = df
         self.by_column = by_column
-        self._groups = self._create_groups()
+        self.by_columns = _as_list(by_column)
+        self.workers = workers
+        self._keys, self._group_ids = self._create_groups()
+        self._group_index = None
+        self.engine = engine if engine != 'auto' else self._choose_engine()
+    
+    def _choose_engine(self):
+        """
+        Pick the engine from the estimated group sizes
+        
+        The sort engine aggregates each group's range with builtins, which
+        only pays off when groups are large (low cardinality) and the rows
+        are already laid out by key, since sorting them in Python costs more
+        than streaming them through the hash engine. Nearly unique keys stay
+        on the hash engine. Asking for workers always uses the sort engine,
+        the one whose group ranges can be split across processes.
+        """
+        if self.workers and self.workers > 1:
+            return 'sort'
+        rows = len(self._group_ids)
+        if rows >= SORT_ENGINE_MIN_GROUP_ROWS * len(self._keys) and _is_grouped(self._group_ids):
+            return 'sort'
+        return 'hash'
     
     def _create_groups(self):
-        """Create dictionary of groups"""
-        groups = {}
-        by_values = self.df.data[self.by_column]
+        """
+        Factorize the group columns
         
-        for i, value in enumerate(by_values):
-            if value not in groups:
-                groups[value] = []
-            groups[value].append(i)
+        With several group columns, each one is factorized on its own and
+        the per-row codes are combined arithmetically (mixed radix) into a
+        single integer key, so composite keys are never hashed as tuples.
         
-        return groups
+        Returns:
+            tuple: (keys, group_ids) where keys lists the distinct values
+            (tuples when grouping by several columns) in order of first
+            appearance and group_ids holds, for every row, the position of
+            its key in keys
+        """
+        if not self.by_columns: # one group holding every row
+            return [()], array('q', bytes(8 * len(self.df)))
+        if len(self.by_columns) == 1:
+            return _factorize_column(self.df.data[self.by_columns[0]])
+        
+        column_keys = []
+        combined = None
+        for col in self.by_columns:
+            keys, ids = _factorize_column(self.df.data[col])
+            column_keys.append(keys)
+            if combined is None:
+                combined = ids
+            else:
+                radix = len(keys)
+                combined = [code * radix + i for code, i in zip(combined, ids)]
+        
+        codes, group_ids = _factorize(combined)
+        
+        # decode each composite code back into its per-column keys
+        keys = []
+        for code in codes:
+            parts = []
+            for col_keys in reversed(column_keys):
+                code, i = divmod(code, len(col_keys))
+                parts.append(col_keys[i])
+            keys.append(tuple(reversed(parts)))
+        return keys, group_ids
+    
+    @property
+    def _groups(self):
+        """Dictionary mapping each group key to its row positions"""
+        if self._group_index is None:
+            rows = [[] for _ in self._keys]
+            for i, group in enumerate(self._group_ids):
+                rows[group].append(i)
+            self._group_index = dict(zip(self._keys, rows))
+        return self._group_index
     
     def agg(self, agg_dict):
         """
         Perform aggregation
         
+        Every column is streamed once, updating the accumulators of all the
+        functions requested for it at the same time.
+        
         Args:
-            agg_dict: dict mapping column names to aggregation functions
-                     e.g., {'GNP': 'max', 'Population': 'sum'}
+            agg_dict: dict mapping column names to an aggregation function or
+                     a list of them, e.g. {'GNP': 'max', 'Population': 'sum'}
+                     or {'points': ['sum', 'mean', 'max']}. Supported: sum,
+                     mean (avg), max, min, count, size (rows in the group,
+                     nulls included), std, var, first, last, nunique.
+                     A single function keeps the column name,
+                     a list names the outputs '<column>_<function>'.
+                     Nulls are skipped; a group with no values gets
+                     None from every function but count, size and nunique.
         
         Returns:
             DataFrame with aggregated results
         """
-        result_data = {self.by_column: []}
-        
-        # Initialize result columns
-        for col in agg_dict.keys():
-            result_data[col] = []
+        if len(self.by_columns) == 1:
+            result_data = {self.by_columns[0]: list(self._keys)}
+        else:
+            result_data = {col: [key[i] for key in self._keys] for i, col in enumerate(self.by_columns)}
         
-        # Perform aggregation for each group
-        for group_value, indices in self._groups.items():
-            result_data[self.by_column].append(group_value)
+        requests = []
+        for col, func_names in agg_dict.items():
+            if col not in self.df.columns:
+                raise KeyError(f"Column '{col}' not found")
             
-            for col, func_name in agg_dict.items():
-                if col not in self.df.columns:
-                    raise KeyError(f"Column '{col}' not found")
-                
-                # Get values for this group
-                values = [self.df.data[col][i] for i in indices]
-                
-                # Apply aggregation function
-                if func_name == 'sum':
-                    result = sum(values)
-                elif func_name == 'mean' or func_name == 'avg':
-                    result = sum(values) / len(values)
-                elif func_name == 'max':
-                    result = max(values)
-                elif func_name == 'min':
-                    result = min(values)
-                elif func_name == 'count':
-                    result = len(values)
-                else:
+            funcs = [func_names] if isinstance(func_names, str) else list(func_names)
+            for func_name in funcs:
+                if func_name not in AGG_FUNCTIONS:
                     raise ValueError(f"Unknown aggregation function: {func_name}")
-                
-                result_data[col].append(result)
+            requests.append((col, {AGG_ALIASES.get(f, f) for f in funcs}))
+        
+        if self.engine == 'sort':
+            all_stats = self._sorted_aggregate(requests)
+        else:
+            all_stats = [self._accumulate(col, funcs) for col, funcs in requests]
+        
+        if any('size' in funcs for _, funcs in requests):
+            sizes = Counter(self._group_ids)
+            for stats, (_, funcs) in zip(all_stats, requests):
+                if 'size' in funcs:
+                    stats['size'] = [sizes[group] for group in range(len(self._keys))]
+        
+        for stats, (col, func_names) in zip(all_stats, agg_dict.items()):
+            funcs = [func_names] if isinstance(func_names, str) else list(func_names)
+            for func_name in funcs:
+                name = col if isinstance(func_names, str) else f"{col}_{func_name}"
+                result_data[name] = stats[AGG_ALIASES.get(func_name, func_name)]
         
         from .dataframe import DataFrame
         return DataFrame(data=result_data)
     
+    def _accumulate(self, column, funcs):
+        """
+        Compute the requested aggregates of one column in a single pass
+        
+        Args:
+            column: column name
+            funcs: set of canonical function names
+        
+        Returns:
+            dict mapping function name to a list with one result per group
+        """
+        n_groups = len(self._keys)
+        col = self.df.data[column]
+        values = col.values
+        
+        # pairs of (group, value) for the non-null values only
+        pairs = zip(self._group_ids, values)
+        if col.validity is not None:
+            pairs = compress(pairs, col.validity)
+        elif col.dtype in ('object', 'category') and None in values:
+            pairs = (pair for pair in pairs if pair[1] is not None)
+        
+        want_sum = 'sum' in funcs or 'mean' in funcs
+        want_min = 'min' in funcs
+        want_max = 'max' in funcs
+        want_first = 'first' in funcs
+        want_last = 'last' in funcs
+        want_var = 'var' in funcs or 'std' in funcs
+        want_unique = 'nunique' in funcs
+        
+        # accumulators are only allocated for the functions asked for
+        counts = [0] * n_groups
+        sums = [0] * n_groups if want_sum else None
+        mins = [None] * n_groups if want_min else None
+        maxs = [None] * n_groups if want_max else None
+        firsts = [None] * n_groups if want_first else None
+        lasts = [None] * n_groups if want_last else None
+        means = [0.0] * n_groups if want_var else None
+        m2s = [0.0] * n_groups if want_var else None
+        uniques = [set() for _ in range(n_groups)] if want_unique else None
+        
+        for group, value in pairs:
+            count = counts[group] + 1
+            counts[group] = count
+            if want_sum:
+                sums[group] += value
+            if want_min and (count == 1 or value < mins[group]):
+                mins[group] = value
+            if want_max and (count == 1 or value > maxs[group]):
+                maxs[group] = value
+            if want_first and count == 1:
+                firsts[group] = value
+            if want_last:
+                lasts[group] = value
+            if want_var:
+                # Welford's online update of mean and squared deviations
+                delta = value - means[group]
+                means[group] += delta / count
+                m2s[group] += delta * (value - means[group])
+            if want_unique:
+                uniques[group].add(value)
+        
+        stats = {'count': counts, 'min': mins, 'max': maxs, 'first': firsts, 'last': lasts}
+        if 'sum' in funcs:
+            # like SQL, the sum of a group with no values is null, not 0
+            stats['sum'] = [s if c else None for s, c in zip(sums, counts)]
+        if 'mean' in funcs:
+            stats['mean'] = [s / c if c else None for s, c in zip(sums, counts)]
+        if want_var:
+            variances = [m2 / (c - 1) if c > 1 else None for m2, c in zip(m2s, counts)]
+            stats['var'] = variances
+            stats['std'] = [math.sqrt(v) if v is not None else None for v in variances]
+        if want_unique:
+            stats['nunique'] = [len(u) for u in uniques]
+        return stats
+    
+    def _sorted_aggregate(self, requests):
+        """
+        Sort engine: aggregate contiguous group ranges
+        
+        Rows are stably sorted by group number, so each group occupies one
+        range [offsets[g], offsets[g + 1]) of the sorted order; every column
+        is gathered in that order once and each range is aggregated with
+        builtins. Groups are independent, so the ranges can be split into
+        partitions and handed to worker processes.
+        
+        Args:
+            requests: list of (column, set of function names)
+        
+        Returns:
+            list of stats dicts, one per request
+        """
+        group_ids = self._group_ids
+        n_groups = len(self._keys)
+        sizes = Counter(group_ids)
+        offsets = list(accumulate((sizes[g] for g in range(n_groups)), initial=0))
+        
+        # rows already grouped together (e.g. input sorted by key) need no sort
+        order = None
+        if not _is_grouped(group_ids):
+            order = sorted(range(len(group_ids)), key=group_ids.__getitem__)
+        
+        columns = []
+        for col, funcs in requests:
+            column = self.df.data[col]
+            if order is not None:
+                column = column.take(order)
+            has_nulls = column.null_count > 0
+            values = list(column) if has_nulls else column.values
+            columns.append((values, has_nulls, funcs))
+        
+        workers = self.workers or 1
+        if workers < 2 or len(group_ids) < PARALLEL_MIN_ROWS or n_groups < 2:
+            return _aggregate_ranges(columns, offsets)
+        
+        # split the groups into partitions holding roughly equal row counts
+        bounds = [0]
+        for part in range(1, workers):
+            bound = bisect_left(offsets, len(group_ids) * part // workers)
+            bounds.append(min(max(bound, bounds[-1]), n_groups))
+        bounds.append(n_groups)
+        
+        tasks = []
+        for first, last in zip(bounds, bounds[1:]):
+            if first == last:
+                continue
+            start, stop = offsets[first], offsets[last]
+            local_offsets = [offset - start for offset in offsets[first:last + 1]]
+            tasks.append(([(_picklable(values[start:stop]), has_nulls, funcs)
+                           for values, has_nulls, funcs in columns], local_offsets))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_aggregate_ranges, *zip(*tasks)))
+        
+        # stitch the partitions back together in group order
+        merged = []
+        for i in range(len(columns)):
+            stats = {}
+            for part in parts:
+                for name, results in part[i].items():
+                    stats.setdefault(name, []).extend(results)
+            merged.append(stats)
+        return merged
+    
     def sum(self):
         """Sum all numeric columns"""
         agg_dict = {}
         for col in self.df.columns:
-            if col != self.by_column:
+            if col not in self.by_columns:
                 agg_dict[col] = 'sum'
         return self.agg(agg_dict)
     
@@ -139,7 +384,7 @@ class GroupBy:
         """Mean of all numeric columns"""
         agg_dict = {}
         for col in self.df.columns:
-            if col != self.by_column:
+            if col not in self.by_columns:
                 agg_dict[col] = 'mean'
         return self.agg(agg_dict)
     
@@ -147,6 +392,114 @@ class GroupBy:
         """Max of all numeric columns"""
         agg_dict = {}
         for col in self.df.columns:
-            if col != self.by_column:
+            if col not in self.by_columns:
                 agg_dict[col] = 'max'
         return self.agg(agg_dict)
+
+
+def _factorize(values):
+    """
+    Assign every distinct value a group number in order of first appearance
+    
+    Returns:
+        tuple: (distinct values, array of group numbers per row)
+    """
+    groups = {}
+    group_ids = array('q', [groups.setdefault(value, len(groups)) for value in values])
+    return list(groups), group_ids
+
+
+def _picklable(values):
+    """Values that can be sent to a worker process (memoryviews of a mapped file are copied)"""
+    if isinstance(values, memoryview):
+        copy = array(values.format)
+        copy.frombytes(values.cast('B'))
+        return copy
+    return values
+
+
+def _aggregate_ranges(columns, offsets):
+    """
+    Aggregate columns laid out in group order
+    
+    Module level so that worker processes can run it.
+    
+    Args:
+        columns: list of (values in group order, has_nulls, set of functions)
+        offsets: group g spans values[offsets[g]:offsets[g + 1]]
+    
+    Returns:
+        list of stats dicts (function name -> list of results per group)
+    """
+    results = []
+    for values, has_nulls, funcs in columns:
+        stats = {func: [] for func in funcs}
+        for start, stop in zip(offsets, offsets[1:]):
+            group = values[start:stop]
+            if has_nulls:
+                group = [value for value in group if value is not None]
+            
+            count = len(group)
+            total = sum(group) if 'sum' in funcs or 'mean' in funcs or 'var' in funcs or 'std' in funcs else 0
+            if 'count' in funcs:
+                stats['count'].append(count)
+            if 'sum' in funcs:
+                stats['sum'].append(total if count else None)
+            if 'mean' in funcs:
+                stats['mean'].append(total / count if count else None)
+            if 'min' in funcs:
+                stats['min'].append(min(group) if count else None)
+            if 'max' in funcs:
+                stats['max'].append(max(group) if count else None)
+            if 'first' in funcs:
+                stats['first'].append(group[0] if count else None)
+            if 'last' in funcs:
+                stats['last'].append(group[-1] if count else None)
+            if 'var' in funcs or 'std' in funcs:
+                variance = None
+                if count > 1:
+                    mean = total / count
+                    variance = sum((value - mean) ** 2 for value in group) / (count - 1)
+                if 'var' in funcs:
+                    stats['var'].append(variance)
+                if 'std' in funcs:
+                    stats['std'].append(math.sqrt(variance) if variance is not None else None)
+            if 'nunique' in funcs:
+                stats['nunique'].append(len(set(group)))
+        results.append(stats)
+    return results
+
+
+def _is_grouped(group_ids):
+    """True when every group's rows are already contiguous"""
+    # group numbers follow first appearance, so contiguous groups never decrease
+    return all(map(le, group_ids, islice(group_ids, 1, None)))
+
+
+def _factorize_column(column):
+    """Factorize a Column, working on the codes of categorical columns"""
+    if column.index is not None:
+        # a hash index (DataFrame.create_index) holds the factorization
+        return column.index.keys, column.index.ids
+    if column.dtype == 'category':
+        # factorize the small integer codes, decode each key once
+        codes, group_ids = _factorize(column.codes)
+        return [column.categories[code] if code != -1 else None for code in codes], group_ids
+    return _factorize(column)
+
+
+def _as_list(columns):
+    """Accept a single column name or a list of them"""
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def agg_columns(by_column, agg_dict):
+    """Output column names of GroupBy.agg for the given arguments"""
+    columns = _as_list(by_column)
+    for col, func_names in agg_dict.items():
+        if isinstance(func_names, str):
+            names = [col]
+        else:
+            names = [f"{col}_{func_name}" for func_name in func_names]
+        columns += [name for name in names if name not in columns]
+    return columns
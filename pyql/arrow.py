@@ -0,0 +1,295 @@
+"""
+Arrow and Parquet Interchange
+Converts between DataFrames and pyarrow Tables, Arrow IPC and Parquet files
+
+pyarrow is an optional dependency: it is imported on first use and only
+these conversions need it.
+"""
+
+from array import array
+from itertools import compress, repeat
+from operator import eq, ge, gt, le, lt
+
+from .columns import CategoricalColumn, Column, TYPECODES
+
+# byte -> its 8 bits as 0/1 bytes, least significant first (Arrow bitmap order)
+_BITS = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+
+# byte strings of 0/1 bytes -> ASCII '0'/'1' for packing into a bitmap
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def _pyarrow():
+    """Import pyarrow, explaining how to get it when it is missing"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow and Parquet support requires pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def read_arrow(source, columns=None):
+    """
+    Read Arrow data
+    
+    Args:
+        source: pyarrow Table or RecordBatch, or the path of an Arrow IPC
+                file or stream (memory-mapped while it is converted)
+        columns: optional list of column names to keep
+    
+    Returns:
+        tuple: (column names, dict mapping name to Column)
+    """
+    pa = _pyarrow()
+    if isinstance(source, (pa.Table, pa.RecordBatch)):
+        return table_to_columns(source, columns)
+    
+    with pa.memory_map(str(source)) as mapped:
+        try:
+            table = pa.ipc.open_file(mapped).read_all()
+        except pa.ArrowInvalid:
+            mapped.seek(0)
+            table = pa.ipc.open_stream(mapped).read_all()
+        return table_to_columns(table, columns)
+
+
+def write_arrow(df, path=None):
+    """
+    Convert a DataFrame to a pyarrow Table, optionally writing it out
+    
+    Args:
+        df: DataFrame
+        path: if given, also write the table there as an Arrow IPC file
+    
+    Returns:
+        pyarrow.Table
+    """
+    pa = _pyarrow()
+    table = pa.Table.from_arrays([to_arrow_array(df.data[col]) for col in df.columns], names=list(df.columns))
+    if path is not None:
+        with pa.ipc.new_file(str(path), table.schema) as writer:
+            writer.write_table(table)
+    return table
+
+
+def read_parquet(path, columns=None, filters=None, row_groups=None):
+    """
+    Read a Parquet file
+    
+    Row groups whose min/max statistics show they cannot match the
+    filters are skipped without being read; the remaining rows are then
+    filtered exactly.
+    
+    Args:
+        path: Parquet file path
+        columns: optional list of column names to keep
+        filters: optional list of (column, operator, value) predicates, all
+                 of which must hold (same operators as DataFrame.filter)
+        row_groups: optional list of row group numbers to consider
+    
+    Returns:
+        tuple: (column names, dict mapping name to Column, predicates
+        still to apply to the rows read)
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+    
+    parquet_file = pq.ParquetFile(str(path))
+    names = parquet_file.schema_arrow.names
+    filters = list(filters or [])
+    for col in list(columns or []) + [column for column, _, _ in filters]:
+        if col not in names:
+            raise KeyError(f"Column '{col}' not found")
+    
+    if row_groups is None:
+        row_groups = range(parquet_file.num_row_groups)
+    metadata = parquet_file.metadata
+    row_groups = [group for group in row_groups
+                  if _row_group_may_match(metadata.row_group(group), filters)]
+    
+    # the filter columns are read too, and dropped again by the caller
+    wanted = None
+    if columns is not None:
+        wanted = list(columns) + [col for col, _, _ in filters if col not in columns]
+    table = parquet_file.read_row_groups(row_groups, columns=wanted)
+    names, data = table_to_columns(table)
+    return names, data, filters
+
+
+def write_parquet(df, path, row_group_size=None):
+    """
+    Write a DataFrame to a Parquet file
+    
+    Args:
+        df: DataFrame
+        path: destination path
+        row_group_size: maximum rows per row group (pyarrow's default if None)
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+    
+    pq.write_table(write_arrow(df), str(path), row_group_size=row_group_size)
+
+
+def table_to_columns(table, columns=None):
+    """
+    Convert a pyarrow Table (or RecordBatch) into typed columns
+    
+    Returns:
+        tuple: (column names, dict mapping name to Column)
+    """
+    if hasattr(table, 'unify_dictionaries'):
+        # chunks of a dictionary column may carry different dictionaries
+        table = table.unify_dictionaries()
+    names = table.schema.names
+    if columns is not None:
+        for col in columns:
+            if col not in names:
+                raise KeyError(f"Column '{col}' not found")
+        names = list(columns)
+    
+    data = {}
+    for name in names:
+        values = table.column(name)
+        if hasattr(values, 'combine_chunks'): # Table columns are chunked
+            values = values.combine_chunks()
+        data[name] = from_arrow_array(values)
+    return list(names), data
+
+
+def from_arrow_array(values):
+    """
+    Convert a pyarrow Array into a Column
+    
+    Integer and floating point arrays are copied buffer to buffer into
+    typed storage (one memcpy, no per-value Python objects), dictionary
+    arrays become categorical columns and anything else goes through
+    Python values.
+    """
+    pa = _pyarrow()
+    arrow_type = values.type
+    
+    if pa.types.is_dictionary(arrow_type):
+        codes = _fixed_width(values.indices.cast(pa.int32()), 'i', fill=-1)
+        return CategoricalColumn(codes, values.dictionary.to_pylist())
+    
+    if pa.types.is_integer(arrow_type) and arrow_type != pa.uint64():
+        dtype, arrow_target = 'int', pa.int64()
+    elif pa.types.is_floating(arrow_type):
+        dtype, arrow_target = 'float', pa.float64()
+    else:
+        return Column.from_values(values.to_pylist())
+    
+    if arrow_type != arrow_target:
+        values = values.cast(arrow_target)
+    buffer = _fixed_width(values, TYPECODES[dtype])
+    validity = _validity(values) if values.null_count else None
+    return Column(buffer, dtype, validity)
+
+
+def to_arrow_array(column):
+    """
+    Convert a Column into a pyarrow Array
+    
+    Numeric values and category codes are not copied: the Arrow array
+    wraps the column's own buffer (an array.array, or a memoryview of a
+    mapped .pyql file), which stays valid because columns are immutable.
+    Only the validity bitmap is built anew.
+    """
+    pa = _pyarrow()
+    
+    if column.dtype == 'category':
+        codes = column.codes
+        bitmap = None
+        if -1 in codes: # null codes are masked out, their -1 slots are ignored
+            bitmap = pa.py_buffer(_pack_bits(bytearray(map((-1).__ne__, codes))))
+        indices = pa.Array.from_buffers(pa.int32(), len(codes), [bitmap, pa.py_buffer(codes)])
+        return pa.DictionaryArray.from_arrays(indices, pa.array(column.categories))
+    
+    if column.dtype in TYPECODES:
+        arrow_type = pa.int64() if column.dtype == 'int' else pa.float64()
+        bitmap = None
+        if column.validity is not None:
+            bitmap = pa.py_buffer(_pack_bits(column.validity))
+        return pa.Array.from_buffers(arrow_type, len(column), [bitmap, pa.py_buffer(column.values)])
+    
+    return pa.array(column.to_list())
+
+
+def _fixed_width(values, typecode, fill=0):
+    """Copy the data buffer of a fixed-width Arrow array into an array.array"""
+    result = array(typecode)
+    if not len(values):
+        return result
+    width = result.itemsize
+    start = values.offset * width
+    result.frombytes(memoryview(values.buffers()[1])[start:start + len(values) * width])
+    if fill and values.null_count:
+        # null slots hold arbitrary values in Arrow; give them the fill value
+        for row in compress(range(len(values)), map((0).__eq__, _validity(values))):
+            result[row] = fill
+    return result
+
+
+def _validity(values):
+    """Unpack the validity bitmap of an Arrow array into one 0/1 byte per row"""
+    bitmap = values.buffers()[0]
+    if bitmap is None:
+        return bytearray(repeat(1, len(values)))
+    expanded = b''.join(map(_BITS.__getitem__, memoryview(bitmap).tobytes()))
+    return bytearray(expanded[values.offset:values.offset + len(values)])
+
+
+def _pack_bits(validity):
+    """Pack one 0/1 byte per row into an Arrow bitmap (least significant bit first)"""
+    if not validity:
+        return b''
+    # read the bytes backwards as binary digits: bit i of the number is row i
+    number = int(bytes(validity[::-1]).translate(_TO_DIGITS), 2)
+    return number.to_bytes((len(validity) + 7) // 8, 'little')
+
+
+# what a row group's [min, max] range must satisfy for a predicate to match a row in it
+_RANGE_TESTS = {
+    '==': lambda low, high, value: le(low, value) and le(value, high),
+    '>': lambda low, high, value: gt(high, value),
+    '>=': lambda low, high, value: ge(high, value),
+    '<': lambda low, high, value: lt(low, value),
+    '<=': lambda low, high, value: le(low, value),
+    '!=': lambda low, high, value: not (eq(low, value) and eq(high, value)),
+    'in': lambda low, high, values: any(low <= value <= high for value in values),
+    'between': lambda low, high, bounds: ge(high, bounds[0]) and le(low, bounds[1]),
+}
+
+
+def _row_group_may_match(row_group, filters):
+    """
+    Check a row group's statistics against the filters
+    
+    Returns False only when the statistics prove no row can match; a
+    missing statistic or an unsupported operator keeps the row group.
+    """
+    if not filters:
+        return True
+    
+    stats = {}
+    for i in range(row_group.num_columns):
+        chunk = row_group.column(i)
+        stats[chunk.path_in_schema] = chunk.statistics
+    
+    for column, operator, value in filters:
+        chunk_stats = stats.get(column)
+        if chunk_stats is None:
+            continue
+        if operator == 'is_null':
+            if chunk_stats.has_null_count and chunk_stats.null_count == 0:
+                return False
+            continue
+        if operator not in _RANGE_TESTS or not chunk_stats.has_min_max:
+            continue
+        try:
+            if not _RANGE_TESTS[operator](chunk_stats.min, chunk_stats.max, value):
+                return False
+        except TypeError: # statistics of another type than the value
+            continue
+    return True
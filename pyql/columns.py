@@ -0,0 +1,500 @@
+"""
+Column Storage
+Typed, array-backed columns kept behind DataFrame.data
+"""
+
+from array import array
+from itertools import chain, compress
+
+# array.array typecodes for the numeric column types (8 bytes per value)
+TYPECODES = {'int': 'q', 'float': 'd'}
+
+
+class Column:
+    """
+    A single column of values
+    
+    Numeric columns keep their values in a contiguous array.array buffer
+    with an optional validity mask (a bytearray holding 1 for present and
+    0 for null values); columns read from a .pyql file hold read-only
+    memoryviews of the mapped file instead. Anything else is kept in a plain list where nulls
+    are stored as None. Columns are treated as immutable, which lets
+    dataframes share them freely, along with any index built on them
+    (see DataFrame.create_index).
+    """
+    
+    def __init__(self, values, dtype='object', validity=None):
+        """
+        Initialize column
+        
+        Args:
+            values: array.array (or memoryview) for numeric dtypes, list otherwise
+            dtype: 'int', 'float' or 'object'
+            validity: bytearray (or memoryview) null mask, or None when there are no nulls
+        """
+        self.values = values
+        self.dtype = dtype
+        self.validity = validity
+        self.index = None
+        self.sorted_index = None
+    
+    @classmethod
+    def from_values(cls, values):
+        """
+        Build a column from any sequence, picking the narrowest storage
+        
+        Args:
+            values: list (or other iterable) of python values
+        
+        Returns:
+            Column
+        """
+        if not isinstance(values, list):
+            values = list(values)
+        
+        types = set(map(type, values))
+        has_nulls = type(None) in types
+        types.discard(type(None))
+        
+        if types == {int}:
+            dtype = 'int'
+        elif types == {float}:
+            dtype = 'float'
+        else:
+            return cls(values)
+        
+        validity = None
+        if has_nulls:
+            validity = bytearray(value is not None for value in values)
+            fill = 0 if dtype == 'int' else 0.0
+            values = [fill if value is None else value for value in values]
+        
+        try:
+            buffer = array(TYPECODES[dtype], values)
+        except OverflowError: # ints that do not fit in 64 bits
+            if validity is not None:
+                values = [value if valid else None for value, valid in zip(values, validity)]
+            return cls(values)
+        return cls(buffer, dtype, validity)
+    
+    @classmethod
+    def concat(cls, columns):
+        """
+        Concatenate columns end to end
+        
+        Columns of the same numeric dtype are joined buffer to buffer;
+        int and float columns are promoted to float; anything else falls
+        back to an object column.
+        """
+        columns = list(columns)
+        if not columns:
+            return cls([])
+        if len(columns) == 1:
+            return columns[0]
+        
+        dtypes = {col.dtype for col in columns}
+        if dtypes == {'category'}:
+            return CategoricalColumn.concat(columns)
+        if dtypes <= {'int', 'float'}:
+            dtype = 'float' if 'float' in dtypes else 'int'
+            values = array(TYPECODES[dtype])
+            for col in columns:
+                values.extend(col.values if col.dtype == dtype else map(float, col.values))
+            
+            validity = None
+            if any(col.validity is not None for col in columns):
+                validity = bytearray()
+                for col in columns:
+                    validity += col.validity if col.validity is not None else b'\x01' * len(col)
+            return cls(values, dtype, validity)
+        
+        return cls.from_values(list(chain.from_iterable(columns)))
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def __iter__(self):
+        if self.validity is None:
+            return iter(self.values)
+        return (value if valid else None for value, valid in zip(self.values, self.validity))
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            validity = self.validity[key] if self.validity is not None else None
+            return Column(self.values[key], self.dtype, validity)
+        if self.validity is not None and not self.validity[key]:
+            return None
+        return self.values[key]
+    
+    def __eq__(self, other):
+        if isinstance(other, (Column, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        preview = list(self[:10])
+        more = ', ...' if len(self) > 10 else ''
+        return f"Column({self.dtype}, {preview!r}{more})"
+    
+    @property
+    def null_count(self):
+        """Number of null values"""
+        if self.validity is not None:
+            return _count(self.validity, 0)
+        if self.dtype == 'object':
+            return self.values.count(None)
+        return 0
+    
+    def valid_values(self):
+        """Return the non-null values (the raw buffer when there are no nulls)"""
+        if self.validity is not None:
+            return list(compress(self.values, self.validity))
+        if self.dtype == 'object' and None in self.values:
+            return [value for value in self.values if value is not None]
+        return self.values
+    
+    def to_list(self):
+        """Convert column to a plain list (nulls as None)"""
+        return list(self)
+    
+    def take(self, indices, nulls=False):
+        """
+        Gather values at the given row positions
+        
+        Args:
+            indices: iterable of row positions
+            nulls: if True, position -1 produces a null instead of the last row
+        
+        Returns:
+            new Column
+        """
+        indices = indices if isinstance(indices, (list, range, array)) else list(indices)
+        values = self.values
+        if nulls and self.dtype == 'object':
+            values = values + [None] # -1 now lands on the trailing null
+        elif nulls and not values:
+            values = array(TYPECODES[self.dtype], [0])
+        
+        taken = list(map(values.__getitem__, indices))
+        if self.dtype != 'object':
+            taken = array(TYPECODES[self.dtype], taken)
+        
+        validity = None
+        if self.validity is not None:
+            validity = bytearray(map(self.validity.__getitem__, indices))
+        if nulls and self.dtype != 'object':
+            missing = bytearray(map((0).__le__, indices))
+            if missing.count(0):
+                if validity is None:
+                    validity = missing
+                else:
+                    validity = bytearray(map(min, validity, missing))
+        return Column(taken, self.dtype, validity)
+    
+    def filter(self, mask):
+        """
+        Keep the values whose mask entry is true
+        
+        Args:
+            mask: sequence of booleans (or 0/1 bytes) with one entry per row
+        
+        Returns:
+            new Column
+        """
+        values = list(compress(self.values, mask))
+        if self.dtype != 'object':
+            values = array(TYPECODES[self.dtype], values)
+        
+        validity = None
+        if self.validity is not None:
+            validity = bytearray(compress(self.validity, mask))
+        return Column(values, self.dtype, validity)
+
+
+
+class CategoricalColumn(Column):
+    """
+    Dictionary-encoded column
+    
+    Stores one small integer code per row plus the list of distinct
+    values (the categories). Code -1 marks a null. Grouping, equality
+    filters and join hashing can work on the codes instead of hashing
+    the original values row by row.
+    """
+    
+    def __init__(self, codes, categories):
+        """
+        Initialize categorical column
+        
+        Args:
+            codes: array.array('i') (or memoryview) of positions into categories, -1 for null
+            categories: list of distinct values
+        """
+        self.codes = codes
+        self.categories = categories
+        self.dtype = 'category'
+        self.validity = None
+        self.index = None
+        self.sorted_index = None
+        self._lookup = None
+    
+    @classmethod
+    def from_values(cls, values):
+        """Dictionary-encode a sequence of values"""
+        lookup = {}
+        codes = array('i', [-1 if value is None else lookup.setdefault(value, len(lookup))
+                            for value in values])
+        column = cls(codes, list(lookup))
+        column._lookup = lookup
+        return column
+    
+    @classmethod
+    def concat(cls, columns):
+        """Concatenate categorical columns, merging their dictionaries"""
+        categories = list(columns[0].categories)
+        lookup = {value: code for code, value in enumerate(categories)}
+        codes = array('i', columns[0].codes)
+        
+        for col in columns[1:]:
+            if col.categories is columns[0].categories:
+                codes.extend(col.codes)
+                continue
+            remap = [lookup.setdefault(value, len(lookup)) for value in col.categories] + [-1]
+            codes.extend(map(remap.__getitem__, col.codes))
+        
+        column = cls(codes, list(lookup))
+        column._lookup = lookup
+        return column
+    
+    def _table(self):
+        """categories with a trailing None so that code -1 decodes to null"""
+        return self.categories + [None]
+    
+    @property
+    def values(self):
+        """Decoded values as a list"""
+        return list(map(self._table().__getitem__, self.codes))
+    
+    def code_of(self, value):
+        """Return the code for value, or None when it is not a category"""
+        if self._lookup is None:
+            self._lookup = {value: code for code, value in enumerate(self.categories)}
+        return self._lookup.get(value)
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __iter__(self):
+        return iter(self.values)
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CategoricalColumn(self.codes[key], self.categories)
+        code = self.codes[key]
+        return None if code == -1 else self.categories[code]
+    
+    @property
+    def null_count(self):
+        """Number of null values"""
+        return _count(self.codes, -1)
+    
+    def valid_values(self):
+        """Return the non-null values"""
+        values = self.values
+        if -1 in self.codes:
+            return [value for value in values if value is not None]
+        return values
+    
+    def take(self, indices, nulls=False):
+        """Gather codes at the given row positions (-1 gives a null when nulls is set)"""
+        indices = indices if isinstance(indices, (list, range, array)) else list(indices)
+        codes = self.codes
+        if nulls:
+            codes = array('i', codes)
+            codes.append(-1) # -1 now lands on a null code
+        return CategoricalColumn(array('i', map(codes.__getitem__, indices)), self.categories)
+    
+    def filter(self, mask):
+        """Keep the codes whose mask entry is true"""
+        return CategoricalColumn(array('i', compress(self.codes, mask)), self.categories)
+
+
+class LazyColumn(Column):
+    """
+    Column whose storage is produced on first use
+    
+    Subclasses implement _load() returning a real Column. Anything that
+    needs the buffers (values, validity, codes) or works on the whole
+    column loads it once and then delegates to the loaded column.
+    """
+    
+    def __init__(self, dtype):
+        """
+        Initialize lazy column
+        
+        Args:
+            dtype: dtype of the column that _load() will return
+        """
+        self.dtype = dtype
+        self.index = None
+        self.sorted_index = None
+        self._column = None
+    
+    def _load(self):
+        """Produce the real column"""
+        raise NotImplementedError
+    
+    def materialize(self):
+        """Return the real column (loaded once)"""
+        if self._column is None:
+            self._column = self._load()
+        return self._column
+    
+    @property
+    def values(self):
+        return self.materialize().values
+    
+    @property
+    def validity(self):
+        return self.materialize().validity
+    
+    @property
+    def codes(self):
+        return self.materialize().codes
+    
+    @property
+    def categories(self):
+        return self.materialize().categories
+    
+    def __getattr__(self, name):
+        # anything else a plain or categorical column offers (code_of, ...)
+        if name == '_column' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+    
+    def __len__(self):
+        return len(self.materialize())
+    
+    def __iter__(self):
+        return iter(self.materialize())
+    
+    def __getitem__(self, key):
+        return self.materialize()[key]
+    
+    @property
+    def null_count(self):
+        """Number of null values"""
+        return self.materialize().null_count
+    
+    def valid_values(self):
+        """Return the non-null values"""
+        return self.materialize().valid_values()
+    
+    def to_list(self):
+        """Convert column to a plain list (nulls as None)"""
+        return self.materialize().to_list()
+    
+    def take(self, indices, nulls=False):
+        """Gather values at the given row positions"""
+        return self.materialize().take(indices, nulls)
+    
+    def filter(self, mask):
+        """Keep the values whose mask entry is true"""
+        return self.materialize().filter(mask)
+
+
+class ColumnView(LazyColumn):
+    """
+    Rows of a base column picked by a row range or selection vector
+    
+    Nothing is copied when the view is made: length and single-row access
+    read through to the base column, and the selected values are gathered
+    into a real column only when something needs the buffers or a
+    whole-column operation. The base is then released.
+    """
+    
+    def __init__(self, base, rows):
+        """
+        Initialize column view
+        
+        Args:
+            base: Column to read from
+            rows: range or array.array of row positions in base
+        """
+        super().__init__(base.dtype)
+        self.base = base
+        self.rows = rows
+    
+    def _load(self):
+        """Gather the selected rows"""
+        rows = self.rows
+        if isinstance(rows, range) and rows.step == 1:
+            column = self.base[rows.start:rows.stop]
+        else:
+            column = self.base.take(rows)
+        self.base = self.rows = None
+        return column
+    
+    @property
+    def categories(self):
+        if self._column is None:
+            return self.base.categories
+        return self._column.categories
+    
+    def __len__(self):
+        if self._column is not None:
+            return len(self._column)
+        return len(self.rows)
+    
+    def __getitem__(self, key):
+        if self._column is not None:
+            return self._column[key]
+        if isinstance(key, slice):
+            # slicing the row positions themselves composes any step correctly
+            return view(self.base, self.rows[key])
+        return self.base[self.rows[key]]
+
+
+def view(column, rows):
+    """
+    Zero-copy view of some rows of a column
+    
+    Args:
+        column: Column (or ColumnView) to read from
+        rows: range or array.array of row positions in column
+    
+    Returns:
+        the column itself when rows covers it in order, a ColumnView otherwise
+    """
+    if isinstance(rows, range) and rows == range(len(column)):
+        return column
+    if isinstance(column, ColumnView) and column._column is None:
+        # a view of a view reads straight from the innermost column
+        # compose by arithmetic, not by slicing with the resolved bounds: a
+        # reversed range can have stop -1, which a slice reads as "from the end"
+        outer = column.rows
+        if isinstance(rows, range) and isinstance(outer, range):
+            rows = range(outer.start + outer.step * rows.start, outer.start + outer.step * rows.stop,
+                         outer.step * rows.step)
+        elif isinstance(rows, range) and rows.step == 1:
+            rows = outer[rows.start:max(rows.start, rows.stop)]
+        else:
+            rows = array('q', map(outer.__getitem__, rows))
+        column = column.base
+    return ColumnView(column, rows)
+
+
+def _count(buffer, value):
+    """buffer.count(value), also for memoryviews (which have no count method)"""
+    if isinstance(buffer, memoryview):
+        return buffer.tolist().count(value)
+    return buffer.count(value)
+
+
+def as_column(values):
+    """Wrap values in a Column unless they already are one"""
+    if isinstance(values, Column):
+        return values
+    return Column.from_values(values)
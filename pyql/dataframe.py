@@ -1,15 +1,21 @@
 
 from .parser import CSVParser
+from .columns import Column, as_column, view
 from .selection import SelectionMixin
 from .filters import FilterMixin
 from .aggregation import AggregationMixin
 from .joins import JoinMixin
+from .indexes import IndexMixin
+from .sorting import SortMixin
+from .storage import read_pyql, write_pyql
+from .arrow import read_arrow, read_parquet, write_arrow, write_parquet
+from .writers import DEFAULT_BATCH_ROWS, iter_csv, iter_jsonl, write_text
 
-class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin):
+class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin, IndexMixin, SortMixin):
     """
     consists of the core dataframe class which:
     1. stores data in column-oriented format
-    2. implements selection, filtering, aggregation, and join operations
+    2. implements selection, filtering, aggregation, join, indexing and sorting operations
     3. other cool stuf
     """
     
@@ -20,13 +26,15 @@ class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin):
         params:
             data: dict of lists (column-oriented) or list of lists (row-oriented)
             columns: list of column names (required if data is list of lists)
+        
+        every column is stored as a typed Column (see columns.py)
         """
         self.data = {}
         self.columns = []
         
         if data is not None: # non empty data
             if isinstance(data, dict): # column oriented data
-                self.data = {k: list(v) for k, v in data.items()} # data is the key (column name) and value (list of values)
+                self.data = {k: v if isinstance(v, Column) else Column.from_values(list(v)) for k, v in data.items()} # data is the key (column name) and value (column of values)
                 self.columns = list(data.keys()) # column mames are the keys
             
             elif isinstance(data, list) and columns is not None: # row oriented data, re-orient
@@ -38,9 +46,12 @@ class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin):
                     for i, value in enumerate(row):
                         if i < len(columns):
                             self.data[columns[i]].append(value)
+                
+                self.data = {col: Column.from_values(values) for col, values in self.data.items()}
     
     @classmethod
-    def from_csv(cls, filepath, delimiter=',', columns=None):
+    def from_csv(cls, filepath, delimiter=',', columns=None, chunksize=None, dtypes=None,
+                 categorical_threshold=None, workers=None):
         """
         make a dataframe object out of a csv file
         
@@ -48,13 +59,155 @@ class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin):
             filepath: path to CSV file
             delimiter: character separating values
             columns: custom column names (if None, read from file)
+            chunksize: if given, stream the file and return an iterator of
+                       dataframes with at most chunksize rows each
+            dtypes: dict mapping column names to 'int', 'float' or 'str' to
+                    skip type inference for those columns, or 'category'
+            categorical_threshold: dictionary-encode text columns whose
+                    distinct/rows ratio is at most this (off when None)
+            workers: parse the file in this many processes, each taking a
+                    byte range of it (quoted values must not hold newlines;
+                    see CSVParser.iter_range_chunks)
+        
+        return:
+            dataframe instance (or iterator of dataframes when chunksize is set)
+        """
+        parser = CSVParser(filepath, delimiter, columns, dtypes=dtypes,
+                           categorical_threshold=categorical_threshold)
+        if chunksize is not None:
+            if workers is not None:
+                raise ValueError("workers cannot be combined with chunksize")
+            return (cls._from_columns(chunk, list(chunk)) for chunk in parser.iter_column_chunks(chunksize))
+        
+        # chunks are already column oriented, so no re-pivot is needed; each
+        # one is packed into typed storage before the next is read
+        chunks = parser.iter_column_chunks() if workers is None else parser.iter_range_chunks(workers)
+        parts = {}
+        for chunk in chunks:
+            for col, column in chunk.items():
+                parts.setdefault(col, []).append(column)
+        
+        cols = list(parser.header) if parser.header is not None else []
+        return cls._from_columns({col: Column.concat(parts.get(col, [])) for col in cols}, cols)
+    
+    @classmethod
+    def read_pyql(cls, filepath, columns=None):
+        """
+        open a dataframe saved with to_pyql
+        
+        the file is memory-mapped and each column is only read the first
+        time it is used, so opening is near-instant
+        
+        params:
+            filepath: path to .pyql file
+            columns: optional list of columns to load (default all)
+        
+        return:
+            dataframe instance
+        """
+        names, data = read_pyql(filepath, columns)
+        return cls._from_columns(data, names)
+    
+    def to_pyql(self, filepath):
+        """
+        save the dataframe in the binary columnar .pyql format
+        
+        params:
+            filepath: destination path
+        """
+        write_pyql(self, filepath)
+    
+    @classmethod
+    def from_arrow(cls, source, columns=None):
+        """
+        make a dataframe out of Arrow data (requires pyarrow)
+        
+        numeric columns are copied buffer to buffer into typed storage and
+        dictionary columns become categorical
+        
+        params:
+            source: pyarrow Table or RecordBatch, or path of an Arrow IPC file
+            columns: optional list of columns to keep
+        
+        return:
+            dataframe instance
+        """
+        names, data = read_arrow(source, columns)
+        return cls._from_columns(data, names)
+    
+    def to_arrow(self, filepath=None):
+        """
+        convert the dataframe to a pyarrow Table (requires pyarrow)
+        
+        params:
+            filepath: if given, also write the table there as an Arrow IPC file
+        
+        return:
+            pyarrow.Table
+        """
+        return write_arrow(self, filepath)
+    
+    @classmethod
+    def from_parquet(cls, filepath, columns=None, filters=None, row_groups=None):
+        """
+        make a dataframe out of a Parquet file (requires pyarrow)
+        
+        params:
+            filepath: path to Parquet file
+            columns: optional list of columns to keep
+            filters: optional list of (column, operator, value) predicates
+                     that must all hold; row groups whose statistics rule
+                     them out are never read
+            row_groups: optional list of row group numbers to read
         
         return:
             dataframe instance
         """
-        parser = CSVParser(filepath, delimiter, columns)
-        cols, data = parser.read_csv()
-        return cls(data=data, columns=cols) # instantiate a dataframe object from the returned data and columns
+        names, data, filters = read_parquet(filepath, columns, filters, row_groups)
+        df = cls._from_columns(data, names)
+        if filters:
+            mask = None
+            for column, operator, value in filters:
+                predicate_mask = df._create_mask(column, operator, value)
+                mask = predicate_mask if mask is None else mask & predicate_mask
+            df = df[mask]
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+    
+    def to_parquet(self, filepath, row_group_size=None):
+        """
+        save the dataframe as a Parquet file (requires pyarrow)
+        
+        params:
+            filepath: destination path
+            row_group_size: maximum rows per row group
+        """
+        write_parquet(self, filepath, row_group_size)
+    
+    @classmethod
+    def _from_columns(cls, data, columns):
+        """
+        wrap already built column storage without copying it
+        
+        params:
+            data: dict mapping column name to a Column (lists get packed)
+            columns: ordered list of column names
+        """
+        df = cls.__new__(cls)
+        df.data = {col: as_column(values) for col, values in data.items()}
+        df.columns = columns
+        return df
+    
+    def lazy(self):
+        """
+        start a lazy query on this dataframe
+        
+        operations on the returned LazyFrame are recorded and optimized
+        (filter/projection pushdown) and only run on .collect()
+        """
+        from .lazy import LazyFrame
+        return LazyFrame.scan(self)
     
     def __repr__(self):
         """
@@ -97,32 +250,90 @@ class DataFrame(SelectionMixin, FilterMixin, AggregationMixin, JoinMixin):
         return (len(self), len(self.columns))
     
     def head(self, n=5):
-        """Return first n rows"""
+        """Return first n rows (a row-range view, nothing is copied)"""
+        rows = range(len(self))[:n]
         new_data = {}
         for col in self.columns:
-            new_data[col] = self.data[col][:n]
-        return DataFrame(data=new_data)
+            new_data[col] = view(self.data[col], rows)
+        return DataFrame._from_columns(new_data, self.columns[:])
     
     def tail(self, n=5):
-        """Return last n rows"""
+        """Return last n rows (a row-range view, nothing is copied)"""
+        rows = range(len(self))[-n:]
         new_data = {}
         for col in self.columns:
-            new_data[col] = self.data[col][-n:]
-        return DataFrame(data=new_data)
+            new_data[col] = view(self.data[col], rows)
+        return DataFrame._from_columns(new_data, self.columns[:])
+    
+    def slice(self, start=0, stop=None):
+        """Return rows start to stop, like a list slice (a row-range view, nothing is copied)"""
+        rows = range(len(self))[start:stop]
+        return DataFrame._from_columns({col: view(self.data[col], rows) for col in self.columns},
+                                       self.columns[:])
     
     def copy(self):
-        """Return a deep copy of DataFrame"""
-        new_data = {col: self.data[col][:] for col in self.columns}
-        return DataFrame(data=new_data)
+        """
+        Return a copy of DataFrame
+        
+        Columns are immutable, so the copy shares them (copy-on-write):
+        assigning a column on either frame replaces it there only.
+        """
+        return DataFrame._from_columns({col: self.data[col] for col in self.columns}, self.columns[:])
     
     def to_dict(self):
         """Convert DataFrame to dictionary"""
-        return {col: self.data[col][:] for col in self.columns}
+        return {col: self.data[col].to_list() for col in self.columns}
     
     def to_list(self):
         """Convert DataFrame to list of lists (rows)"""
-        rows = []
-        for i in range(len(self)):
-            row = [self.data[col][i] for col in self.columns]
-            rows.append(row)
-        return rows
+        return [list(row) for row in zip(*(self.data[col] for col in self.columns))]
+    
+    def iter_batches(self, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        stream the dataframe as consecutive dataframes of at most batch_rows rows
+        
+        each batch is a row-range view, so nothing is copied until a
+        batch's values are used
+        """
+        if batch_rows < 1:
+            raise ValueError("batch_rows must be a positive integer")
+        
+        for start in range(0, len(self), batch_rows):
+            rows = range(start, min(start + batch_rows, len(self)))
+            yield DataFrame._from_columns({col: view(self.data[col], rows) for col in self.columns},
+                                          self.columns[:])
+    
+    def iter_rows(self, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        stream the rows as tuples, one batch of rows in memory at a time
+        """
+        for batch in self.iter_batches(batch_rows):
+            yield from zip(*(batch.data[col] for col in self.columns))
+    
+    def to_csv(self, filepath=None, delimiter=',', header=True, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        write the dataframe as CSV, streaming it out batch by batch
+        
+        params:
+            filepath: file path or writable text file; None returns the CSV text
+            delimiter: character separating values
+            header: write the column names first
+            batch_rows: rows rendered per write
+        
+        return:
+            the CSV text when filepath is None
+        """
+        return write_text(iter_csv(self, delimiter, header, batch_rows), filepath)
+    
+    def to_jsonl(self, filepath=None, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        write the dataframe as JSON lines (one object per row), batch by batch
+        
+        params:
+            filepath: file path or writable text file; None returns the text
+            batch_rows: rows rendered per write
+        
+        return:
+            the JSON lines text when filepath is None
+        """
+        return write_text(iter_jsonl(self, batch_rows), filepath)
@@ -3,37 +3,87 @@ Filtering Operations
 Handles boolean indexing and conditional filtering
 """
 
+from array import array
+from itertools import compress, repeat
+from operator import eq, ge, gt, is_, le, lt, ne
+
+from .columns import view
+
 
 class BooleanMask:
-    """Helper class for boolean operations"""
+    """
+    Helper class for boolean operations
+    
+    The mask is kept as a bytearray holding one 0/1 byte per row, so
+    &, | and ~ run as bulk operations over the whole buffer instead of
+    Python-level loops.
+    """
     
     def __init__(self, mask):
         """
         Initialize boolean mask
         
         Args:
-            mask: list of boolean values
+            mask: list of boolean values, or a bytearray of 0/1 bytes
         """
+        if not isinstance(mask, bytearray):
+            mask = bytearray(map(bool, mask))
         self.mask = mask
+        self._count = None
+        self._indices = None
     
     def __and__(self, other):
         """Bitwise AND (&)"""
         if len(self.mask) != len(other.mask):
             raise ValueError("Masks must have same length")
-        return BooleanMask([a and b for a, b in zip(self.mask, other.mask)])
+        a = int.from_bytes(self.mask, 'little')
+        b = int.from_bytes(other.mask, 'little')
+        return BooleanMask(bytearray((a & b).to_bytes(len(self.mask), 'little')))
     
     def __or__(self, other):
         """Bitwise OR (|)"""
         if len(self.mask) != len(other.mask):
             raise ValueError("Masks must have same length")
-        return BooleanMask([a or b for a, b in zip(self.mask, other.mask)])
+        a = int.from_bytes(self.mask, 'little')
+        b = int.from_bytes(other.mask, 'little')
+        return BooleanMask(bytearray((a | b).to_bytes(len(self.mask), 'little')))
     
     def __invert__(self):
         """Bitwise NOT (~)"""
-        return BooleanMask([not x for x in self.mask])
+        return BooleanMask(self.mask.translate(_INVERT))
     
     def __len__(self):
         return len(self.mask)
+    
+    def __iter__(self):
+        return map(bool, self.mask)
+    
+    def __getitem__(self, i):
+        return bool(self.mask[i])
+    
+    def count(self):
+        """Number of true entries (cached)"""
+        if self._count is None:
+            self._count = self.mask.count(1)
+        return self._count
+    
+    def indices(self):
+        """
+        Selection vector: positions of the true entries (cached)
+        
+        Returns:
+            range when every entry is true, array of row positions otherwise
+        """
+        if self._indices is None:
+            if self.count() == len(self.mask):
+                self._indices = range(len(self.mask))
+            else:
+                self._indices = array('q', compress(range(len(self.mask)), self.mask))
+        return self._indices
+
+
+# translation table flipping 0 <-> 1 bytes
+_INVERT = bytes.maketrans(b'\x00\x01', b'\x01\x00')
 
 
 class FilterMixin:
@@ -41,26 +91,31 @@ class FilterMixin:
     
     def _filter_by_mask(self, mask):
         """Filter rows based on boolean mask"""
+        if not isinstance(mask, BooleanMask):
+            mask = BooleanMask(mask)
         if len(mask) != len(self):
             raise ValueError("Mask length must match DataFrame length")
         
+        # compute the matching rows once; every column becomes a view over
+        # them and is only gathered when its values are needed
+        indices = mask.indices()
         new_data = {}
         for col in self.columns:
-            new_data[col] = [self.data[col][i] for i in range(len(mask)) if mask[i]]
+            new_data[col] = view(self.data[col], indices)
         
         from .dataframe import DataFrame
-        df = DataFrame.__new__(DataFrame)
-        df.data = new_data
-        df.columns = self.columns[:]
-        return df
+        return DataFrame._from_columns(new_data, self.columns[:])
     
-    def filter(self, column, operator, value):
+    def filter(self, column, operator, value=None):
         """
         Filter rows based on condition
         
         Args:
             column: column name
-            operator: comparison operator (>, <, ==, !=, >=, <=)
+            operator: comparison operator (>, <, ==, !=, >=, <=) or one of
+                      'in' (value is a list), 'between' (value is a
+                      (low, high) pair, inclusive), 'is_null' (no value),
+                      'startswith' and 'contains' (text columns)
             value: comparison value
         
         Returns:
@@ -69,31 +124,140 @@ class FilterMixin:
         mask = self._create_mask(column, operator, value)
         return self[mask]
     
-    def _create_mask(self, column, operator, value):
+    def _create_mask(self, column, operator, value=None):
         """Create boolean mask from comparison"""
         if column not in self.columns:
             raise KeyError(f"Column '{column}' not found")
         
         col_data = self.data[column]
-        mask = []
+        if operator == 'is_null':
+            return BooleanMask(_null_mask(col_data))
         
-        for val in col_data:
-            if operator == '>':
-                mask.append(val > value)
-            elif operator == '>=':
-                mask.append(val >= value)
-            elif operator == '<':
-                mask.append(val < value)
-            elif operator == '<=':
-                mask.append(val <= value)
-            elif operator == '==':
-                mask.append(val == value)
-            elif operator == '!=':
-                mask.append(val != value)
-            else:
-                raise ValueError(f"Unknown operator: {operator}")
+        rows = _index_lookup(col_data, operator, value)
+        if rows is not None:
+            return _mask_from_rows(rows, len(col_data))
+        
+        # the operator is resolved once into a function over a whole sequence
+        test = _compile_predicate(operator, value)
+        
+        if col_data.dtype == 'category':
+            # evaluate each distinct value once, then look the rows up by code
+            hits = test(col_data.categories) + b'\x00' # code -1 (null) never matches
+            return BooleanMask(bytearray(map(hits.__getitem__, col_data.codes)))
+        
+        values = col_data.values
+        if col_data.dtype == 'object' and None in values:
+            # nulls never match; only test the present values and scatter back
+            present = iter(test([val for val in values if val is not None]))
+            return BooleanMask(bytearray(0 if val is None else next(present) for val in values))
+        
+        mask = BooleanMask(test(values)) # contiguous buffer for numeric columns
+        
+        # null slots hold a placeholder value, they never match
+        if col_data.validity is not None:
+            return mask & BooleanMask(col_data.validity)
+        
+        return mask
+
+
+# comparison operators, looked up once per predicate instead of once per row
+OPERATORS = {
+    '>': gt,
+    '>=': ge,
+    '<': lt,
+    '<=': le,
+    '==': eq,
+    '!=': ne,
+}
+
+
+def _compile_predicate(operator, value):
+    """
+    Turn an operator and value into a function mapping a sequence of
+    values to a bytearray of 0/1 matches
+    """
+    if operator in OPERATORS:
+        func = OPERATORS[operator]
+        return lambda values: bytearray(map(func, values, repeat(value)))
+    
+    if operator == 'in':
+        if isinstance(value, str) or not hasattr(value, '__iter__'):
+            raise ValueError("Operator 'in' expects a list of values")
+        members = set(value)
+        return lambda values: bytearray(map(members.__contains__, values))
+    
+    if operator == 'between':
+        try:
+            low, high = value
+        except (TypeError, ValueError):
+            raise ValueError("Operator 'between' expects a (low, high) pair") from None
         
-        return BooleanMask(mask)
+        def test(values):
+            above = BooleanMask(bytearray(map(ge, values, repeat(low))))
+            below = BooleanMask(bytearray(map(le, values, repeat(high))))
+            return (above & below).mask
+        return test
+    
+    if operator == 'startswith':
+        return _text_predicate(str.startswith, value)
+    
+    if operator == 'contains':
+        return _text_predicate(str.__contains__, value)
+    
+    raise ValueError(f"Unknown operator: {operator}")
+
+
+def _index_lookup(col_data, operator, value):
+    """
+    Answer a predicate from the column's indexes
+    
+    Returns:
+        array of matching row positions, or None when no index applies
+        (the caller then scans the column)
+    """
+    try:
+        if col_data.index is not None and value is not None:
+            if operator == '==':
+                return col_data.index.find([value])
+            if operator == 'in' and not isinstance(value, str):
+                return col_data.index.find(member for member in value if member is not None)
+        if col_data.sorted_index is not None and operator in ('<', '<=', '>', '>=', 'between'):
+            return col_data.sorted_index.find_range(operator, value)
+    except (TypeError, ValueError):
+        pass # unhashable or incomparable value: let the scan decide
+    return None
+
+
+def _mask_from_rows(rows, length):
+    """BooleanMask with the given (sorted) rows set, its selection vector pre-filled"""
+    mask = bytearray(length)
+    for row in rows:
+        mask[row] = 1
+    result = BooleanMask(mask)
+    result._count = len(rows)
+    result._indices = rows if len(rows) < length else range(length)
+    return result
+
+
+def _text_predicate(method, value):
+    """String predicate that treats non-string cells as non-matching"""
+    def test(values):
+        try:
+            return bytearray(map(method, values, repeat(value)))
+        except TypeError: # some cells are not strings
+            return bytearray(isinstance(val, str) and method(val, value) for val in values)
+    return test
+
+
+def _null_mask(col_data):
+    """0/1 bytes marking the null rows of a column"""
+    if col_data.dtype == 'category':
+        return bytearray(map((-1).__eq__, col_data.codes))
+    if col_data.validity is not None:
+        return bytearray(col_data.validity).translate(_INVERT) # validity may be a read-only memoryview
+    if col_data.dtype == 'object':
+        return bytearray(map(is_, col_data.values, repeat(None)))
+    return bytearray(len(col_data))
 
 
 def compare(df, column, operator, value):
@@ -0,0 +1,181 @@
+"""
+Column Indexes
+Persistent hash and sorted indexes reused by filters, joins and group-bys
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate, chain
+
+from .aggregation import _factorize_column
+
+
+class IndexMixin:
+    """Mixin for building and dropping column indexes"""
+    
+    def create_index(self, column, sorted=False):
+        """
+        Build and cache an index on a column
+        
+        The hash index answers '==' and 'in' filters without scanning the
+        column, is used as the build side of hash joins on that column and
+        provides the group numbers for group-bys on it. The optional sorted
+        index answers '<', '<=', '>', '>=' and 'between' filters.
+        
+        Indexes are stored on the column object itself: DataFrames sharing
+        the column share the index, and replacing the column in df.data
+        drops it.
+        
+        Args:
+            column: column name
+            sorted: also build a sorted index for range predicates
+        """
+        if column not in self.columns:
+            raise KeyError(f"Column '{column}' not found")
+        
+        col_data = self.data[column]
+        if col_data.index is None:
+            col_data.index = HashIndex(col_data)
+        if sorted and col_data.sorted_index is None:
+            col_data.sorted_index = SortedIndex(col_data)
+    
+    def drop_index(self, column):
+        """Drop the indexes of a column"""
+        if column not in self.columns:
+            raise KeyError(f"Column '{column}' not found")
+        
+        self.data[column].index = None
+        self.data[column].sorted_index = None
+    
+    @property
+    def indexes(self):
+        """Dict mapping each indexed column to its index kinds"""
+        result = {}
+        for col in self.columns:
+            kinds = []
+            if self.data[col].index is not None:
+                kinds.append('hash')
+            if self.data[col].sorted_index is not None:
+                kinds.append('sorted')
+            if kinds:
+                result[col] = kinds
+        return result
+
+
+class HashIndex:
+    """
+    Hash index of a column
+    
+    Holds the column factorized (distinct keys in order of first
+    appearance and the key number of every row) together with the rows of
+    each key. Nulls are indexed under None.
+    """
+    
+    def __init__(self, column):
+        """
+        Build the index
+        
+        Args:
+            column: Column to index
+        """
+        self.keys, self.ids = _factorize_column(column)
+        self.lookup = {key: i for i, key in enumerate(self.keys)}
+        self.unique = len(self.keys) == len(self.ids)
+        
+        # rows of every key, in row order: one stable sort by key number
+        # (with unique keys, a key's number is its row)
+        self.rows = None
+        self._positions = None
+        if not self.unique:
+            order = array('q', sorted(range(len(self.ids)), key=self.ids.__getitem__))
+            sizes = Counter(self.ids)
+            offsets = [0] + list(accumulate(sizes[i] for i in range(len(self.keys))))
+            self.rows = [order[start:end] for start, end in zip(offsets, offsets[1:])]
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    @property
+    def positions(self):
+        """Dict mapping each key to the array of its rows (cached)"""
+        if self._positions is None:
+            if self.unique:
+                self._positions = {key: array('q', [row]) for row, key in enumerate(self.keys)}
+            else:
+                self._positions = dict(zip(self.keys, self.rows))
+        return self._positions
+    
+    def find(self, values):
+        """
+        Rows holding any of the given values
+        
+        Args:
+            values: iterable of (hashable) values
+        
+        Returns:
+            new array of row positions in row order (never the index's own)
+        """
+        found = [self.lookup[value] for value in set(values) if value in self.lookup]
+        if self.unique:
+            return array('q', sorted(found))
+        groups = [self.rows[i] for i in found]
+        if len(groups) == 1:
+            return array('q', groups[0]) # callers may keep or modify it
+        return array('q', sorted(chain.from_iterable(groups)))
+
+
+class SortedIndex:
+    """
+    Sorted index of a column
+    
+    Keeps the row positions of the non-null values ordered by value, so
+    range predicates become two binary searches.
+    """
+    
+    def __init__(self, column):
+        """
+        Build the index
+        
+        Args:
+            column: Column to index
+        """
+        values = column.to_list()
+        # nulls (and NaN, which is unordered) never satisfy a range predicate
+        present = [row for row, value in enumerate(values) if value is not None and value == value]
+        try:
+            self.order = array('q', sorted(present, key=values.__getitem__))
+        except TypeError:
+            raise ValueError("A sorted index needs values of one comparable type") from None
+        self.keys = list(map(values.__getitem__, self.order))
+        self.size = len(values)
+    
+    def __len__(self):
+        return self.size
+    
+    def find_range(self, operator, value):
+        """
+        Rows matching a range predicate
+        
+        Args:
+            operator: '<', '<=', '>', '>=' or 'between'
+            value: bound, or (low, high) pair for 'between'
+        
+        Returns:
+            array of row positions in row order
+        """
+        keys = self.keys
+        if operator == '>':
+            start, end = bisect_right(keys, value), len(keys)
+        elif operator == '>=':
+            start, end = bisect_left(keys, value), len(keys)
+        elif operator == '<':
+            start, end = 0, bisect_left(keys, value)
+        elif operator == '<=':
+            start, end = 0, bisect_right(keys, value)
+        elif operator == 'between':
+            low, high = value
+            start, end = bisect_left(keys, low), bisect_right(keys, high)
+        else:
+            raise ValueError(f"Unknown operator: {operator}")
+        return array('q', sorted(self.order[start:end]))
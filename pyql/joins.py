@@ -3,140 +3,498 @@ Join Operations
 Handles merging DataFrames
 """
 
+from array import array
+from itertools import compress, islice, repeat
+from operator import is_not, le
+
+from .aggregation import _as_list
+from .columns import CategoricalColumn, Column
+
+JOIN_STRATEGIES = ('hash', 'sort_merge')
+
 
 class JoinMixin:
     """Mixin for join operations"""
     
-    def merge(self, other, left_on, right_on, how='inner'):
+    def merge(self, other, left_on, right_on, how='inner', suffixes=('_x', '_y'), strategy='hash'):
         """
         Merge with another DataFrame
         
         Args:
             other: DataFrame to merge with
-            left_on: column name in self to join on
-            right_on: column name in other to join on
+            left_on: column name (or list of names) in self to join on
+            right_on: column name (or list of names) in other to join on
             how: join type ('inner', 'left', 'right', 'outer')
+            suffixes: appended to the names of non-key columns present on
+                      both sides, (left suffix, right suffix)
+            strategy: 'hash' builds a hash index on the smaller input and
+                      probes it with the other, keeping left row order;
+                      'sort_merge' sorts both inputs by key (skipped when they
+                      already are) and walks them in step without any hash
+                      index, returning rows in key order
         
         Returns:
             Merged DataFrame
         """
-        if left_on not in self.columns:
-            raise KeyError(f"Column '{left_on}' not found in left DataFrame")
-        if right_on not in other.columns:
-            raise KeyError(f"Column '{right_on}' not found in right DataFrame")
+        left_keys = _as_list(left_on)
+        right_keys = _as_list(right_on)
+        for col in left_keys:
+            if col not in self.columns:
+                raise KeyError(f"Column '{col}' not found in left DataFrame")
+        for col in right_keys:
+            if col not in other.columns:
+                raise KeyError(f"Column '{col}' not found in right DataFrame")
+        if not left_keys or len(left_keys) != len(right_keys):
+            raise ValueError("left_on and right_on must name the same number of columns")
+        if strategy not in JOIN_STRATEGIES:
+            raise ValueError(f"Unknown join strategy: {strategy}")
         
         if how == 'inner':
-            return self._inner_join(other, left_on, right_on)
+            return self._inner_join(other, left_keys, right_keys, suffixes, strategy)
         elif how == 'left':
-            return self._left_join(other, left_on, right_on)
+            return self._left_join(other, left_keys, right_keys, suffixes, strategy)
         elif how == 'right':
-            return self._right_join(other, left_on, right_on)
+            return self._right_join(other, left_keys, right_keys, suffixes, strategy)
         elif how == 'outer':
-            return self._outer_join(other, left_on, right_on)
+            return self._outer_join(other, left_keys, right_keys, suffixes, strategy)
         else:
             raise ValueError(f"Unknown join type: {how}")
     
-    def _inner_join(self, other, left_on, right_on):
-        """Inner join - only matching rows"""
-        # Build index for right DataFrame
-        right_index = {}
-        for i, value in enumerate(other.data[right_on]):
-            if value not in right_index:
-                right_index[value] = []
-            right_index[value].append(i)
-        
-        # Build result
-        result_data = {col: [] for col in self.columns}
-        
-        # Add columns from right (avoid duplicates)
-        for col in other.columns:
-            if col not in result_data:
-                result_data[col] = []
-        
-        result_columns = self.columns + [col for col in other.columns if col not in self.columns]
-        
-        # Perform join
-        for i, left_value in enumerate(self.data[left_on]):
-            if left_value in right_index:
-                for j in right_index[left_value]:
-                    # Add left row
-                    for col in self.columns:
-                        result_data[col].append(self.data[col][i])
-                    
-                    # Add right row
-                    for col in other.columns:
-                        if col not in self.columns:
-                            result_data[col].append(other.data[col][j])
+    def _join_keys(self, other, left_on, right_on, ordered=False):
+        """
+        Return the (left, right) key sequences to match on
         
-        from .dataframe import DataFrame
-        df = DataFrame.__new__(DataFrame)
-        df.data = result_data
-        df.columns = result_columns
-        return df
+        Single-column keys are the columns themselves; multi-column keys
+        are zipped into tuples. When both sides of a key column are
+        dictionary-encoded, the right codes are used directly and the left
+        codes are translated into the right dictionary once, so the join
+        compares small ints instead of values.
+        
+        Args:
+            ordered: the keys must also order like the values (sort-merge):
+                     both sides' codes are then replaced by the rank of
+                     their value among the categories of both dictionaries
+        """
+        left_parts = []
+        right_parts = []
+        for left_name, right_name in zip(left_on, right_on):
+            left_col = self.data[left_name]
+            right_col = other.data[right_name]
+            if left_col.dtype == 'category' and right_col.dtype == 'category' and ordered:
+                left_col, right_col = _category_ranks(left_col, right_col)
+            elif left_col.dtype == 'category' and right_col.dtype == 'category':
+                # -2 marks a left value missing from the right dictionary; nulls stay -1
+                translate = [right_col.code_of(value) for value in left_col.categories]
+                translate = [-2 if code is None else code for code in translate] + [-1]
+                left_col = list(map(translate.__getitem__, left_col.codes))
+                right_col = right_col.codes
+            left_parts.append(left_col)
+            right_parts.append(right_col)
+        
+        if len(left_parts) == 1:
+            return left_parts[0], right_parts[0]
+        return list(zip(*left_parts)), list(zip(*right_parts))
     
-    def _left_join(self, other, left_on, right_on):
-        """Left join - all left rows, matching right rows"""
-        right_index = {}
-        for i, value in enumerate(other.data[right_on]):
-            if value not in right_index:
-                right_index[value] = []
-            right_index[value].append(i)
-        
-        result_data = {col: [] for col in self.columns}
-        for col in other.columns:
-            if col not in result_data:
-                result_data[col] = []
-        
-        result_columns = self.columns + [col for col in other.columns if col not in self.columns]
-        
-        for i, left_value in enumerate(self.data[left_on]):
-            if left_value in right_index:
-                for j in right_index[left_value]:
-                    for col in self.columns:
-                        result_data[col].append(self.data[col][i])
-                    for col in other.columns:
-                        if col not in self.columns:
-                            result_data[col].append(other.data[col][j])
+    def _join_indices(self, other, left_on, right_on, strategy, keep_left=False, keep_right=False):
+        """
+        Pair up matching rows
+        
+        Args:
+            keep_left: also emit left rows without a match (paired with -1)
+            keep_right: also emit right rows without a match (paired with -1)
+        
+        Returns:
+            tuple: (left row positions, right row positions) as arrays
+        """
+        left_keys, right_keys = self._join_keys(other, left_on, right_on,
+                                                ordered=strategy == 'sort_merge')
+        if strategy == 'sort_merge':
+            return _sort_merge_join(left_keys, right_keys, keep_left, keep_right)
+        
+        # build on a side with a persistent index when there is one (nothing
+        # to build then), otherwise on the smaller side
+        left_index = _key_index(self, left_on, left_keys)
+        right_index = _key_index(other, right_on, right_keys)
+        if left_index is not None and right_index is None:
+            build_left = True
+        elif right_index is not None and left_index is None:
+            build_left = False
+        else:
+            build_left = len(left_keys) < len(right_keys)
+        
+        if not build_left:
+            return _hash_join(right_keys, left_keys, keep_left, keep_right, right_index)
+        return _grouped_hash_join(left_keys, right_keys, keep_left, keep_right, left_index)
+    
+    def _gather(self, other, left_idx, right_idx, left_on, right_on, suffixes):
+        """
+        Build the joined DataFrame by gathering every output column in bulk
+        
+        Args:
+            left_idx, right_idx: paired row positions, -1 meaning no row
+        """
+        left_nulls = -1 in left_idx
+        right_nulls = -1 in right_idx
+        
+        result_data = {}
+        result_columns = []
+        for name, side, source in join_columns(self.columns, other.columns, 'left',
+                                               left_on, right_on, suffixes):
+            if side == 'left':
+                result_data[name] = self.data[source].take(left_idx, nulls=left_nulls)
             else:
-                # No match - add left row with None for right columns
-                for col in self.columns:
-                    result_data[col].append(self.data[col][i])
-                for col in other.columns:
-                    if col not in self.columns:
-                        result_data[col].append(None)
+                result_data[name] = other.data[source].take(right_idx, nulls=right_nulls)
+            result_columns.append(name)
         
         from .dataframe import DataFrame
-        df = DataFrame.__new__(DataFrame)
-        df.data = result_data
-        df.columns = result_columns
-        return df
+        return DataFrame._from_columns(result_data, result_columns)
+    
+    def _inner_join(self, other, left_on, right_on, suffixes=('_x', '_y'), strategy='hash'):
+        """Inner join - only matching rows"""
+        left_idx, right_idx = self._join_indices(other, left_on, right_on, strategy)
+        return self._gather(other, left_idx, right_idx, left_on, right_on, suffixes)
     
-    def _right_join(self, other, left_on, right_on):
+    def _left_join(self, other, left_on, right_on, suffixes=('_x', '_y'), strategy='hash'):
+        """Left join - all left rows, matching right rows"""
+        left_idx, right_idx = self._join_indices(other, left_on, right_on, strategy, keep_left=True)
+        return self._gather(other, left_idx, right_idx, left_on, right_on, suffixes)
+    
+    def _right_join(self, other, left_on, right_on, suffixes=('_x', '_y'), strategy='hash'):
         """Right join - swap and do left join"""
-        return other._left_join(self, right_on, left_on)
-    
-    def _outer_join(self, other, left_on, right_on):
-        """Outer join - all rows from both"""
-        # Do left join first
-        left_result = self._left_join(other, left_on, right_on)
-        
-        # Find right rows not in left
-        left_values = set(self.data[left_on])
-        right_only_indices = [
-            i for i, val in enumerate(other.data[right_on])
-            if val not in left_values
-        ]
-        
-        # Add right-only rows
-        for i in right_only_indices:
-            for col in self.columns:
-                if col in other.columns:
-                    left_result.data[col].append(other.data[col][i])
-                else:
-                    left_result.data[col].append(None)
-            
-            for col in other.columns:
-                if col not in self.columns:
-                    left_result.data[col].append(other.data[col][i])
-        
-        return left_result
+        return other._left_join(self, right_on, left_on, (suffixes[1], suffixes[0]), strategy)
+    
+    def _outer_join(self, other, left_on, right_on, suffixes=('_x', '_y'), strategy='hash'):
+        """
+        Outer join - all rows from both
+        
+        Runs as one build and one probe: right rows no left row matched
+        are tracked while probing and emitted after the matched pairs (in
+        key order for a sort-merge). The left key columns are completed
+        with the right keys on those rows, so they hold a key on every row.
+        """
+        left_idx, right_idx = self._join_indices(other, left_on, right_on, strategy,
+                                                 keep_left=True, keep_right=True)
+        result = self._gather(other, left_idx, right_idx, left_on, right_on, suffixes)
+        if -1 not in left_idx:
+            return result
+        
+        names = {(side, source): name for name, side, source in
+                 join_columns(self.columns, other.columns, 'outer', left_on, right_on, suffixes)}
+        for left_name, right_name in zip(left_on, right_on):
+            name = names[('left', left_name)]
+            right_keys = other.data[right_name].take(right_idx, nulls=True)
+            result.data[name] = _coalesce(result.data[name], right_keys, left_idx)
+        return result
+
+
+def _hash_join(build_keys, probe_keys, keep_probe=False, keep_build=False, index=None):
+    """
+    Hash join two key sequences
+    
+    Builds a hash index on build_keys and probes it with probe_keys in
+    order. Only row positions are produced here; no column is copied.
+    
+    Args:
+        build_keys: keys of the side to index (ideally the smaller one)
+        probe_keys: keys of the side to stream through the index
+        keep_probe: also emit probe rows without a match (paired with -1)
+        keep_build: also emit build rows no probe row matched, after all
+                    the others (paired with -1)
+        index: HashIndex of build_keys to use instead of building one
+    
+    Returns:
+        tuple: (probe row positions, build row positions)
+    """
+    n_probe = len(probe_keys)
+    n_build = len(build_keys)
+    # build rows hit by at least one probe row, marked while probing
+    matched = bytearray(n_build) if keep_build else None
+    
+    if index is not None:
+        lookup = index.lookup
+        unique = index.unique
+    else:
+        lookup = dict(zip(build_keys, range(n_build)))
+        unique = len(lookup) == n_build
+    
+    # unique build keys: a plain dict lookup per probe row, all in C
+    if unique:
+        matches = list(map(lookup.get, probe_keys))
+        found = bytearray(map(is_not, matches, repeat(None)))
+        if keep_probe:
+            probe_idx = array('q', range(n_probe))
+            build_idx = array('q', [-1 if j is None else j for j in matches])
+        else:
+            probe_idx = array('q', compress(range(n_probe), found))
+            build_idx = array('q', compress(matches, found))
+        if matched is not None:
+            for j in compress(matches, found):
+                matched[j] = 1
+    else:
+        if index is not None:
+            positions = index.positions
+        else:
+            positions = {}
+            for j, value in enumerate(build_keys):
+                if value not in positions:
+                    positions[value] = []
+                positions[value].append(j)
+        
+        probe_idx = array('q')
+        build_idx = array('q')
+        for i, probe_value in enumerate(probe_keys):
+            rows = positions.get(probe_value)
+            if rows is None:
+                if keep_probe:
+                    probe_idx.append(i)
+                    build_idx.append(-1)
+                continue
+            if len(rows) == 1:
+                probe_idx.append(i)
+                build_idx.append(rows[0])
+            else:
+                probe_idx.extend(repeat(i, len(rows)))
+                build_idx.extend(rows)
+            if matched is not None and not matched[rows[0]]:
+                for j in rows:
+                    matched[j] = 1
+    
+    if matched is not None:
+        unmatched = array('q', compress(range(n_build), map((0).__eq__, matched)))
+        probe_idx.extend(repeat(-1, len(unmatched)))
+        build_idx.extend(unmatched)
+    return probe_idx, build_idx
+
+
+def _grouped_hash_join(build_keys, probe_keys, keep_build=False, keep_probe=False, index=None):
+    """
+    Hash join emitting the pairs in build row order
+    
+    Used when the left side is the smaller one: probe rows are grouped
+    under the build key they match (the table only ever holds build keys)
+    and the groups are read out walking the build rows, so the pairs keep
+    left row order without being sorted afterwards.
+    
+    Args:
+        build_keys: keys of the side to index, whose row order is kept
+        probe_keys: keys of the other side
+        keep_build: also emit build rows without a match (paired with -1)
+        keep_probe: also emit probe rows nothing matched, after all the
+                    others (paired with -1)
+        index: HashIndex of build_keys to use instead of building one
+    
+    Returns:
+        tuple: (build row positions, probe row positions)
+    """
+    build = index.lookup if index is not None else set(build_keys)
+    groups = {}
+    unmatched = array('q')
+    for k, value in enumerate(probe_keys):
+        if value in build:
+            rows = groups.get(value)
+            if rows is None:
+                groups[value] = [k]
+            else:
+                rows.append(k)
+        elif keep_probe:
+            unmatched.append(k)
+    
+    build_idx = array('q')
+    probe_idx = array('q')
+    for i, value in enumerate(build_keys):
+        rows = groups.get(value)
+        if rows is None:
+            if keep_build:
+                build_idx.append(i)
+                probe_idx.append(-1)
+        elif len(rows) == 1:
+            build_idx.append(i)
+            probe_idx.append(rows[0])
+        else:
+            build_idx.extend(repeat(i, len(rows)))
+            probe_idx.extend(rows)
+    
+    build_idx.extend(repeat(-1, len(unmatched)))
+    probe_idx.extend(unmatched)
+    return build_idx, probe_idx
+
+
+def _sort_merge_join(left_keys, right_keys, keep_left=False, keep_right=False):
+    """
+    Sort-merge join two key sequences
+    
+    Both sides are put in key order (skipped when already sorted) and
+    walked in step, so no hash index is built. Pairs come out in key
+    order, unmatched rows included where they fall.
+    
+    Returns:
+        tuple: (left row positions, right row positions)
+    """
+    if _has_nulls(left_keys) or _has_nulls(right_keys):
+        left_keys = list(map(_null_first, left_keys))
+        right_keys = list(map(_null_first, right_keys))
+    left_order, left_sorted = _sort_keys(left_keys)
+    right_order, right_sorted = _sort_keys(right_keys)
+    n_left = len(left_sorted)
+    n_right = len(right_sorted)
+    
+    left_idx = array('q')
+    right_idx = array('q')
+    i = j = 0
+    while i < n_left and j < n_right:
+        left_value = left_sorted[i]
+        right_value = right_sorted[j]
+        if left_value < right_value:
+            if keep_left:
+                left_idx.append(left_order[i])
+                right_idx.append(-1)
+            i += 1
+        elif right_value < left_value:
+            if keep_right:
+                left_idx.append(-1)
+                right_idx.append(right_order[j])
+            j += 1
+        else:
+            # a run of equal keys on both sides pairs up as a cross product
+            i_end = i + 1
+            while i_end < n_left and left_sorted[i_end] == left_value:
+                i_end += 1
+            j_end = j + 1
+            while j_end < n_right and right_sorted[j_end] == right_value:
+                j_end += 1
+            run = right_order[j:j_end]
+            for row in left_order[i:i_end]:
+                left_idx.extend(repeat(row, len(run)))
+                right_idx.extend(run)
+            i, j = i_end, j_end
+    
+    if keep_left and i < n_left:
+        left_idx.extend(left_order[i:])
+        right_idx.extend(repeat(-1, n_left - i))
+    if keep_right and j < n_right:
+        left_idx.extend(repeat(-1, n_right - j))
+        right_idx.extend(right_order[j:])
+    return left_idx, right_idx
+
+
+def _category_ranks(left_col, right_col):
+    """
+    Code sequences of two categorical columns, renumbered by value order
+    
+    Every category of either dictionary gets its rank among all of them,
+    so equal values get equal numbers and numbers order like the values;
+    nulls stay -1 and order first.
+    """
+    try:
+        values = sorted(set(left_col.categories).union(right_col.categories))
+    except TypeError:
+        raise ValueError("Join keys mix types that cannot be ordered; use strategy='hash'") from None
+    rank = {value: i for i, value in enumerate(values)}
+    left_ranks = [rank[value] for value in left_col.categories] + [-1]
+    right_ranks = [rank[value] for value in right_col.categories] + [-1]
+    return (list(map(left_ranks.__getitem__, left_col.codes)),
+            list(map(right_ranks.__getitem__, right_col.codes)))
+
+
+def _key_index(df, on, keys):
+    """The persistent hash index behind a single-column join key, if any"""
+    if len(on) != 1:
+        return None
+    column = df.data[on[0]]
+    # categorical keys may have been translated to codes, which the index does not hold
+    return column.index if keys is column else None
+
+
+def _coalesce(left_col, right_col, left_idx):
+    """Take the left value, or the right one on rows without a left row"""
+    values = [left if i >= 0 else right for left, right, i in zip(left_col, right_col, left_idx)]
+    if left_col.dtype == 'category':
+        return CategoricalColumn.from_values(values)
+    return Column.from_values(values)
+
+
+def _sort_keys(keys):
+    """Return (row order, keys in that order) for a sort-merge join"""
+    if _is_sorted(keys):
+        return range(len(keys)), keys
+    try:
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+    except TypeError:
+        raise ValueError("Join keys mix types that cannot be ordered; use strategy='hash'") from None
+    return order, list(map(keys.__getitem__, order))
+
+
+def _has_nulls(keys):
+    """Check for None keys, or None inside multi-column keys"""
+    if len(keys) and isinstance(keys[0], tuple):
+        return any(None in key for key in keys)
+    return None in keys
+
+
+def _null_first(key):
+    """
+    Sort key placing None before every value
+    
+    Nulls then order (and compare equal to each other) without raising,
+    so they match each other like they do in a hash join.
+    """
+    if isinstance(key, tuple):
+        return tuple((value is not None, value) for value in key)
+    return (key is not None, key)
+
+
+def _is_sorted(keys):
+    """Check that keys are in non-decreasing order (False if they cannot be compared)"""
+    try:
+        return all(map(le, keys, islice(keys, 1, None)))
+    except TypeError:
+        return False
+
+
+def join_columns(left_columns, right_columns, how='inner', left_on=None, right_on=None,
+                 suffixes=('_x', '_y')):
+    """
+    Work out the output columns of a join
+    
+    A key column shared by name (the same name at the same position of
+    left_on and right_on) appears once; any other column present on both
+    sides gets the matching suffix.
+    
+    Args:
+        left_columns: column names of the left DataFrame
+        right_columns: column names of the right DataFrame
+        how: join type
+        left_on, right_on: key column name or list of names
+        suffixes: (left suffix, right suffix) for overlapping columns
+    
+    Returns:
+        list of (output name, side, source column) tuples, side being
+        'left' or 'right'
+    """
+    if how == 'right':
+        # a right join is a left join with the sides swapped
+        swapped = join_columns(right_columns, left_columns, 'left', right_on, left_on,
+                               (suffixes[1], suffixes[0]))
+        flip = {'left': 'right', 'right': 'left'}
+        return [(name, flip[side], source) for name, side, source in swapped]
+    
+    shared_keys = set()
+    if left_on is not None and right_on is not None:
+        shared_keys = {left for left, right in zip(_as_list(left_on), _as_list(right_on)) if left == right}
+    right_set = set(right_columns)
+    left_set = set(left_columns)
+    
+    result = []
+    for col in left_columns:
+        if col in right_set and col not in shared_keys:
+            result.append((col + suffixes[0], 'left', col))
+        else:
+            result.append((col, 'left', col))
+    for col in right_columns:
+        if col in shared_keys:
+            continue
+        if col in left_set:
+            result.append((col + suffixes[1], 'right', col))
+        else:
+            result.append((col, 'right', col))
+    return result
@@ -0,0 +1,416 @@
+"""
+Lazy Query Plans
+Records DataFrame operations as a logical plan, optimizes it and runs it
+on the eager mixin operations only when collected
+"""
+
+from .aggregation import _as_list, agg_columns
+from .joins import JOIN_STRATEGIES, join_columns
+
+
+class LazyFrame:
+    """
+    Deferred chain of DataFrame operations
+    
+    Built with DataFrame.lazy(); every method returns a new LazyFrame and
+    nothing runs until collect(). Before running, the plan is optimized:
+    chained filters are fused into one mask, filters are pushed below
+    projections, renames, sorts, joins and group-bys, and columns nobody
+    uses are pruned right after the scans so joins never copy them.
+    """
+    
+    def __init__(self, plan):
+        self.plan = plan
+    
+    @classmethod
+    def scan(cls, df):
+        """Start a plan reading from an existing DataFrame"""
+        return cls(Scan(df))
+    
+    @property
+    def columns(self):
+        """Output column names of the plan"""
+        return list(self.plan.columns)
+    
+    def filter(self, column, operator, value=None):
+        """Keep rows matching a predicate (see FilterMixin.filter)"""
+        if column not in self.plan.columns:
+            raise KeyError(f"Column '{column}' not found")
+        return LazyFrame(Filter(self.plan, [(column, operator, value)]))
+    
+    def select(self, *columns):
+        """Keep only the given columns"""
+        for col in columns:
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found")
+        return LazyFrame(Project(self.plan, list(columns)))
+    
+    def merge(self, other, left_on, right_on, how='inner', suffixes=('_x', '_y'), strategy='hash'):
+        """Join with another LazyFrame or DataFrame (see JoinMixin.merge)"""
+        if not isinstance(other, LazyFrame):
+            other = LazyFrame.scan(other)
+        for col in _as_list(left_on):
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found in left DataFrame")
+        for col in _as_list(right_on):
+            if col not in other.plan.columns:
+                raise KeyError(f"Column '{col}' not found in right DataFrame")
+        if len(_as_list(left_on)) != len(_as_list(right_on)):
+            raise ValueError("left_on and right_on must name the same number of columns")
+        if how not in ('inner', 'left', 'right', 'outer'):
+            raise ValueError(f"Unknown join type: {how}")
+        if strategy not in JOIN_STRATEGIES:
+            raise ValueError(f"Unknown join strategy: {strategy}")
+        return LazyFrame(Join(self.plan, other.plan, left_on, right_on, how, suffixes, strategy))
+    
+    def groupby(self, by_column):
+        """Group by a column (or list of columns); finish with .agg({...})"""
+        for col in _as_list(by_column):
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found")
+        return LazyGroupBy(self.plan, by_column)
+    
+    def sort_values(self, by, ascending=True):
+        """Order the rows (see SortMixin.sort_values)"""
+        by = _as_list(by)
+        for col in by:
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found")
+        orders = [ascending] * len(by) if isinstance(ascending, bool) else list(ascending)
+        if len(orders) != len(by):
+            raise ValueError("ascending must be a bool or have one entry per sort column")
+        return LazyFrame(Sort(self.plan, by, orders))
+    
+    def rename(self, column_map):
+        """Rename columns (see SelectionMixin.rename)"""
+        for col in column_map:
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found")
+        return LazyFrame(Rename(self.plan, dict(column_map)))
+    
+    def head(self, n=5):
+        """Keep the first n rows"""
+        return LazyFrame(Limit(self.plan, n))
+    
+    def optimize(self):
+        """Return the optimized plan"""
+        plan = push_filters(self.plan)
+        return prune_columns(plan, set(plan.columns))
+    
+    def explain(self, optimized=True):
+        """Describe the (optimized) plan as an indented tree"""
+        plan = self.optimize() if optimized else self.plan
+        return plan.explain()
+    
+    def collect(self):
+        """Optimize and run the plan, returning a DataFrame"""
+        return self.optimize().execute()
+    
+    def __repr__(self):
+        return f"LazyFrame\n{self.plan.explain()}"
+
+
+class LazyGroupBy:
+    """Pending group-by on a LazyFrame"""
+    
+    def __init__(self, plan, by_column):
+        self.plan = plan
+        self.by_column = by_column
+    
+    def agg(self, agg_dict):
+        """Aggregate each group (see GroupBy.agg)"""
+        for col in agg_dict:
+            if col not in self.plan.columns:
+                raise KeyError(f"Column '{col}' not found")
+        return LazyFrame(Aggregate(self.plan, self.by_column, dict(agg_dict)))
+
+
+class Scan:
+    """Leaf node reading an in-memory DataFrame"""
+    
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+    
+    def execute(self):
+        return self.df
+    
+    def explain(self, depth=0):
+        return "  " * depth + f"Scan [{len(self.df)} rows x {len(self.columns)} columns]"
+
+
+class Filter:
+    """Keep rows matching every predicate, evaluated into one fused mask"""
+    
+    def __init__(self, child, predicates):
+        self.child = child
+        self.predicates = list(predicates)
+        self.columns = child.columns
+    
+    def execute(self):
+        df = self.child.execute()
+        mask = None
+        for column, operator, value in self.predicates:
+            predicate_mask = df._create_mask(column, operator, value)
+            mask = predicate_mask if mask is None else mask & predicate_mask
+        return df[mask]
+    
+    def explain(self, depth=0):
+        preds = " AND ".join(f"{col} {op} {value!r}" for col, op, value in self.predicates)
+        return "  " * depth + f"Filter [{preds}]\n" + self.child.explain(depth + 1)
+
+
+class Project:
+    """Keep a subset of columns"""
+    
+    def __init__(self, child, columns):
+        self.child = child
+        self.columns = list(columns)
+    
+    def execute(self):
+        return self.child.execute()[self.columns]
+    
+    def explain(self, depth=0):
+        return "  " * depth + f"Project {self.columns}\n" + self.child.explain(depth + 1)
+
+
+class Join:
+    """
+    Join two plans
+    
+    naming holds the (output name, side, source column) triples the join
+    produces on the children's original schemas; it is kept when the
+    children are pruned so output names never change.
+    """
+    
+    def __init__(self, left, right, left_on, right_on, how, suffixes=('_x', '_y'),
+                 strategy='hash', naming=None):
+        self.left = left
+        self.right = right
+        self.left_on = left_on
+        self.right_on = right_on
+        self.how = how
+        self.suffixes = suffixes
+        self.strategy = strategy
+        if naming is None:
+            naming = join_columns(left.columns, right.columns, how, left_on, right_on, suffixes)
+        self.naming = naming
+        self.columns = [name for name, _, _ in naming]
+    
+    def execute(self):
+        left_df = self.left.execute()
+        right_df = self.right.execute()
+        result = left_df.merge(right_df, left_on=self.left_on, right_on=self.right_on,
+                               how=self.how, suffixes=self.suffixes, strategy=self.strategy)
+        
+        # pruned inputs may no longer overlap and so skip the suffixes,
+        # so map each output back to the name the full join would use
+        names = {(side, source): name for name, side, source in self.naming}
+        actual = join_columns(left_df.columns, right_df.columns, self.how,
+                              self.left_on, self.right_on, self.suffixes)
+        if [name for name, _, _ in actual] == self.columns:
+            return result
+        
+        data = {}
+        for name, side, source in actual:
+            if (side, source) in names:
+                data[names[(side, source)]] = result.data[name]
+        
+        from .dataframe import DataFrame
+        return DataFrame._from_columns(data, [name for name in self.columns if name in data])
+    
+    def explain(self, depth=0):
+        header = f"Join [{self.how} {self.strategy}: {self.left_on} = {self.right_on}]\n"
+        return ("  " * depth + header + self.left.explain(depth + 1) + "\n"
+                + self.right.explain(depth + 1))
+
+
+class Aggregate:
+    """Group by a column and aggregate"""
+    
+    def __init__(self, child, by_column, agg_dict):
+        self.child = child
+        self.by_column = by_column
+        self.agg_dict = agg_dict
+        self.columns = agg_columns(by_column, agg_dict)
+    
+    def execute(self):
+        return self.child.execute().groupby(self.by_column).agg(self.agg_dict)
+    
+    def explain(self, depth=0):
+        return ("  " * depth + f"Aggregate [by {self.by_column}: {self.agg_dict}]\n"
+                + self.child.explain(depth + 1))
+
+
+class Sort:
+    """Order the rows by some columns"""
+    
+    def __init__(self, child, by, ascending):
+        self.child = child
+        self.by = list(by)
+        self.ascending = list(ascending)
+        self.columns = child.columns
+    
+    def execute(self):
+        return self.child.execute().sort_values(self.by, self.ascending)
+    
+    def explain(self, depth=0):
+        keys = ", ".join(f"{col} {'ASC' if asc else 'DESC'}" for col, asc in zip(self.by, self.ascending))
+        return "  " * depth + f"Sort [{keys}]\n" + self.child.explain(depth + 1)
+
+
+class Rename:
+    """Rename columns"""
+    
+    def __init__(self, child, column_map):
+        self.child = child
+        self.column_map = column_map
+        self.columns = [column_map.get(col, col) for col in child.columns]
+    
+    def execute(self):
+        return self.child.execute().rename(self.column_map)
+    
+    def explain(self, depth=0):
+        return "  " * depth + f"Rename {self.column_map}\n" + self.child.explain(depth + 1)
+
+
+class Limit:
+    """Keep the first n rows"""
+    
+    def __init__(self, child, n):
+        self.child = child
+        self.n = n
+        self.columns = child.columns
+    
+    def execute(self):
+        return self.child.execute().head(self.n)
+    
+    def explain(self, depth=0):
+        return "  " * depth + f"Limit [{self.n}]\n" + self.child.explain(depth + 1)
+
+
+def _with_filter(node, predicates):
+    """Put a Filter on top of node if there are predicates left"""
+    return Filter(node, predicates) if predicates else node
+
+
+def push_filters(node, predicates=()):
+    """
+    Move filter predicates as close to the scans as possible
+    
+    Consecutive filters are fused into one, filters pass through
+    projections, renames and sorts, predicates on one side of a join move
+    into that side (when the join type allows it) and predicates on the
+    group-by columns run before aggregating.
+    """
+    predicates = list(predicates)
+    
+    if isinstance(node, Filter):
+        return push_filters(node.child, predicates + node.predicates)
+    
+    if isinstance(node, Project):
+        return Project(push_filters(node.child, predicates), node.columns)
+    
+    if isinstance(node, Join):
+        sources = {name: (side, source) for name, side, source in node.naming}
+        left_to_right = dict(zip(_as_list(node.left_on), _as_list(node.right_on)))
+        right_to_left = dict(zip(_as_list(node.right_on), _as_list(node.left_on)))
+        left_preds, right_preds, remaining = [], [], []
+        for column, operator, value in predicates:
+            side, source = sources[column]
+            if side == 'left' and node.how in ('inner', 'left'):
+                left_preds.append((source, operator, value))
+                # on an inner join the key matches on both sides, so filter both
+                if node.how == 'inner' and source in left_to_right:
+                    right_preds.append((left_to_right[source], operator, value))
+            elif side == 'right' and node.how in ('inner', 'right'):
+                right_preds.append((source, operator, value))
+                if node.how == 'inner' and source in right_to_left:
+                    left_preds.append((right_to_left[source], operator, value))
+            else:
+                remaining.append((column, operator, value))
+        
+        left = push_filters(node.left, left_preds)
+        right = push_filters(node.right, right_preds)
+        joined = Join(left, right, node.left_on, node.right_on, node.how, node.suffixes,
+                      node.strategy, node.naming)
+        return _with_filter(joined, remaining)
+    
+    if isinstance(node, Aggregate):
+        by_columns = _as_list(node.by_column)
+        below = [pred for pred in predicates if pred[0] in by_columns]
+        above = [pred for pred in predicates if pred[0] not in by_columns]
+        child = push_filters(node.child, below)
+        return _with_filter(Aggregate(child, node.by_column, node.agg_dict), above)
+    
+    if isinstance(node, Sort):
+        # filtering keeps the row order, so it can run before sorting
+        return Sort(push_filters(node.child, predicates), node.by, node.ascending)
+    
+    if isinstance(node, Rename):
+        original = {new: old for old, new in node.column_map.items()}
+        predicates = [(original.get(column, column), operator, value)
+                      for column, operator, value in predicates]
+        return Rename(push_filters(node.child, predicates), node.column_map)
+    
+    if isinstance(node, Limit):
+        # filtering after a limit is not the same as before it
+        return _with_filter(Limit(push_filters(node.child), node.n), predicates)
+    
+    return _with_filter(node, predicates)
+
+
+def prune_columns(node, required):
+    """
+    Drop columns that no operator above needs
+    
+    Args:
+        node: plan node
+        required: set of output column names needed by the parent
+    
+    Returns:
+        plan node producing at least the required columns
+    """
+    if isinstance(node, Scan):
+        keep = [col for col in node.columns if col in required]
+        if len(keep) < len(node.columns):
+            return Project(node, keep)
+        return node
+    
+    if isinstance(node, Filter):
+        needed = required | {column for column, _, _ in node.predicates}
+        child = prune_columns(node.child, needed)
+        return Filter(child, node.predicates)
+    
+    if isinstance(node, Project):
+        keep = [col for col in node.columns if col in required]
+        child = prune_columns(node.child, set(keep))
+        if child.columns == keep:
+            return child
+        return Project(child, keep)
+    
+    if isinstance(node, Join):
+        naming = [entry for entry in node.naming if entry[0] in required]
+        left_needed = {source for _, side, source in naming if side == 'left'} | set(_as_list(node.left_on))
+        right_needed = {source for _, side, source in naming if side == 'right'} | set(_as_list(node.right_on))
+        left = prune_columns(node.left, left_needed)
+        right = prune_columns(node.right, right_needed)
+        return Join(left, right, node.left_on, node.right_on, node.how, node.suffixes,
+                    node.strategy, naming)
+    
+    if isinstance(node, Aggregate):
+        needed = set(_as_list(node.by_column)) | set(node.agg_dict)
+        return Aggregate(prune_columns(node.child, needed), node.by_column, node.agg_dict)
+    
+    if isinstance(node, Sort):
+        return Sort(prune_columns(node.child, required | set(node.by)), node.by, node.ascending)
+    
+    if isinstance(node, Rename):
+        original = {new: old for old, new in node.column_map.items()}
+        child = prune_columns(node.child, {original.get(col, col) for col in required})
+        return Rename(child, {old: new for old, new in node.column_map.items() if old in child.columns})
+    
+    if isinstance(node, Limit):
+        return Limit(prune_columns(node.child, required), node.n)
+    
+    return node
@@ -3,8 +3,30 @@ CSV Parser Module
 Handles reading and parsing CSV files
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .columns import Column, CategoricalColumn
+
+DEFAULT_CHUNK_ROWS = 65536
+READ_BUFFER_SIZE = 1 << 20
+INFER_SAMPLE_ROWS = 100
+
+# files with less data than this are parsed in-process even when workers are asked for
+PARALLEL_MIN_BYTES = 1 << 20
+
+# column types understood by the parser, keyed by every accepted spelling
+DTYPES = {
+    int: 'int', 'int': 'int',
+    float: 'float', 'float': 'float',
+    str: 'str', 'str': 'str',
+    'category': 'category',
+}
+
+
 class CSVParser:
-    def __init__(self, filepath, delimiter=',', columns=None):
+    def __init__(self, filepath, delimiter=',', columns=None, dtypes=None, categorical_threshold=None):
         """
         Initialize CSV Parser
         
@@ -12,32 +34,131 @@ class CSVParser:
             filepath: path to CSV file
             delimiter: character separating values
             columns: if None, use first line as headers
+            dtypes: optional dict mapping column name to 'int', 'float',
+                    'str' (or the builtin types) or 'category'; skips type
+                    inference for the plain types
+            categorical_threshold: if set, text columns whose ratio of
+                    distinct values to rows is at most this are
+                    dictionary-encoded (e.g. 0.5 = every value repeats
+                    twice on average)
         """
         self.filepath = filepath
         self.delimiter = delimiter
         self.columns = columns
+        self.header = columns
+        self.dtypes = {}
+        for col, dtype in (dtypes or {}).items():
+            if dtype not in DTYPES:
+                raise ValueError(f"Unknown dtype for column '{col}': {dtype}")
+            self.dtypes[col] = DTYPES[dtype]
+        
+        # types inferred so far, promoted as later chunks need it
+        self.inferred_dtypes = {}
+        
+        # columns chosen for dictionary encoding, decided on their first chunk
+        self.categorical_threshold = categorical_threshold
+        self.categorical_columns = {col for col, dtype in self.dtypes.items() if dtype == 'category'}
+        self._encoding_decided = set(self.categorical_columns)
     
-    def parse_line(self, line):
-        """Parse a single line into values"""
+    def split_line(self, line):
+        """Split a single line into raw string values"""
+        # fast path: no quoting, a plain split is enough
+        if '"' not in line:
+            return list(map(str.strip, line.split(self.delimiter)))
+        return self._split_quoted(line)
+    
+    def _split_quoted(self, line):
+        """
+        Split a line containing quoted fields
+        
+        A field is quoted when it starts with '"'; inside it delimiters and
+        newlines are literal and '""' stands for one '"'. Quotes appearing
+        in the middle of an unquoted field are kept as-is.
+        """
         values = []
-        current_value = ''
-        in_quotes = False
-        
-        for ch in line:
-            if ch == '"':
-                in_quotes = not in_quotes
-            elif ch == self.delimiter and not in_quotes:
-                values.append(self._convert_type(current_value.strip()))
-                current_value = ''
+        delimiter = self.delimiter
+        length = len(line)
+        pos = 0
+        
+        while True:
+            start = pos
+            while pos < length and line[pos] in ' \t':
+                pos += 1
+            
+            if pos < length and line[pos] == '"':
+                pieces = []
+                pos += 1
+                while True:
+                    quote = line.find('"', pos)
+                    if quote == -1: # unterminated quote, take the rest of the line
+                        pieces.append(line[pos:])
+                        pos = length
+                        break
+                    pieces.append(line[pos:quote])
+                    if line.startswith('"', quote + 1): # escaped quote
+                        pieces.append('"')
+                        pos = quote + 2
+                    else:
+                        pos = quote + 1
+                        break
+                
+                end = line.find(delimiter, pos)
+                if end == -1:
+                    end = length
+                # tolerate stray characters between the closing quote and the delimiter
+                value = ''.join(pieces) + line[pos:end].strip()
             else:
-                current_value += ch
+                end = line.find(delimiter, start)
+                if end == -1:
+                    end = length
+                value = line[start:end].strip()
+            
+            values.append(value)
+            if end >= length:
+                return values
+            pos = end + 1
+    
+    def _ends_in_quoted_field(self, text):
+        """
+        True when text stops inside a quoted field that has not closed yet
+        
+        Scans field by field like _split_quoted: only a quote opening a
+        field starts quoting, quotes inside unquoted fields are plain text.
+        """
+        delimiter = self.delimiter
+        length = len(text)
+        pos = 0
         
-        # Add last value
-        values.append(self._convert_type(current_value.strip()))
-        return values
+        while True:
+            while pos < length and text[pos] in ' \t':
+                pos += 1
+            
+            if pos < length and text[pos] == '"':
+                pos += 1
+                while True:
+                    quote = text.find('"', pos)
+                    if quote == -1:
+                        return True
+                    if text.startswith('"', quote + 1): # escaped quote
+                        pos = quote + 2
+                    else:
+                        pos = quote + 1
+                        break
+            
+            end = text.find(delimiter, pos)
+            if end == -1:
+                return False
+            pos = end + 1
+    
+    def parse_line(self, line):
+        """Parse a single line into values"""
+        return [self._convert_type(value) for value in self.split_line(line)]
     
     def _convert_type(self, value):
         """Convert string to appropriate type"""
+        if value is None:
+            return None
+        
         value = value.strip()
         
         # Remove quotes
@@ -58,33 +179,404 @@ class CSVParser:
         
         return value
     
-    def read_csv(self):
+    def _iter_records(self, file):
         """
-        Read and parse CSV file
+        Yield stripped, non-empty records from an open file
+        
+        A line ending inside a quoted field is joined with the following lines
+        until that field closes, so embedded newlines stay in the value.
+        """
+        pending = None
+        for line in file:
+            if pending is not None:
+                pending += line
+                if self._ends_in_quoted_field(pending):
+                    continue
+                line, pending = pending, None
+            elif '"' in line and self._ends_in_quoted_field(line):
+                pending = line
+                continue
+            
+            line = line.strip()
+            if line:
+                yield line
+        
+        if pending is not None and pending.strip():
+            yield pending.strip()
+    
+    def _pivot(self, rows, columns):
+        """
+        Turn a list of parsed rows into a column-oriented dict
+        
+        Short rows are padded with None, extra values are dropped.
+        """
+        width = len(columns)
+        for i, row in enumerate(rows):
+            if len(row) != width:
+                rows[i] = (row + [None] * width)[:width]
+        
+        if not rows:
+            return {col: [] for col in columns}
+        return {col: list(values) for col, values in zip(columns, zip(*rows))}
+    
+    def _infer_dtype(self, values):
+        """
+        Guess a column type from a sample of raw values
+        
+        Returns 'int', 'float', 'str', or 'mixed' when the sample holds
+        both numbers and text (converted cell by cell, like before).
+        """
+        numeric = 0
+        is_int = True
+        for value in values[:INFER_SAMPLE_ROWS]:
+            try:
+                int(value)
+                numeric += 1
+                continue
+            except (TypeError, ValueError):
+                is_int = False
+            try:
+                float(value)
+                numeric += 1
+            except (TypeError, ValueError):
+                pass
+        
+        if numeric == 0:
+            return 'str'
+        if numeric < min(len(values), INFER_SAMPLE_ROWS):
+            return 'mixed'
+        return 'int' if is_int else 'float'
+    
+    def _convert_column(self, column, values):
+        """
+        Convert a whole column of raw strings in bulk
+        
+        Explicit dtypes are enforced strictly (empty cells become None).
+        Inferred types are promoted int -> float -> mixed when a value
+        does not fit, and the promotion sticks for later chunks.
+        """
+        dtype = self.dtypes.get(column)
+        if dtype is not None and dtype != 'category':
+            if dtype == 'str':
+                return values
+            convert = int if dtype == 'int' else float
+            try:
+                return [convert(value) if value else None for value in values]
+            except ValueError as e:
+                raise ValueError(f"Column '{column}': {e}") from None
+        
+        dtype = self.inferred_dtypes.get(column)
+        if dtype is None:
+            dtype = self._infer_dtype(values)
+        
+        if dtype == 'int':
+            try:
+                converted = list(map(int, values))
+                self.inferred_dtypes[column] = 'int'
+                return converted
+            except (TypeError, ValueError):
+                dtype = 'float'
+        
+        if dtype == 'float':
+            try:
+                converted = list(map(float, values))
+                self.inferred_dtypes[column] = 'float'
+                return converted
+            except (TypeError, ValueError):
+                dtype = 'mixed'
+        
+        self.inferred_dtypes[column] = dtype
+        if dtype == 'str':
+            return values
+        return list(map(self._convert_type, values))
+    
+    def iter_chunks(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Stream the CSV file as column-oriented chunks
+        
+        Only one chunk of rows is held in memory at a time, so files
+        larger than RAM can be processed with bounded memory.
+        
+        Args:
+            chunk_rows: maximum number of rows per chunk
+        
+        Yields:
+            dict mapping column name to a list of values for that chunk
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be a positive integer")
+        
+        with open(self.filepath, 'r', encoding='utf-8', buffering=READ_BUFFER_SIZE) as file:
+            lines = self._iter_records(file)
+            
+            # Get column names
+            if self.columns is None:
+                first = next(lines, None)
+                if first is None:
+                    return
+                self.header = self.split_line(first)
+            columns = self.header
+            
+            self._check_dtypes(columns)
+            yield from self._iter_row_chunks(lines, columns, chunk_rows)
+    
+    def _check_dtypes(self, columns):
+        """Fail on explicit dtypes given for columns the file does not have"""
+        unknown = [col for col in self.dtypes if col not in columns]
+        if unknown:
+            raise KeyError(f"Column '{unknown[0]}' not found")
+    
+    def _iter_row_chunks(self, lines, columns, chunk_rows):
+        """Split records into rows and yield them as converted column chunks"""
+        rows = []
+        for line in lines:
+            rows.append(self.split_line(line))
+            if len(rows) >= chunk_rows:
+                yield self._convert_chunk(rows, columns)
+                rows = []
+        
+        if rows:
+            yield self._convert_chunk(rows, columns)
+    
+    def _convert_chunk(self, rows, columns):
+        """Pivot raw rows into columns and convert each column in bulk"""
+        chunk = self._pivot(rows, columns)
+        return {col: self._convert_column(col, values) for col, values in chunk.items()}
+    
+    def iter_column_chunks(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Stream the CSV file as chunks of typed Column objects
+        
+        Same as iter_chunks, but every column is packed into typed storage
+        and low-cardinality text columns are dictionary-encoded when
+        categorical_threshold is set.
+        
+        Yields:
+            dict mapping column name to a Column for that chunk
+        """
+        for chunk in self.iter_chunks(chunk_rows):
+            yield {col: self._pack_column(col, values) for col, values in chunk.items()}
+    
+    def iter_range_chunks(self, workers):
+        """
+        Parse the CSV file in parallel worker processes
+        
+        The data is split into one byte range per worker, each range
+        starting at a line boundary. Every worker parses its range like
+        iter_column_chunks would and returns it as one chunk. Column types
+        are inferred once from the first rows and handed to every worker,
+        and a column dictionary-encoded in the first range is
+        dictionary-encoded in all of them.
+        
+        Range boundaries are placed at newlines, which may fall inside a
+        quoted field. Every worker reports whether its range ends inside
+        an open quoted field; ranges are parsed from a real record start
+        up to the first one that does, and the data from that range on is
+        then parsed again in this process, so no record is ever split.
+        
+        Args:
+            workers: number of worker processes
+        
+        Yields:
+            dict mapping column name to a Column, one per range in file order
+        """
+        if workers < 1:
+            raise ValueError("workers must be a positive integer")
+        
+        columns, data_start, sample = self._read_head()
+        if columns is None:
+            return
+        self.header = columns
+        self._check_dtypes(columns)
+        
+        seed = self._pivot([self.split_line(line) for line in sample], columns)
+        for col, values in seed.items():
+            if values and self.dtypes.get(col, 'category') == 'category':
+                self.inferred_dtypes[col] = self._infer_dtype(values)
+        
+        bounds = self._range_bounds(data_start, workers)
+        if len(bounds) < 3 or bounds[-1] - data_start < PARALLEL_MIN_BYTES:
+            # too little data to be worth starting processes for
+            yield from _parse_range(self, bounds[0], bounds[-1])[0]
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_parse_range, self, start, end)
+                       for start, end in zip(bounds, bounds[1:])]
+            categorical = None
+            for i, future in enumerate(futures):
+                chunks, ends_in_quote = future.result()
+                if ends_in_quote and i < len(futures) - 1:
+                    # a quoted field runs across the next boundary: this range
+                    # still starts on a record, parse the rest from there here
+                    for pending in futures[i + 1:]:
+                        pending.cancel()
+                    chunks = _parse_range(self, bounds[i], bounds[-1])[0]
+                for chunk in chunks:
+                    if categorical is None: # the first range decides, as for a sequential read
+                        categorical = {col for col, column in chunk.items() if column.dtype == 'category'}
+                    yield {col: CategoricalColumn.from_values(list(column))
+                            if col in categorical and column.dtype != 'category' else column
+                            for col, column in chunk.items()}
+                if ends_in_quote:
+                    return
+    
+    def _read_head(self):
+        """
+        Read the header record and a sample of the first records
         
         Returns:
-            tuple: (columns, data) where data is list of lists
+            tuple: (column names or None for an empty file, byte offset
+            where the data starts, list of sample records)
         """
-        with open(self.filepath, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
+        consumed = 0
         
-        if not lines:
-            return [], []
+        def lines(file):
+            nonlocal consumed
+            for raw in file:
+                consumed += len(raw)
+                yield raw.decode('utf-8')
         
-        # Get column names
-        if self.columns is None:
-            columns = self.parse_line(lines[0])
-            start = 1
-        else:
+        with open(self.filepath, 'rb', buffering=READ_BUFFER_SIZE) as file:
+            records = self._iter_records(lines(file))
             columns = self.columns
-            start = 0
+            if columns is None:
+                first = next(records, None)
+                if first is None:
+                    return None, consumed, []
+                columns = self.split_line(first)
+            data_start = consumed
+            sample = list(islice(records, INFER_SAMPLE_ROWS))
+        return columns, data_start, sample
+    
+    def _range_bounds(self, data_start, count):
+        """
+        Split the data into up to count byte ranges starting on line boundaries
         
-        # Parse data rows
-        data = []
-        for line in lines[start:]:
-            line = line.strip()
-            if line:
-                row = self.parse_line(line)
-                data.append(row)
+        Returns:
+            sorted list of offsets; range i is [bounds[i], bounds[i + 1])
+        """
+        size = os.path.getsize(self.filepath)
+        bounds = [data_start]
+        with open(self.filepath, 'rb') as file:
+            for i in range(1, count):
+                file.seek(max(data_start + (size - data_start) * i // count - 1, bounds[-1]))
+                file.readline() # move on to the start of the next line
+                offset = file.tell()
+                if offset >= size:
+                    break
+                if offset > bounds[-1]:
+                    bounds.append(offset)
+        bounds.append(size)
+        return bounds
+    
+    def _pack_column(self, column, values):
+        """Pack converted values into a Column, dictionary-encoding if chosen"""
+        if column not in self._encoding_decided and values:
+            self._encoding_decided.add(column)
+            if (self.categorical_threshold is not None
+                    and self.inferred_dtypes.get(column) == 'str'
+                    and len(set(values)) <= self.categorical_threshold * len(values)):
+                self.categorical_columns.add(column)
+        
+        if column in self.categorical_columns:
+            return CategoricalColumn.from_values(values)
+        return Column.from_values(values)
+    
+    def read_columns(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Read the whole CSV file straight into column-oriented storage
+        
+        Returns:
+            tuple: (columns, data) where data is a dict of lists
+        """
+        data = None
+        for chunk in self.iter_chunks(chunk_rows):
+            if data is None:
+                data = chunk
+            else:
+                for col, values in chunk.items():
+                    data[col].extend(values)
         
+        columns = list(self.header) if self.header is not None else []
+        if data is None:
+            data = {col: [] for col in columns}
         return columns, data
+    
+    def read_csv(self):
+        """
+        Read and parse CSV file
+        
+        Returns:
+            tuple: (columns, data) where data is list of lists
+        """
+        columns, data = self.read_columns()
+        rows = [list(row) for row in zip(*(data[col] for col in columns))]
+        return columns, rows
+
+
+def _parse_range(parser, start, end):
+    """
+    Parse the records in bytes [start, end) of the parser's file
+    
+    Runs in a worker process. start must be a record boundary.
+    
+    Returns:
+        tuple: (list holding one dict mapping column name to a Column,
+        empty when the range holds no records; True when the range ends
+        inside a quoted field, so its last record is cut short)
+    """
+    last = None
+    
+    def tracked(records):
+        nonlocal last
+        for last in records:
+            yield last
+    
+    parts = {}
+    with open(parser.filepath, 'rb', buffering=READ_BUFFER_SIZE) as file:
+        records = tracked(parser._iter_records(_read_lines(file, start, end)))
+        for chunk in parser._iter_row_chunks(records, parser.header, DEFAULT_CHUNK_ROWS):
+            for col, values in chunk.items():
+                parts.setdefault(col, []).append(parser._pack_column(col, values))
+    
+    ends_in_quote = last is not None and '"' in last and parser._ends_in_quoted_field(last)
+    if not parts:
+        return [], ends_in_quote
+    return [{col: Column.concat(parts[col]) for col in parser.header}], ends_in_quote
+
+
+def _read_lines(file, start, end):
+    """
+    Yield the lines (with their newline) in bytes [start, end) of a binary file
+    
+    Reads and decodes whole blocks cut at their last newline, which is much
+    faster than decoding line by line.
+    """
+    file.seek(start)
+    remaining = end - start
+    carry = b''
+    while remaining > 0:
+        block = file.read(min(READ_BUFFER_SIZE, remaining))
+        if not block:
+            break
+        remaining -= len(block)
+        block = carry + block
+        cut = block.rfind(b'\n') + 1
+        if remaining > 0 and cut:
+            block, carry = block[:cut], block[cut:]
+        elif remaining > 0:
+            carry = block
+            continue
+        else:
+            carry = b''
+        
+        lines = block.decode('utf-8').split('\n')
+        last = lines.pop()
+        for line in lines:
+            yield line + '\n'
+        if last:
+            yield last
+    
+    if carry:
+        yield carry.decode('utf-8')
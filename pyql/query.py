@@ -0,0 +1,590 @@
+"""
+SQL Query Front End
+Parses a SELECT statement and compiles it onto a lazy query plan
+
+Supported grammar (keywords are case-insensitive):
+    
+    SELECT * | table.* | column | aggregate [[AS] alias], ...
+    FROM table [[AS] alias]
+    [[INNER | LEFT | RIGHT | FULL] [OUTER] JOIN table [[AS] alias]
+        ON a.column = b.column [AND ...]] ...
+    [WHERE predicate [AND predicate ...]]
+    [GROUP BY column, ...]
+    [ORDER BY column | alias | aggregate | position [ASC | DESC], ...]
+    [LIMIT n]
+
+Aggregates are COUNT(*), COUNT(column), COUNT(DISTINCT column), SUM, AVG,
+MIN, MAX, STDDEV, VARIANCE, FIRST and LAST. A predicate compares a column
+with literals: =, !=, <>, <, <=, >, >=, IN (...), BETWEEN low AND high,
+IS NULL, and LIKE with a 'text%' (prefix) or '%text%' (substring)
+pattern. Predicates can only be combined with AND, so every one of them
+can be pushed down the plan like a chained DataFrame.filter.
+"""
+
+import re
+from collections import namedtuple
+
+from .lazy import LazyFrame
+
+# parsed statement
+Query = namedtuple('Query', 'items table alias joins where group_by order_by limit')
+SelectItem = namedtuple('SelectItem', 'expr alias')
+Star = namedtuple('Star', 'table')
+ColumnRef = namedtuple('ColumnRef', 'table name')
+AggregateRef = namedtuple('AggregateRef', 'func column label')
+JoinClause = namedtuple('JoinClause', 'table alias how pairs')
+Predicate = namedtuple('Predicate', 'column operator value')
+OrderItem = namedtuple('OrderItem', 'key ascending')
+
+# SQL aggregate -> GroupBy.agg function
+AGGREGATES = {
+    'COUNT': 'count',
+    'SUM': 'sum',
+    'AVG': 'mean',
+    'MEAN': 'mean',
+    'MIN': 'min',
+    'MAX': 'max',
+    'STDDEV': 'std',
+    'STD': 'std',
+    'VARIANCE': 'var',
+    'VAR': 'var',
+    'FIRST': 'first',
+    'LAST': 'last',
+}
+
+COMPARISONS = {'=': '==', '==': '==', '!=': '!=', '<>': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+# a literal on the left of a comparison flips it
+FLIPPED = {'==': '==', '!=': '!=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+JOIN_TYPES = {'INNER': 'inner', 'LEFT': 'left', 'RIGHT': 'right', 'FULL': 'outer'}
+
+# words that end an expression, so they are never taken as an alias
+RESERVED = {
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'BY', 'ORDER', 'LIMIT', 'JOIN', 'INNER', 'LEFT',
+    'RIGHT', 'FULL', 'OUTER', 'ON', 'AND', 'OR', 'NOT', 'AS', 'ASC', 'DESC', 'IN',
+    'BETWEEN', 'IS', 'NULL', 'LIKE', 'DISTINCT', 'HAVING', 'TRUE', 'FALSE', 'OFFSET',
+}
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<symbol><>|!=|==|<=|>=|[=<>(),.*;-])
+""", re.VERBOSE)
+
+Token = namedtuple('Token', 'kind value position')
+
+
+def sql(query, tables=None, lazy=False):
+    """
+    Run a SQL query against DataFrames
+    
+    The statement is compiled onto a LazyFrame plan, so filters are pushed
+    below joins and group-bys and unused columns are pruned at the scans.
+    
+    Args:
+        query: SELECT statement (see the module docstring for the grammar)
+        tables: dict mapping table names used in the query to DataFrames
+                (or LazyFrames)
+        lazy: return the LazyFrame plan instead of running it
+    
+    Returns:
+        DataFrame with the result (LazyFrame when lazy is set)
+    """
+    plan = compile_query(parse_query(query), tables or {})
+    return plan if lazy else plan.collect()
+
+
+def tokenize(text):
+    """
+    Split a query into tokens
+    
+    Returns:
+        list of Token (kind is 'number', 'string', 'name', 'quoted' for a
+        quoted identifier, or 'symbol'), ending with an 'end' token
+    """
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"SQL syntax error at position {position}: unexpected {text[position]!r}")
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'quoted': # "name" or `name` is an identifier, whatever it contains
+            value = value[1:-1].replace('""', '"') if value[0] == '"' else value[1:-1]
+            tokens.append(Token('quoted', value, position))
+        elif kind == 'string':
+            tokens.append(Token(kind, value[1:-1].replace("''", "'"), position))
+        elif kind != 'space':
+            tokens.append(Token(kind, value, position))
+        position = match.end()
+    tokens.append(Token('end', None, position))
+    return tokens
+
+
+def parse_query(text):
+    """Parse a SELECT statement into a Query"""
+    return _Parser(tokenize(text)).query()
+
+
+class _Parser:
+    """Recursive descent parser over a token list"""
+    
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+    
+    @property
+    def token(self):
+        return self.tokens[self.pos]
+    
+    def error(self, message):
+        token = self.token
+        found = 'end of query' if token.kind == 'end' else repr(token.value)
+        return ValueError(f"SQL syntax error at position {token.position}: {message}, found {found}")
+    
+    def advance(self):
+        token = self.token
+        self.pos += 1
+        return token
+    
+    def is_keyword(self, *words):
+        return self.token.kind == 'name' and self.token.value.upper() in words
+    
+    def accept_keyword(self, *words):
+        if self.is_keyword(*words):
+            return self.advance().value.upper()
+        return None
+    
+    def expect_keyword(self, word):
+        if not self.accept_keyword(word):
+            raise self.error(f"expected {word}")
+    
+    def symbol_at(self, offset, symbol):
+        """True when the token offset places ahead is the given symbol"""
+        token = self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+        return token.kind == 'symbol' and token.value == symbol
+    
+    def accept(self, symbol):
+        if self.token.kind == 'symbol' and self.token.value == symbol:
+            self.advance()
+            return True
+        return False
+    
+    def expect(self, symbol):
+        if not self.accept(symbol):
+            raise self.error(f"expected '{symbol}'")
+    
+    def is_identifier(self):
+        token = self.token
+        return token.kind == 'quoted' or (token.kind == 'name' and token.value.upper() not in RESERVED)
+    
+    def identifier(self):
+        if self.is_identifier():
+            return self.advance().value
+        raise self.error("expected a name")
+    
+    def alias(self):
+        """Optional [AS] alias"""
+        if self.accept_keyword('AS') or self.is_identifier():
+            return self.identifier()
+        return None
+    
+    def query(self):
+        self.expect_keyword('SELECT')
+        if self.is_keyword('DISTINCT'):
+            raise self.error("SELECT DISTINCT is not supported (use GROUP BY)")
+        items = [self.select_item()]
+        while self.accept(','):
+            items.append(self.select_item())
+        
+        self.expect_keyword('FROM')
+        table = self.identifier()
+        alias = self.alias()
+        
+        joins = []
+        while self.is_keyword('JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER'):
+            joins.append(self.join())
+        
+        where = []
+        if self.accept_keyword('WHERE'):
+            where.append(self.predicate())
+            while self.accept_keyword('AND'):
+                where.append(self.predicate())
+            if self.is_keyword('OR'):
+                raise self.error("OR is not supported, predicates can only be combined with AND")
+        
+        group_by = []
+        if self.accept_keyword('GROUP'):
+            self.expect_keyword('BY')
+            group_by.append(self.column())
+            while self.accept(','):
+                group_by.append(self.column())
+        if self.is_keyword('HAVING'):
+            raise self.error("HAVING is not supported")
+        
+        order_by = []
+        if self.accept_keyword('ORDER'):
+            self.expect_keyword('BY')
+            order_by.append(self.order_item())
+            while self.accept(','):
+                order_by.append(self.order_item())
+        
+        limit = None
+        if self.accept_keyword('LIMIT'):
+            if self.token.kind != 'number' or not self.token.value.isdigit():
+                raise self.error("expected a row count after LIMIT")
+            limit = int(self.advance().value)
+        
+        self.accept(';')
+        if self.token.kind != 'end':
+            raise self.error("expected end of query")
+        return Query(items, table, alias, joins, where, group_by, order_by, limit)
+    
+    def select_item(self):
+        if self.accept('*'):
+            return SelectItem(Star(None), None)
+        if self.token.kind in ('name', 'quoted') and self.symbol_at(1, '.') and self.symbol_at(2, '*'):
+            table = self.advance().value
+            self.pos += 2
+            return SelectItem(Star(table), None)
+        return SelectItem(self.expression(), self.alias())
+    
+    def expression(self):
+        """Column reference or aggregate call"""
+        token = self.token
+        if token.kind == 'name' and token.value.upper() in AGGREGATES and self.symbol_at(1, '('):
+            name = self.advance().value.upper()
+            self.expect('(')
+            if name == 'COUNT' and self.accept('*'):
+                self.expect(')')
+                return AggregateRef('size', None, 'count(*)')
+            func = AGGREGATES[name]
+            distinct = self.accept_keyword('DISTINCT')
+            if distinct and name != 'COUNT':
+                raise self.error("DISTINCT is only supported inside COUNT")
+            column = self.column()
+            self.expect(')')
+            label = f"{name.lower()}({'distinct ' if distinct else ''}{_label(column)})"
+            return AggregateRef('nunique' if distinct else func, column, label)
+        return self.column()
+    
+    def column(self):
+        name = self.identifier()
+        if self.accept('.'):
+            return ColumnRef(name, self.identifier())
+        return ColumnRef(None, name)
+    
+    def join(self):
+        how = 'inner'
+        word = self.accept_keyword('INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER')
+        if word == 'OUTER':
+            how = 'outer'
+        elif word is not None:
+            how = JOIN_TYPES[word]
+            if word != 'INNER':
+                self.accept_keyword('OUTER')
+        self.expect_keyword('JOIN')
+        
+        table = self.identifier()
+        alias = self.alias()
+        self.expect_keyword('ON')
+        pairs = [self.join_condition()]
+        while self.accept_keyword('AND'):
+            pairs.append(self.join_condition())
+        return JoinClause(table, alias, how, pairs)
+    
+    def join_condition(self):
+        left = self.column()
+        if not (self.accept('=') or self.accept('==')):
+            raise self.error("join conditions must be column = column")
+        return left, self.column()
+    
+    def literal(self):
+        token = self.token
+        if token.kind == 'number':
+            self.advance()
+            return _number(token.value)
+        if token.kind == 'symbol' and token.value == '-' and self.tokens[self.pos + 1].kind == 'number':
+            self.advance()
+            return -_number(self.advance().value)
+        if token.kind == 'string':
+            return self.advance().value
+        word = self.accept_keyword('TRUE', 'FALSE', 'NULL')
+        if word == 'NULL':
+            raise ValueError(f"SQL syntax error at position {token.position}: "
+                             f"comparisons with NULL never match, use IS NULL")
+        if word is not None:
+            return word == 'TRUE'
+        raise self.error("expected a literal value")
+    
+    def is_literal(self):
+        token = self.token
+        return (token.kind in ('number', 'string') or self.is_keyword('TRUE', 'FALSE', 'NULL')
+                or (token.kind == 'symbol' and token.value == '-'))
+    
+    def predicate(self):
+        if self.is_literal(): # 5 < column
+            value = self.literal()
+            operator = self.comparison()
+            return Predicate(self.column(), FLIPPED[operator], value)
+        
+        column = self.column()
+        if self.accept_keyword('IS'):
+            if self.is_keyword('NOT'):
+                raise self.error("IS NOT NULL is not supported")
+            self.expect_keyword('NULL')
+            return Predicate(column, 'is_null', None)
+        if self.is_keyword('NOT'):
+            raise self.error("NOT is not supported")
+        if self.accept_keyword('IN'):
+            self.expect('(')
+            values = [self.literal()]
+            while self.accept(','):
+                values.append(self.literal())
+            self.expect(')')
+            return Predicate(column, 'in', values)
+        if self.accept_keyword('BETWEEN'):
+            low = self.literal()
+            self.expect_keyword('AND')
+            return Predicate(column, 'between', (low, self.literal()))
+        if self.accept_keyword('LIKE'):
+            if self.token.kind != 'string':
+                raise self.error("expected a pattern after LIKE")
+            return _like(column, self.advance())
+        
+        operator = self.comparison()
+        if not self.is_literal():
+            raise self.error("columns can only be compared with literal values")
+        return Predicate(column, operator, self.literal())
+    
+    def comparison(self):
+        token = self.token
+        if token.kind == 'symbol' and token.value in COMPARISONS:
+            self.advance()
+            return COMPARISONS[token.value]
+        raise self.error("expected a comparison operator")
+    
+    def order_item(self):
+        if self.token.kind == 'number':
+            token = self.advance()
+            if not token.value.isdigit():
+                raise ValueError(f"SQL syntax error at position {token.position}: "
+                                 f"ORDER BY position must be an integer")
+            key = int(token.value)
+        else:
+            key = self.expression()
+        descending = self.accept_keyword('ASC', 'DESC') == 'DESC'
+        return OrderItem(key, not descending)
+
+
+def _number(text):
+    """int or float value of a number token"""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _label(column):
+    """Column reference as written in the query"""
+    return column.name if column.table is None else f"{column.table}.{column.name}"
+
+
+def _like(column, token):
+    """Turn a LIKE pattern into a startswith, contains or equality predicate"""
+    pattern = token.value
+    body = pattern.strip('%')
+    if '%' in body:
+        raise ValueError(f"SQL syntax error at position {token.position}: "
+                         f"LIKE patterns may only have % at the start or end")
+    if pattern.startswith('%') and pattern.endswith('%'):
+        return Predicate(column, 'contains', body)
+    if pattern.endswith('%') and not pattern.startswith('%'):
+        return Predicate(column, 'startswith', body)
+    if '%' not in pattern:
+        return Predicate(column, '==', pattern)
+    raise ValueError(f"SQL syntax error at position {token.position}: "
+                     f"LIKE '%text' (suffix match) is not supported")
+
+
+def compile_query(query, tables):
+    """
+    Build the LazyFrame plan of a parsed query
+    
+    Clauses are applied in SQL order: joins, WHERE, GROUP BY, ORDER BY,
+    LIMIT, then the select list picks and renames the output columns.
+    
+    Args:
+        query: Query from parse_query
+        tables: dict mapping table names to DataFrames or LazyFrames
+    
+    Returns:
+        LazyFrame
+    """
+    plan = _scan(tables, query.table)
+    # table alias -> {column name in the table: column name in the plan}
+    scope = {query.alias or query.table: {col: col for col in plan.columns}}
+    
+    for join in query.joins:
+        plan, scope = _join(plan, scope, tables, join)
+    
+    for predicate in query.where:
+        plan = plan.filter(_resolve(scope, predicate.column), predicate.operator, predicate.value)
+    
+    aggregates = [item.expr for item in query.items if isinstance(item.expr, AggregateRef)]
+    aggregates += [item.key for item in query.order_by if isinstance(item.key, AggregateRef)]
+    grouped = bool(query.group_by or aggregates)
+    group_columns = [_resolve(scope, column) for column in query.group_by]
+    
+    def resolve(column):
+        name = _resolve(scope, column)
+        if grouped and name not in group_columns:
+            raise ValueError(f"Column '{_label(column)}' must appear in GROUP BY or be used in an aggregate")
+        return name
+    
+    agg_names = {}
+    if grouped:
+        agg_dict = {}
+        for aggregate in aggregates:
+            # COUNT(*) counts the rows of any column, including its nulls
+            if aggregate.column is not None:
+                col = _resolve(scope, aggregate.column)
+            else:
+                col = group_columns[0] if group_columns else plan.columns[0]
+            funcs = agg_dict.setdefault(col, [])
+            if aggregate.func not in funcs:
+                funcs.append(aggregate.func)
+            agg_names[aggregate] = f"{col}_{aggregate.func}"
+        plan = plan.groupby(group_columns).agg(agg_dict)
+    
+    # select list: (column in the plan, output name)
+    outputs = []
+    for item in query.items:
+        expr = item.expr
+        if isinstance(expr, Star):
+            if grouped:
+                raise ValueError("SELECT * cannot be combined with GROUP BY or aggregates")
+            if expr.table is None:
+                names = plan.columns
+            elif expr.table in scope:
+                names = [name for name in plan.columns if name in scope[expr.table].values()]
+            else:
+                raise KeyError(f"Table '{expr.table}' not found")
+            outputs += [(name, name) for name in names]
+        elif isinstance(expr, AggregateRef):
+            outputs.append((agg_names[expr], item.alias or expr.label))
+        else:
+            outputs.append((resolve(expr), item.alias or expr.name))
+    
+    for i, (name, output) in enumerate(outputs):
+        for other, other_output in outputs[:i]:
+            if output == other_output:
+                raise ValueError(f"Column '{output}' appears twice in the result, give one an alias")
+            if name == other:
+                raise ValueError(f"Column '{output}' selects the same column as '{other_output}'")
+    
+    if query.order_by:
+        aliases = {output: name for name, output in outputs}
+        keys = []
+        for item in query.order_by:
+            key = item.key
+            if isinstance(key, int):
+                if not 1 <= key <= len(outputs):
+                    raise ValueError(f"ORDER BY position {key} is not in the select list")
+                keys.append(outputs[key - 1][0])
+            elif isinstance(key, AggregateRef):
+                keys.append(agg_names[key])
+            elif key.table is None and key.name in aliases:
+                keys.append(aliases[key.name])
+            else:
+                keys.append(resolve(key))
+        plan = plan.sort_values(keys, [item.ascending for item in query.order_by])
+    
+    if query.limit is not None:
+        plan = plan.head(query.limit)
+    
+    plan = plan.select(*[name for name, _ in outputs])
+    renames = {name: output for name, output in outputs if name != output}
+    return plan.rename(renames) if renames else plan
+
+
+def _scan(tables, name):
+    """LazyFrame reading a named table"""
+    if name not in tables:
+        raise KeyError(f"Table '{name}' not found")
+    table = tables[name]
+    return table if isinstance(table, LazyFrame) else table.lazy()
+
+
+def _resolve(scope, column):
+    """
+    Name in the plan of a column reference
+    
+    An unqualified name must belong to exactly one table (join keys
+    merged into one column count once).
+    """
+    if column.table is not None:
+        if column.table not in scope:
+            raise KeyError(f"Table '{column.table}' not found")
+        if column.name not in scope[column.table]:
+            raise KeyError(f"Column '{_label(column)}' not found")
+        return scope[column.table][column.name]
+    
+    matches = {columns[column.name] for columns in scope.values() if column.name in columns}
+    if not matches:
+        raise KeyError(f"Column '{column.name}' not found")
+    if len(matches) > 1:
+        raise ValueError(f"Column '{column.name}' is ambiguous, qualify it with its table")
+    return matches.pop()
+
+
+def _join(plan, scope, tables, join):
+    """
+    Join another table onto the plan
+    
+    Returns:
+        tuple: (joined LazyFrame, scope updated with the joined column names)
+    """
+    alias = join.alias or join.table
+    if alias in scope:
+        raise ValueError(f"Table '{alias}' appears twice, give it an alias")
+    right = _scan(tables, join.table)
+    right_scope = {alias: {col: col for col in right.columns}}
+    
+    left_on, right_on = [], []
+    for first, second in join.pairs:
+        if _on_side(right_scope, alias, first) and not _on_side(right_scope, alias, second):
+            first, second = second, first
+        elif not _on_side(right_scope, alias, second):
+            raise ValueError(f"Join condition {_label(first)} = {_label(second)} "
+                             f"must compare a column of '{alias}' with an earlier table")
+        left_on.append(_resolve(scope, first))
+        right_on.append(_resolve(right_scope, second))
+    
+    # overlapping names keep their name on the left and get the alias on the right
+    joined = plan.merge(right, left_on, right_on, how=join.how, suffixes=('', f"_{alias}"))
+    left_names, right_names = {}, {}
+    for name, side, source in joined.plan.naming:
+        (left_names if side == 'left' else right_names)[source] = name
+    
+    # a key shared by name appears once, under the other side's column
+    def rename(columns, names, other_names, partner):
+        return {col: names[name] if name in names else other_names[partner[name]]
+                for col, name in columns.items()}
+    
+    scope = {table: rename(columns, left_names, right_names, dict(zip(left_on, right_on)))
+             for table, columns in scope.items()}
+    scope[alias] = rename(right_scope[alias], right_names, left_names, dict(zip(right_on, left_on)))
+    return joined, scope
+
+
+def _on_side(right_scope, alias, column):
+    """True when a join condition column belongs to the table being joined"""
+    if column.table is not None:
+        return column.table == alias
+    return column.name in right_scope[alias]
@@ -10,9 +10,12 @@ class SelectionMixin:
     def __getitem__(self, key):
         """
         Support multiple access patterns:
-        - df['column'] -> list
+        - df['column'] -> Column (list-like, shared, not a copy)
         - df[['col1', 'col2']] -> DataFrame
         - df[BooleanMask] -> filtered DataFrame
+        
+        Projections share the column objects with this DataFrame instead
+        of copying them.
         """
         from .filters import BooleanMask
         
@@ -28,22 +31,39 @@ class SelectionMixin:
             for col in key:
                 if col not in self.columns:
                     raise KeyError(f"Column '{col}' not found")
-                new_data[col] = self.data[col][:]
+                new_data[col] = self.data[col]
             
             # Create new DataFrame instance
             from .dataframe import DataFrame
             df = DataFrame.__new__(DataFrame)
             df.data = new_data
-            df.columns = key
+            df.columns = list(key)
             return df
         
         # Boolean indexing (filtering)
         elif isinstance(key, BooleanMask):
-            return self._filter_by_mask(key.mask)
+            return self._filter_by_mask(key)
         
         else:
             raise TypeError(f"Invalid indexing type: {type(key)}")
     
+    def __setitem__(self, column, values):
+        """
+        Add or replace a column: df['column'] = values
+        
+        Columns are shared between DataFrames made from one another
+        (projections, renames, copies), so a column is never changed in
+        place; assigning puts a new column in this DataFrame only.
+        """
+        from .columns import as_column
+        
+        values = as_column(values)
+        if self.columns and len(values) != len(self):
+            raise ValueError("Column length must match DataFrame length")
+        if column not in self.columns:
+            self.columns.append(column)
+        self.data[column] = values
+    
     def select(self, *columns):
         """
         Select specific columns
@@ -84,7 +104,7 @@ class SelectionMixin:
         
         for col in self.columns:
             new_name = column_map.get(col, col)
-            new_data[new_name] = self.data[col][:]
+            new_data[new_name] = self.data[col]
             new_columns.append(new_name)
         
         from .dataframe import DataFrame
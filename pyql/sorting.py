@@ -0,0 +1,78 @@
+"""
+Sorting Operations
+"""
+
+from array import array
+
+from .aggregation import _as_list
+from .columns import view
+
+
+class SortMixin:
+    """Mixin for ordering rows"""
+    
+    def sort_values(self, by, ascending=True):
+        """
+        Sort rows by one or more columns
+        
+        The sort is stable and nulls (and NaN) always come last. A single
+        ascending key with a sorted index (create_index(sorted=True)) reads
+        the order straight from the index.
+        
+        Args:
+            by: column name or list of column names, most significant first
+            ascending: bool, or one bool per column
+        
+        Returns:
+            DataFrame of row views in sorted order
+        """
+        by = _as_list(by)
+        orders = [ascending] * len(by) if isinstance(ascending, bool) else list(ascending)
+        if len(orders) != len(by):
+            raise ValueError("ascending must be a bool or have one entry per sort column")
+        for col in by:
+            if col not in self.columns:
+                raise KeyError(f"Column '{col}' not found")
+        
+        if len(by) == 1 and orders[0] and self.data[by[0]].sorted_index is not None:
+            rows = self.data[by[0]].sorted_index.order
+            if len(rows) < len(self):
+                ordered = set(rows)
+                rows = rows + array('q', (row for row in range(len(self)) if row not in ordered))
+        else:
+            # stable sorts from the least significant key to the most significant
+            rows = list(range(len(self)))
+            for col, asc in reversed(list(zip(by, orders))):
+                rows = _sort_rows(self.data[col], rows, asc, col)
+            rows = array('q', rows)
+        
+        from .dataframe import DataFrame
+        return DataFrame._from_columns({col: view(self.data[col], rows) for col in self.columns},
+                                       self.columns[:])
+
+
+def _sort_rows(column, rows, ascending, name):
+    """
+    Stable sort of row positions by a column's values, nulls last
+    
+    Args:
+        column: Column holding the sort key
+        rows: list of row positions in their current order
+        ascending: sort direction
+        name: column name for error messages
+    
+    Returns:
+        list of row positions
+    """
+    values = column.to_list()
+    # None and NaN are unordered: keep them out of the comparison
+    present = [row for row in rows if values[row] is not None and values[row] == values[row]]
+    missing = []
+    if len(present) < len(rows):
+        missing = [row for row in rows if values[row] is None or values[row] != values[row]]
+    
+    try:
+        present.sort(key=values.__getitem__, reverse=not ascending)
+    except TypeError:
+        raise ValueError(f"Cannot sort by column '{name}': its values are not comparable") from None
+    return present + missing
@@ -0,0 +1,229 @@
+"""
+Columnar Binary Storage
+Reads and writes DataFrames in the .pyql on-disk format
+
+Layout of a .pyql file:
+    
+    magic     8 bytes   b'PYQL' followed by the format version (uint32)
+    length    8 bytes   size of the header in bytes (uint64)
+    header    JSON      row count, byte order and one entry per column
+                        (name, dtype and the location of its buffers)
+    buffers             column buffers, each starting on an 8 byte boundary
+
+Integer and float columns are stored as their raw 8 byte buffers, with a
+validity buffer (one byte per row) when they hold nulls. Text and other
+object columns are dictionary-encoded: a 4 byte code per row (-1 for
+null) plus the distinct values as a JSON list. Categorical columns are
+stored the same way and load back as categorical.
+
+Files are opened with mmap and columns are read only when first used,
+so opening is near-instant and unused columns are never paged in. Numeric
+buffers, validity masks and category codes are not copied at all: the
+columns read them through read-only memoryviews of the map, so processes
+opening the same file share one copy of them in the OS page cache. Text
+is the exception: values of plain object columns are Python objects and
+are decoded into a list per process.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .columns import CategoricalColumn, Column, LazyColumn, TYPECODES
+
+MAGIC = b'PYQL'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# value types a dictionary can hold and get back unchanged through JSON
+DICTIONARY_TYPES = (str, int, float, bool)
+
+
+def write_pyql(df, path):
+    """
+    Write a DataFrame to a .pyql file
+    
+    Args:
+        df: DataFrame to write
+        path: destination file path
+    """
+    entries = []
+    buffers = []
+    offset = 0
+    
+    def add_buffer(data):
+        nonlocal offset
+        location = [offset, len(data)]
+        buffers.append(data)
+        padding = -len(data) % ALIGNMENT
+        if padding:
+            buffers.append(b'\x00' * padding)
+        offset += len(data) + padding
+        return location
+    
+    for name in df.columns:
+        column = df.data[name]
+        entry = {'name': name, 'dtype': column.dtype}
+        
+        if column.dtype in TYPECODES:
+            entry['values'] = add_buffer(column.values.tobytes())
+            if column.validity is not None:
+                entry['validity'] = add_buffer(bytes(column.validity))
+        else:
+            if column.dtype == 'category':
+                codes, dictionary = column.codes, column.categories
+            else:
+                codes, dictionary = _encode(column.values)
+            for value in dictionary:
+                if type(value) not in DICTIONARY_TYPES:
+                    raise TypeError(f"Column '{name}' holds {type(value).__name__} values, "
+                                    f"which cannot be stored")
+            entry['codes'] = add_buffer(array('i', codes).tobytes())
+            entry['dictionary'] = add_buffer(json.dumps(dictionary).encode('utf-8'))
+        entries.append(entry)
+    
+    header = json.dumps({
+        'rows': len(df),
+        'byteorder': sys.byteorder,
+        'columns': entries,
+    }).encode('utf-8')
+    header += b' ' * (-len(header) % ALIGNMENT)
+    
+    with open(path, 'wb') as file:
+        file.write(MAGIC + struct.pack('<IQ', FORMAT_VERSION, len(header)))
+        file.write(header)
+        for data in buffers:
+            file.write(data)
+
+
+def read_pyql(path, columns=None):
+    """
+    Open a .pyql file
+    
+    Args:
+        path: file path
+        columns: optional list of column names to load (default all)
+    
+    Returns:
+        tuple: (column names, dict mapping name to Column)
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a pyql file")
+        version, header_length = struct.unpack('<IQ', file.read(12))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported pyql format version: {version}")
+        header = json.loads(file.read(header_length))
+        source = MappedFile(file, len(MAGIC) + 12 + header_length, header['byteorder'])
+    
+    specs = {entry['name']: entry for entry in header['columns']}
+    names = list(specs) if columns is None else list(columns)
+    for name in names:
+        if name not in specs:
+            raise KeyError(f"Column '{name}' not found")
+    
+    data = {name: StoredColumn(source, specs[name], header['rows']) for name in names}
+    return names, data
+
+
+class MappedFile:
+    """A .pyql file mapped into memory, shared by its stored columns"""
+    
+    def __init__(self, file, data_start, byteorder):
+        """
+        Map an open file
+        
+        Args:
+            file: file object opened for binary reading
+            data_start: file offset of the first buffer
+            byteorder: byte order the buffers were written in
+        """
+        self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data_start = data_start
+        self.swap = byteorder != sys.byteorder
+    
+    def read(self, location):
+        """Bytes of the buffer at location ([offset, length] from the header)"""
+        start = self.data_start + location[0]
+        return self.map[start:start + location[1]]
+    
+    def read_array(self, typecode, location):
+        """
+        Buffer at location as a sequence of typecode items, without copying
+        
+        Returns a read-only memoryview of the map cast to typecode, or an
+        array.array copy when the file was written in the other byte order.
+        """
+        start = self.data_start + location[0]
+        buffer = memoryview(self.map)[start:start + location[1]]
+        if not self.swap or typecode == 'B':
+            return buffer.cast(typecode)
+        values = array(typecode, buffer.tobytes())
+        values.byteswap()
+        return values
+
+
+class StoredColumn(LazyColumn):
+    """
+    Column of a .pyql file, read from the mapped file on first use
+    
+    Length and dtype come from the header. Once used, the buffers are
+    read in place from the map (see MappedFile.read_array).
+    """
+    
+    def __init__(self, source, spec, length):
+        """
+        Initialize stored column
+        
+        Args:
+            source: MappedFile holding the buffers
+            spec: column entry of the file header
+            length: number of rows
+        """
+        super().__init__(spec['dtype'])
+        self.source = source
+        self.spec = spec
+        self.length = length
+    
+    def _load(self):
+        """Read the column's buffers"""
+        source, spec = self.source, self.spec
+        if self.dtype in TYPECODES:
+            values = source.read_array(TYPECODES[self.dtype], spec['values'])
+            validity = source.read_array('B', spec['validity']) if 'validity' in spec else None
+            column = Column(values, self.dtype, validity)
+        else:
+            codes = source.read_array('i', spec['codes'])
+            dictionary = json.loads(source.read(spec['dictionary']))
+            if self.dtype == 'category':
+                column = CategoricalColumn(codes, dictionary)
+            else:
+                column = Column(list(map((dictionary + [None]).__getitem__, codes)))
+        self.source = None # the map is closed once no column needs it
+        return column
+    
+    def __len__(self):
+        if self._column is not None:
+            return len(self._column)
+        return self.length
+
+
+def _encode(values):
+    """
+    Dictionary-encode a sequence of values
+    
+    Returns:
+        tuple: (codes with -1 for null, distinct values in order of first appearance)
+    """
+    if set(map(type, values)) <= {str, type(None)}:
+        lookup = {}
+        codes = [-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values]
+        return codes, list(lookup)
+    
+    # mixed types: 1, 1.0 and True hash alike but must stay distinct
+    lookup = {}
+    codes = [-1 if value is None else lookup.setdefault((type(value), value), len(lookup))
+             for value in values]
+    return codes, [value for _, value in lookup]
@@ -0,0 +1,191 @@
+"""
+Writers Module
+Streams DataFrames out as CSV or JSON lines and serializes them to JSON
+
+orjson is used for JSON when it is installed (it is optional: the
+standard library encoder gives the same output, only slower).
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_BATCH_ROWS = 65536
+
+
+def iter_csv(df, delimiter=',', header=True, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Render a DataFrame as CSV text, one chunk per batch of rows
+    
+    Fields holding the delimiter, quotes or newlines are quoted ('""'
+    escapes a quote), nulls are written as empty fields.
+    
+    Yields:
+        str chunks that concatenate to the whole CSV document
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+    if header:
+        writer.writerow(df.columns)
+    
+    for batch in df.iter_batches(batch_rows):
+        writer.writerows(zip(*(batch.data[col] for col in df.columns)))
+        yield _drain(buffer)
+    
+    if buffer.tell():
+        yield _drain(buffer) # header of an empty DataFrame
+
+
+def iter_jsonl(df, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Render a DataFrame as JSON lines (one object per row), one chunk per batch
+    
+    NaN and infinite floats are written as null so every line is valid JSON.
+    
+    Yields:
+        str chunks that concatenate to the whole document
+    """
+    columns = list(df.columns)
+    
+    for batch in df.iter_batches(batch_rows):
+        if orjson is not None: # writes NaN and infinities as null itself
+            rows = zip(*(batch.data[col] for col in columns))
+            lines = b'\n'.join([orjson.dumps(dict(zip(columns, row)), default=str,
+                                              option=orjson.OPT_NON_STR_KEYS) for row in rows])
+            yield lines.decode('utf-8') + '\n'
+            continue
+        values = [_json_safe(batch.data[col]) for col in columns]
+        lines = [_ENCODER.encode(dict(zip(columns, row))) for row in zip(*values)]
+        yield '\n'.join(lines) + '\n'
+
+
+def dumps(value):
+    """
+    Serialize a value to JSON bytes
+    
+    NaN and infinite floats become null, anything JSON has no type for is
+    written as its str().
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    try:
+        return _ENCODER.encode(value).encode('utf-8')
+    except ValueError: # NaN or infinity somewhere in value
+        return _ENCODER.encode(_replace_non_finite(value)).encode('utf-8')
+
+
+def columns_json(df, columns=None):
+    """
+    Serialize DataFrame columns as a JSON object of arrays, {"col": [...]}
+    
+    Each column is written according to its type: int columns never need
+    NaN checks, floats are only rewritten when they hold NaN or infinity,
+    and categorical columns serialize every category once and reuse the
+    encoded text for each row.
+    
+    Args:
+        df: DataFrame
+        columns: names of the columns to write (default all)
+    
+    Returns:
+        bytes
+    """
+    columns = df.columns if columns is None else columns
+    parts = [dumps(str(col)) + b':' + column_json(df.data[col]) for col in columns]
+    return b'{' + b','.join(parts) + b'}'
+
+
+def column_json(column):
+    """Serialize one Column as a JSON array (bytes)"""
+    if column.dtype == 'category':
+        encoded = [dumps(value) for value in column.categories] + [b'null'] # code -1 is null
+        return b'[' + b','.join(map(encoded.__getitem__, column.codes)) + b']'
+    
+    if column.dtype == 'int':
+        values = column.values.tolist() if column.validity is None else list(column)
+        return dumps(values)
+    
+    if column.dtype == 'float':
+        values = column.values.tolist() if column.validity is None else list(column)
+        if orjson is None and not _all_finite(values):
+            values = [None if isinstance(value, float) and not math.isfinite(value) else value
+                      for value in values]
+        return dumps(values)
+    
+    return dumps(_json_safe(column) if orjson is None else column.values)
+
+
+def write_text(chunks, target=None):
+    """
+    Write text chunks to a path or file object
+    
+    Args:
+        chunks: iterable of str
+        target: file path, writable text file object, or None
+    
+    Returns:
+        the whole text when target is None, otherwise None
+    """
+    if target is None:
+        return ''.join(chunks)
+    with _open_output(target) as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+@contextmanager
+def _open_output(target):
+    """Yield a writable text file for a path or an already open file"""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', encoding='utf-8', newline='') as file:
+            yield file
+    else:
+        yield target
+
+
+def _drain(buffer):
+    """Return the text written to a StringIO so far and empty it"""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def _all_finite(values):
+    """True when no value of a float sequence (nulls allowed) is NaN or infinite"""
+    try:
+        return all(map(math.isfinite, values))
+    except TypeError: # holds nulls
+        return all(math.isfinite(value) for value in values if value is not None)
+
+
+def _replace_non_finite(value):
+    """Copy of a nested dict/list structure with NaN and infinities as None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'), default=str)
+
+
+def _json_safe(column):
+    """Column values with NaN and infinities replaced by None"""
+    values = column.to_list()
+    if column.dtype == 'float' or column.dtype == 'object':
+        if any(isinstance(value, float) and not math.isfinite(value) for value in values):
+            return [None if isinstance(value, float) and not math.isfinite(value) else value
+                    for value in values]
+    return values
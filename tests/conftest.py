@@ -0,0 +1,40 @@
+import pytest
+
+from pyql.columns import CategoricalColumn
+from pyql.dataframe import DataFrame
+
+
+@pytest.fixture
+def songs():
+    return DataFrame({
+        'title': ['Juicy', 'Shook Ones', 'C.R.E.A.M.', 'N.Y. State of Mind', 'Hypnotize'],
+        'artist': ['Biggie', 'Mobb Deep', 'Wu-Tang', 'Nas', 'Biggie'],
+        'year': [1994, 1995, 1993, 1994, 1997],
+        'plays': [10, 4, None, 7, 12],
+    })
+
+
+@pytest.fixture
+def artists():
+    return DataFrame({
+        'artist': ['Biggie', 'Nas', 'Wu-Tang', 'Jay-Z'],
+        'city': ['Brooklyn', 'Queens', 'Staten Island', 'Brooklyn'],
+        'year': [1992, 1991, 1993, 1996],
+    })
+
+
+@pytest.fixture
+def tables(songs, artists):
+    return {'songs': songs, 'artists': artists}
+
+
+@pytest.fixture
+def reviews():
+    """A null in every column type, and text that needs quoting in CSV"""
+    df = DataFrame({
+        'artist': ['Nas', 'Wu-Tang, Clan', None, 'say "hi"'],
+        'year': [1994, None, 1993, 1996],
+        'score': [9.5, 8.25, None, 7.0],
+    })
+    df['label'] = CategoricalColumn.from_values(['Columbia', 'Bad Boy', None, 'Columbia'])
+    return df
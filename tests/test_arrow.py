@@ -0,0 +1,61 @@
+import sys
+
+import pytest
+
+from pyql.dataframe import DataFrame
+
+
+def test_missing_pyarrow_is_reported(monkeypatch, reviews):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        reviews.to_arrow()
+
+
+def test_arrow_roundtrip(tmp_path, reviews):
+    pytest.importorskip('pyarrow')
+    df = reviews
+    
+    table = df.to_arrow(tmp_path / 'songs.arrow')
+    assert table.num_rows == 4
+    assert DataFrame.from_arrow(table).to_dict() == df.to_dict()
+    
+    loaded = DataFrame.from_arrow(tmp_path / 'songs.arrow', columns=['year', 'label'])
+    assert loaded.to_dict() == df[['year', 'label']].to_dict()
+    assert loaded.data['year'].dtype == 'int'
+    assert loaded.data['label'].dtype == 'category'
+
+
+def test_parquet_row_groups_are_skipped_by_statistics(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = DataFrame({'year': list(range(1990, 2000)), 'points': list(range(10))})
+    path = tmp_path / 'years.parquet'
+    df.to_parquet(path, row_group_size=5)
+    
+    loaded = DataFrame.from_parquet(path, columns=['points'], filters=[('year', '>=', 1996)])
+    assert loaded.to_dict() == {'points': [6, 7, 8, 9]}
+    
+    from pyql.arrow import read_parquet
+    _, data, _ = read_parquet(path, filters=[('year', '>=', 1996)])
+    assert len(data['year']) == 5 # only the second row group was read
+
+
+def test_arrow_roundtrip_of_a_stored_frame(tmp_path, reviews):
+    pa = pytest.importorskip('pyarrow')
+    df = reviews
+    df.to_pyql(tmp_path / 'songs.pyql')
+    stored = DataFrame.read_pyql(tmp_path / 'songs.pyql') # memoryview-backed columns
+    
+    table = stored.to_arrow()
+    assert table.column('label').type == pa.dictionary(pa.int32(), pa.string())
+    assert table.column('year').to_pylist() == [1994, None, 1993, 1996]
+    assert DataFrame.from_arrow(table).to_dict() == df.to_dict()
+    for view in [stored.head(3), stored.filter('artist', '==', 'Nas')]:
+        assert DataFrame.from_arrow(view.to_arrow()).to_dict() == view.to_dict()
+
+
+def test_numeric_export_wraps_the_column_buffer():
+    pytest.importorskip('pyarrow')
+    df = DataFrame({'year': [1994, 1995, 1996]})
+    
+    exported = df.to_arrow().column('year').chunk(0)
+    assert exported.buffers()[1].address == df.data['year'].values.buffer_info()[0]
@@ -0,0 +1,61 @@
+from web.cache import ResultCache, request_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_hits_misses_and_lru_eviction_by_bytes():
+    cache = ResultCache(max_bytes=10, ttl=None)
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    assert cache.get('a') == b'aaaa' # 'a' is now the most recently used
+    cache.put('c', b'cccc')
+    
+    assert cache.get('b') is None
+    assert cache.get('c') == b'cccc'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 1, 1)
+    assert (stats['entries'], stats['bytes']) == (2, 8)
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ResultCache(ttl=5, clock=clock)
+    cache.put('a', b'body')
+    clock.now = 4.9
+    assert cache.get('a') == b'body'
+    clock.now = 5.0
+    
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1 and cache.stats()['bytes'] == 0
+
+
+def test_invalidate_drops_entries_of_a_dataframe():
+    cache = ResultCache()
+    cache.put('filter', b'1', ['songs'])
+    cache.put('join', b'2', ['songs', 'artists'])
+    cache.put('select', b'3', ['artists'])
+    cache.invalidate('songs')
+    
+    assert [cache.get(key) for key in ('filter', 'join', 'select')] == [None, None, b'3']
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+
+
+def test_oversized_bodies_are_not_stored():
+    cache = ResultCache(max_bytes=3)
+    cache.put('a', b'abcd')
+    
+    assert cache.get('a') is None and cache.stats()['bytes'] == 0
+
+
+def test_request_key_is_canonical_and_versioned():
+    key = request_key('/api/filter', {'column': 'year', 'value': 1994}, {'songs': 1})
+    
+    assert key == request_key('/api/filter', {'value': 1994, 'column': 'year'}, {'songs': 1})
+    assert key != request_key('/api/filter', {'column': 'year', 'value': 1994}, {'songs': 2})
@@ -0,0 +1,120 @@
+from array import array
+
+from pyql.columns import Column, CategoricalColumn, ColumnView
+from pyql.dataframe import DataFrame
+
+
+def test_numeric_columns_use_typed_buffers():
+    ints = Column.from_values([1, 2, 3])
+    floats = Column.from_values([1.5, 2.5])
+    strings = Column.from_values(['a', 'b'])
+    
+    assert ints.dtype == 'int' and ints.values == array('q', [1, 2, 3])
+    assert floats.dtype == 'float' and floats.values.itemsize == 8
+    assert strings.dtype == 'object' and strings.values == ['a', 'b']
+
+
+def test_nulls_are_tracked_in_validity_mask():
+    col = Column.from_values([1, None, 3])
+    
+    assert col.dtype == 'int'
+    assert col.null_count == 1
+    assert list(col) == [1, None, 3]
+    assert col[1] is None
+    assert col.valid_values() == [1, 3]
+
+
+def test_concat_promotes_int_to_float():
+    col = Column.concat([Column.from_values([1, None]), Column.from_values([2.5])])
+    
+    assert col.dtype == 'float'
+    assert list(col) == [1.0, None, 2.5]
+
+
+def test_aggregations_skip_nulls():
+    df = DataFrame({'x': [1, None, 5]})
+    
+    assert df.sum('x') == 6
+    assert df.mean('x') == 3
+    assert df.count('x') == 2
+    assert df.filter('x', '>=', 0).to_dict() == {'x': [1, 5]}
+
+
+def test_categorical_column_encodes_values():
+    col = CategoricalColumn.from_values(['US', 'UK', 'US', None])
+    
+    assert col.categories == ['US', 'UK']
+    assert list(col.codes) == [0, 1, 0, -1]
+    assert list(col) == ['US', 'UK', 'US', None]
+    assert col[2:].to_list() == ['US', None]
+
+
+def test_csv_low_cardinality_columns_become_categorical(tmp_path):
+    path = tmp_path / 'polls.csv'
+    path.write_text("title,gender\na,male\nb,male\nc,female\nd,male\n", encoding='utf-8')
+    df = DataFrame.from_csv(str(path), categorical_threshold=0.5)
+    
+    assert df.data['gender'].dtype == 'category'
+    assert df.data['title'].dtype == 'object'
+    assert df.filter('gender', '==', 'male').to_dict() == {'title': ['a', 'b', 'd'], 'gender': ['male'] * 3}
+    assert df.groupby('gender').agg({'title': 'count'}).to_dict() == {'gender': ['male', 'female'], 'title': [3, 1]}
+
+
+def test_projections_and_copies_share_columns():
+    df = DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    
+    assert df[['a']].data['a'] is df.data['a']
+    assert df.rename({'a': 'c'}).data['c'] is df.data['a']
+    
+    copy = df.copy()
+    assert copy.data['b'] is df.data['b']
+    copy['b'] = ['p', 'q', 'r']
+    assert df['b'] == ['x', 'y', 'z']
+    assert copy['b'] == ['p', 'q', 'r']
+
+
+def test_head_tail_and_filter_are_views():
+    df = DataFrame({'a': [1, None, 3, 4], 'b': ['x', 'y', 'x', 'y']})
+    df.data['b'] = CategoricalColumn.from_values(df['b'])
+    
+    head = df.head(2)
+    assert isinstance(head.data['a'], ColumnView)
+    assert head.data['a'].base is df.data['a']
+    assert len(head) == 2 and head['a'][1] is None
+    
+    filtered = df.filter('a', '>', 1)
+    column = filtered.data['b']
+    assert isinstance(column, ColumnView) and column.dtype == 'category'
+    assert column.categories is df.data['b'].categories
+    
+    # the values are only gathered when needed
+    assert filtered.head(1)['b'][0] == 'x'
+    assert column._column is None
+    assert filtered.to_dict() == {'a': [3, 4], 'b': ['x', 'y']}
+    assert column._column is not None and column.base is None
+    assert filtered.groupby('b').agg({'a': 'sum'}).to_dict() == {'b': ['x', 'y'], 'a': [3, 4]}
+
+
+def test_slice_pages_through_rows():
+    df = DataFrame({'a': list(range(10))})
+    page = df.slice(4, 7)
+    
+    assert isinstance(page.data['a'], ColumnView) and page.data['a'].base is df.data['a']
+    assert page['a'] == [4, 5, 6]
+    assert df.slice(8, 20)['a'] == [8, 9] and len(df.slice(20, 30)) == 0
+    assert df.slice(-2)['a'] == [8, 9] and df.slice()['a'] == df['a']
+
+
+def test_reversed_and_stepped_slices_of_views():
+    df = DataFrame({'a': list(range(10))})
+    views = {
+        'head': (df.head(4)['a'], [0, 1, 2, 3]),
+        'tail': (df.tail(4)['a'], [6, 7, 8, 9]),
+        'filter': (df.filter('a', '>', 3)['a'], [4, 5, 6, 7, 8, 9]),
+    }
+    for name, (column, values) in views.items():
+        for key in [slice(None, None, -1), slice(None, None, 2), slice(-1, 0, -2),
+                    slice(1, None, -1), slice(2, 5), slice(None, 1, -1)]:
+            assert list(column[key]) == values[key], (name, key)
+        # a slice of a slice of a view
+        assert list(column[::-1][::2]) == values[::-1][::2], name
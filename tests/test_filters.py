@@ -0,0 +1,36 @@
+from pyql.dataframe import DataFrame
+from pyql.filters import BooleanMask, compare
+
+
+def test_mask_bulk_operations():
+    a = BooleanMask([True, True, False, False])
+    b = BooleanMask([True, False, True, False])
+    
+    assert list(a & b) == [True, False, False, False]
+    assert list(a | b) == [True, True, True, False]
+    assert list(~a) == [False, False, True, True]
+    assert (a | b).count() == 3
+    assert list((a | b).indices()) == [0, 1, 2]
+
+
+def test_filter_with_combined_masks():
+    df = DataFrame({'name': ['Alice', 'Bob', 'Charlie'], 'age': [25, 30, 35]})
+    mask = compare(df, 'age', '>', 26) & ~compare(df, 'name', '==', 'Charlie')
+    
+    assert df[mask].to_dict() == {'name': ['Bob'], 'age': [30]}
+
+
+def test_set_range_and_text_predicates():
+    df = DataFrame({'artist': ['Nas', 'Jay-Z', 'Nate Dogg', None], 'year': [1994, 1996, None, 2001]})
+    
+    assert df.filter('artist', 'in', ['Nas', 'Jay-Z'])['year'].to_list() == [1994, 1996]
+    assert df.filter('year', 'between', (1995, 2001))['artist'].to_list() == ['Jay-Z', None]
+    assert df.filter('year', 'is_null')['artist'].to_list() == ['Nate Dogg']
+    assert df.filter('artist', 'startswith', 'Na')['year'].to_list() == [1994, None]
+    assert df.filter('artist', 'contains', '-')['year'].to_list() == [1996]
+
+
+def test_nulls_never_match_comparisons():
+    df = DataFrame({'name': ['a', None, 'c']})
+    
+    assert df.filter('name', '!=', 'a')['name'].to_list() == ['c']
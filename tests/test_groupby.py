@@ -0,0 +1,101 @@
+import math
+
+from pyql import sql
+from pyql.dataframe import DataFrame
+
+
+def test_single_function_keeps_column_name(songs):
+    result = songs.groupby('artist').agg({'plays': 'sum', 'title': 'count'})
+    
+    assert result.to_dict() == {
+        'artist': ['Biggie', 'Mobb Deep', 'Wu-Tang', 'Nas'],
+        'plays': [22, 4, None, 7],
+        'title': [2, 1, 1, 1],
+    }
+
+
+def test_multiple_functions_per_column(songs):
+    result = songs.groupby('artist').agg({'plays': ['sum', 'mean', 'max', 'first', 'last']})
+    
+    assert result.columns == ['artist', 'plays_sum', 'plays_mean', 'plays_max', 'plays_first', 'plays_last']
+    assert result['plays_mean'].to_list() == [11.0, 4.0, None, 7.0]
+    assert result['plays_max'].to_list() == [12, 4, None, 7]
+    assert result['plays_first'].to_list() == [10, 4, None, 7]
+    assert result['plays_last'].to_list() == [12, 4, None, 7]
+
+
+def test_spread_and_distinct_counts(songs):
+    result = songs.groupby('artist').agg({'plays': ['var', 'std'], 'year': 'nunique'})
+    
+    assert result['plays_var'].to_list() == [2.0, None, None, None]
+    assert math.isclose(result['plays_std'][0], math.sqrt(2))
+    assert result['year'].to_list() == [2, 1, 1, 1]
+    assert songs.groupby('year').agg({'artist': 'nunique'})['artist'].to_list() == [2, 1, 1, 1]
+
+
+def test_groupby_multiple_columns():
+    df = DataFrame({
+        'year': [1994, 1994, 1995, 1994],
+        'gender': ['male', 'female', 'male', 'male'],
+        'points': [140, 100, 60, 20],
+    })
+    result = df.groupby(['year', 'gender']).agg({'points': ['sum', 'count']})
+    
+    assert result.to_dict() == {
+        'year': [1994, 1994, 1995],
+        'gender': ['male', 'female', 'male'],
+        'points_sum': [160, 100, 60],
+        'points_count': [2, 1, 1],
+    }
+    assert df.groupby(['year', 'gender'])._groups[(1994, 'male')] == [0, 3]
+
+
+def test_engines_agree(monkeypatch):
+    import pyql.aggregation
+    
+    df = DataFrame({
+        'key': ['a', 'b', 'a', 'c', 'b', 'a', 'd'],
+        'value': [1, 2, 3, None, 5, 6, 7],
+    })
+    spec = {'value': ['sum', 'mean', 'min', 'max', 'count', 'first', 'last', 'nunique']}
+    expected = df.groupby('key', engine='hash').agg(spec).to_dict()
+    
+    assert df.groupby('key', engine='sort').agg(spec).to_dict() == expected
+    
+    monkeypatch.setattr(pyql.aggregation, 'PARALLEL_MIN_ROWS', 0)
+    assert df.groupby('key', workers=2).agg(spec).to_dict() == expected
+
+
+def test_sum_of_a_group_without_values_is_null():
+    df = DataFrame({'key': ['a', 'b', 'b', 'a'], 'value': [None, 2.5, 1.5, None]})
+    
+    for engine in ['hash', 'sort']:
+        result = df.groupby('key', engine=engine).agg({'value': ['sum', 'count']})
+        assert result.to_dict() == {'key': ['a', 'b'], 'value_sum': [None, 4.0], 'value_count': [0, 2]}
+    assert sql("SELECT key, SUM(value) AS total FROM df GROUP BY key", {'df': df}).to_dict() == {
+        'key': ['a', 'b'], 'total': [None, 4.0]}
+
+
+def test_auto_engine_sorts_only_contiguous_large_groups():
+    grouped = DataFrame({'key': [1] * 20 + [2] * 20, 'value': list(range(40))})
+    scattered = DataFrame({'key': [1, 2] * 20, 'value': list(range(40))})
+    unique = DataFrame({'key': list(range(40)), 'value': list(range(40))})
+    
+    assert grouped.groupby('key').engine == 'sort'
+    assert scattered.groupby('key').engine == 'hash'
+    assert unique.groupby('key').engine == 'hash'
+
+
+def test_parallel_sort_engine_on_a_stored_frame(tmp_path, monkeypatch):
+    import pyql.aggregation
+    
+    df = DataFrame({'key': [1] * 5 + [2] * 5 + [3] * 5, 'value': list(range(15)),
+                    'score': [i / 4 for i in range(15)]})
+    df.to_pyql(tmp_path / 'grouped.pyql')
+    stored = DataFrame.read_pyql(tmp_path / 'grouped.pyql') # memoryview-backed columns
+    spec = {'value': 'sum', 'score': ['mean', 'max']}
+    
+    monkeypatch.setattr(pyql.aggregation, 'PARALLEL_MIN_ROWS', 0)
+    result = stored.groupby('key', engine='sort', workers=2).agg(spec).to_dict()
+    assert result == df.groupby('key', engine='hash').agg(spec).to_dict()
+    assert result['value'] == [10, 35, 60]
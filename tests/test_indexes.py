@@ -0,0 +1,51 @@
+from pyql.columns import Column
+from pyql.dataframe import DataFrame
+
+
+def test_indexed_filters_match_scans(songs):
+    filters = [
+        ('artist', '==', 'Nas'), ('artist', 'in', ['Biggie', 'Rakim', None]),
+        ('plays', '==', 10), ('plays', '>', 7), ('plays', '<=', 7), ('plays', 'in', [4, None]),
+        ('plays', 'between', (4, 10)), ('artist', '!=', 'Nas'),
+    ]
+    expected = [songs.filter(column, operator, value).to_dict() for column, operator, value in filters]
+    songs.create_index('artist')
+    songs.create_index('plays', sorted=True)
+    assert songs.indexes == {'artist': ['hash'], 'plays': ['hash', 'sorted']}
+    
+    for (column, operator, value), scanned in zip(filters, expected):
+        assert songs.filter(column, operator, value).to_dict() == scanned
+
+
+def test_index_is_reused_by_groupby_and_joins(songs):
+    labels = DataFrame({'artist': ['Nas', 'Biggie'], 'label': ['Columbia', 'Bad Boy']})
+    expected_groups = songs.groupby('artist').agg({'plays': 'sum'}).to_dict()
+    expected_join = songs.merge(labels, 'artist', 'artist', how='left').to_dict()
+    
+    songs.create_index('artist')
+    labels.create_index('artist')
+    
+    assert songs.groupby('artist').agg({'plays': 'sum'}).to_dict() == expected_groups
+    assert songs.merge(labels, 'artist', 'artist', how='left').to_dict() == expected_join
+    assert labels.merge(songs, 'artist', 'artist', how='outer').columns == ['artist', 'label', 'title', 'year', 'plays']
+
+
+def test_replacing_a_column_drops_its_index(songs):
+    songs.create_index('plays', sorted=True)
+    songs.data['plays'] = Column.from_values([1, 2, 3, 4, 5])
+    
+    assert songs.indexes == {}
+    assert songs.filter('plays', '>', 3)['plays'] == [4, 5]
+    
+    songs.create_index('plays')
+    songs.drop_index('plays')
+    assert songs.indexes == {}
+
+
+def test_index_lookups_return_copies(songs):
+    songs.create_index('artist')
+    rows = songs.data['artist'].index.find(['Biggie'])
+    rows[0] = 3
+    
+    assert songs.data['artist'].index.find(['Biggie']).tolist() == [0, 4]
+    assert songs.filter('artist', '==', 'Biggie')['year'] == [1994, 1997]
@@ -0,0 +1,125 @@
+from pyql.columns import CategoricalColumn
+from pyql.dataframe import DataFrame
+
+
+def test_overlapping_columns_get_suffixes(songs, artists):
+    result = songs.merge(artists, 'artist', 'artist')
+    
+    assert result.columns == ['title', 'artist', 'year_x', 'plays', 'city', 'year_y']
+    assert result[['title', 'year_x', 'year_y']].to_list() == [
+        ['Juicy', 1994, 1992],
+        ['C.R.E.A.M.', 1993, 1993],
+        ['N.Y. State of Mind', 1994, 1991],
+        ['Hypnotize', 1997, 1992],
+    ]
+    
+    custom = songs.merge(artists, 'artist', 'artist', suffixes=('_song', '_artist'))
+    assert custom.columns == ['title', 'artist', 'year_song', 'plays', 'city', 'year_artist']
+
+
+def test_left_join_fills_unmatched_rows_with_nulls(songs, artists):
+    result = songs.merge(artists, 'artist', 'artist', how='left')
+    
+    assert result['year_y'] == [1992, None, 1993, 1991, 1992]
+    assert result.data['year_y'].dtype == 'int'
+    assert result['title'] == songs['title']
+    
+    # every match of a duplicated key, in right order
+    tours = DataFrame({'artist': ['Wu-Tang', 'Biggie', 'Wu-Tang'], 'city': ['Boston', 'Detroit', 'Chicago']})
+    result = songs.merge(tours, 'artist', 'artist', how='left')
+    assert result['title'] == ['Juicy', 'Shook Ones', 'C.R.E.A.M.', 'C.R.E.A.M.', 'N.Y. State of Mind', 'Hypnotize']
+    assert result['city'] == ['Detroit', None, 'Boston', 'Chicago', None, 'Detroit']
+
+
+def test_right_and_outer_joins(songs, artists):
+    right = songs.merge(artists, 'artist', 'artist', how='right')
+    assert right.columns == ['artist', 'city', 'year_y', 'title', 'year_x', 'plays']
+    assert right['title'] == ['Juicy', 'Hypnotize', 'N.Y. State of Mind', 'C.R.E.A.M.', None]
+    
+    outer = songs.merge(artists, 'artist', 'artist', how='outer')
+    assert len(outer) == 6
+    assert outer['artist'][-1] == 'Jay-Z'
+    assert outer['title'][-1] is None
+
+
+def test_categorical_keys_join_like_plain_keys(songs, artists):
+    plain = songs.merge(artists, 'artist', 'artist', how='left').to_dict()
+    
+    songs.data['artist'] = CategoricalColumn.from_values(songs['artist'])
+    artists.data['artist'] = CategoricalColumn.from_values(artists['artist'])
+    encoded = songs.merge(artists, 'artist', 'artist', how='left')
+    
+    assert encoded.to_dict() == plain
+
+
+def test_multi_column_keys(songs, artists):
+    result = songs.merge(artists, ['artist', 'year'], ['artist', 'year'], how='left')
+    
+    assert result.columns == ['title', 'artist', 'year', 'plays', 'city']
+    assert len(result) == 5
+    assert result.to_list()[2] == ['C.R.E.A.M.', 'Wu-Tang', 1993, None, 'Staten Island']
+    assert result['city'].to_list().count(None) == 4
+
+
+def test_build_side_does_not_change_row_order(songs):
+    many_artists = DataFrame({
+        'artist': ['Biggie', 'Wu-Tang', 'Nas', 'Jay-Z', 'Eazy-E', 'Rakim'],
+        'city': ['Brooklyn', 'Staten Island', 'Queens', 'Brooklyn', 'Compton', 'Long Island'],
+    })
+    
+    # the left side is indexed when it is the smaller one; rows stay in left order
+    assert len(songs) < len(many_artists)
+    result = songs.merge(many_artists, 'artist', 'artist', how='left')
+    assert result['title'] == songs['title']
+    assert result['city'] == ['Brooklyn', None, 'Staten Island', 'Queens', 'Brooklyn']
+
+
+def test_smaller_left_side_keeps_left_order_with_duplicate_keys():
+    left = DataFrame({'k': [3, 1, 3, 9], 'l': ['a', 'b', 'c', 'd']})
+    right = DataFrame({'k': [1, 3, 7, 3, 1, 8], 'r': [0, 1, 2, 3, 4, 5]})
+    
+    result = left.merge(right, 'k', 'k', how='outer')
+    assert result['l'] == ['a', 'a', 'b', 'b', 'c', 'c', 'd', None, None]
+    assert result['r'] == [1, 3, 0, 4, 1, 3, None, 2, 5]
+
+
+def test_sort_merge_orders_categorical_keys_by_value():
+    left = DataFrame({'k': CategoricalColumn.from_values(['c', 'b', 'a', 'd'])})
+    right = DataFrame({'k': CategoricalColumn.from_values(['e', 'c', 'a', 'b']), 'v': [5, 3, 1, 2]})
+    
+    result = left.merge(right, 'k', 'k', how='outer', strategy='sort_merge')
+    assert result['k'] == ['a', 'b', 'c', 'd', 'e']
+    assert result['v'] == [1, 2, 3, None, 5]
+
+
+def test_sort_merge_matches_hash(songs, artists):
+    debuts = DataFrame({'artist': ['Wu-Tang', 'Biggie', 'Wu-Tang', 'Nas'], 'year': [1993, 1994, 1993, 1991]})
+    for right in [artists, debuts]:
+        for how in ['inner', 'left', 'right', 'outer']:
+            for keys in ['artist', ['artist', 'year']]:
+                hashed = songs.merge(right, keys, keys, how=how).to_list()
+                merged = songs.merge(right, keys, keys, how=how, strategy='sort_merge').to_list()
+                assert sorted(map(repr, merged)) == sorted(map(repr, hashed))
+    
+    # sort-merge output comes in key order
+    merged = songs.merge(artists, 'artist', 'artist', strategy='sort_merge')
+    assert merged['title'] == ['Juicy', 'Hypnotize', 'N.Y. State of Mind', 'C.R.E.A.M.']
+
+
+def test_outer_join_fills_the_key_column(songs):
+    labels = DataFrame({
+        'name': ['Nas', 'Biggie', 'Jay-Z'],
+        'label': ['Columbia', 'Bad Boy', 'Roc-A-Fella'],
+    })
+    for strategy in ['hash', 'sort_merge']:
+        result = songs.merge(labels, 'artist', 'name', how='outer', strategy=strategy)
+        
+        assert len(result) == 6
+        assert None not in result['artist']
+        assert sorted(result['artist']) == sorted(['Biggie', 'Mobb Deep', 'Wu-Tang', 'Biggie', 'Nas', 'Jay-Z'])
+        # the right key column keeps its own values
+        assert result['name'].to_list().count(None) == 2
+    
+    # right-only rows come after every left row on a hash join
+    result = labels.merge(songs, 'name', 'artist', how='outer')
+    assert result['name'] == ['Nas', 'Biggie', 'Biggie', 'Jay-Z', 'Mobb Deep', 'Wu-Tang']
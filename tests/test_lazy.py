@@ -0,0 +1,32 @@
+from pyql.lazy import Filter, Join, Project, Scan
+
+
+def test_lazy_matches_eager(songs, artists):
+    for how in ['inner', 'left', 'right', 'outer']:
+        lazy = (songs.lazy().merge(artists, 'artist', 'artist', how=how)
+                .filter('year_x', '>=', 1994).filter('city', '!=', 'Queens')
+                .select('title', 'city'))
+        eager = (songs.merge(artists, 'artist', 'artist', how=how)
+                 .filter('year_x', '>=', 1994).filter('city', '!=', 'Queens')
+                 .select('title', 'city'))
+        
+        assert lazy.collect().to_dict() == eager.to_dict()
+
+
+def test_filters_are_fused_and_pushed_below_join(songs, artists):
+    plan = (songs.lazy().merge(artists, 'artist', 'artist')
+            .filter('year_x', '>=', 1994).filter('artist', '!=', 'Nas')
+            .select('title')).optimize()
+    
+    join = plan.child if isinstance(plan, Project) else plan
+    assert isinstance(join, Join)
+    
+    left = join.left
+    assert isinstance(left, Filter) and len(left.predicates) == 2
+    # plays is used nowhere, so it is pruned right above the scan
+    assert isinstance(left.child, Project) and 'plays' not in left.child.columns
+    assert isinstance(left.child.child, Scan)
+    
+    # the key predicate also reaches the right side; unused columns are pruned there
+    assert isinstance(join.right, Filter)
+    assert join.right.child.columns == ['artist']
@@ -0,0 +1,124 @@
+from pyql.parser import CSVParser
+from pyql.dataframe import DataFrame
+
+
+def write_csv(tmp_path, text, name='data.csv'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_iter_chunks_is_column_oriented(tmp_path):
+    path = write_csv(tmp_path, "a,b\n1,x\n2,y\n3,z\n")
+    chunks = list(CSVParser(path).iter_chunks(chunk_rows=2))
+    
+    assert chunks == [{'a': [1, 2], 'b': ['x', 'y']}, {'a': [3], 'b': ['z']}]
+
+
+def test_from_csv_chunksize_matches_full_load(tmp_path):
+    path = write_csv(tmp_path, "a,b\n" + "".join(f"{i},v{i}\n" for i in range(10)))
+    full = DataFrame.from_csv(path)
+    chunks = list(DataFrame.from_csv(path, chunksize=3))
+    
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert sum((chunk.to_list() for chunk in chunks), []) == full.to_list()
+
+
+def test_short_rows_are_padded(tmp_path):
+    path = write_csv(tmp_path, "a,b,c\n1,2\n")
+    df = DataFrame.from_csv(path)
+    
+    assert df.to_list() == [[1, 2, None]]
+
+
+def test_empty_file(tmp_path):
+    path = write_csv(tmp_path, "")
+    
+    assert CSVParser(path).read_csv() == ([], [])
+    assert len(DataFrame.from_csv(path)) == 0
+
+
+def test_column_types_are_inferred(tmp_path):
+    path = write_csv(tmp_path, "i,f,s,m\n1,1.5,a,1\n2,2,b,x\n")
+    df = DataFrame.from_csv(path)
+    
+    assert df.to_dict() == {'i': [1, 2], 'f': [1.5, 2.0], 's': ['a', 'b'], 'm': [1, 'x']}
+
+
+def test_inferred_type_is_promoted_across_chunks(tmp_path):
+    path = write_csv(tmp_path, "a\n1\n2\n2.5\n")
+    chunks = list(CSVParser(path).iter_chunks(chunk_rows=2))
+    
+    assert chunks == [{'a': [1, 2]}, {'a': [2.5]}]
+
+
+def test_explicit_dtypes(tmp_path):
+    path = write_csv(tmp_path, "year,code\n1994,007\n,010\n")
+    df = DataFrame.from_csv(path, dtypes={'year': float, 'code': 'str'})
+    
+    assert df.to_dict() == {'year': [1994.0, None], 'code': ['007', '010']}
+
+
+def test_split_line_handles_quotes():
+    parser = CSVParser(None)
+    
+    assert parser.split_line('1, plain ,x') == ['1', 'plain', 'x']
+    assert parser.split_line('"a, b","say ""hi""",c') == ['a, b', 'say "hi"', 'c']
+    assert parser.split_line('"",x,') == ['', 'x', '']
+
+
+def test_quoted_fields_with_embedded_newlines(tmp_path):
+    path = write_csv(tmp_path, 'id,text\n1,"line one\nline two"\n2,"He said ""yo"""\n')
+    df = DataFrame.from_csv(path)
+    
+    assert df.to_dict() == {'id': [1, 2], 'text': ['line one\nline two', 'He said "yo"']}
+
+
+def test_stray_quotes_inside_unquoted_fields_do_not_join_lines(tmp_path):
+    path = write_csv(tmp_path, 'name,height\nA,5\'10"\nB,6\nC,7\n')
+    df = DataFrame.from_csv(path)
+    
+    assert df.to_dict() == {'name': ['A', 'B', 'C'], 'height': ['5\'10"', 6, 7]}
+
+
+def test_parallel_read_matches_sequential(tmp_path, monkeypatch):
+    monkeypatch.setattr('pyql.parser.PARALLEL_MIN_BYTES', 0)
+    rows = "".join(f'{i},"v, {i % 3}",{i / 4},{"x" if i == 70 else i}\n' for i in range(100))
+    path = write_csv(tmp_path, "a,b,c,d\n\n" + rows)
+    sequential = DataFrame.from_csv(path, categorical_threshold=0.5)
+    parallel = DataFrame.from_csv(path, categorical_threshold=0.5, workers=3)
+    
+    assert parallel.columns == sequential.columns
+    assert parallel.to_dict() == sequential.to_dict()
+    assert {col: parallel.data[col].dtype for col in parallel.columns} == {
+        'a': 'int', 'b': 'category', 'c': 'float', 'd': 'object'}
+
+
+def test_parallel_read_of_newlines_inside_quoted_fields(tmp_path, monkeypatch):
+    monkeypatch.setattr('pyql.parser.PARALLEL_MIN_BYTES', 0)
+    rows = "".join(f'{i},"line one\nline two\nline {i}",{i % 2}\n' for i in range(60))
+    path = write_csv(tmp_path, "a,b,c\n" + rows)
+    text = open(path).read()
+    bounds = CSVParser(path)._range_bounds(len("a,b,c\n"), 3)
+    assert any(text[:bound].count('"') % 2 for bound in bounds[1:-1]) # a boundary inside quotes
+    
+    parallel = DataFrame.from_csv(path, workers=3)
+    
+    assert len(parallel) == 60
+    assert parallel.to_dict() == DataFrame.from_csv(path).to_dict()
+
+
+def test_range_bounds_start_on_lines(tmp_path):
+    path = write_csv(tmp_path, "a\n" + "".join(f"{i}\n" for i in range(1000)))
+    parser = CSVParser(path)
+    bounds = parser._range_bounds(2, 4)
+    text = open(path, 'rb').read()
+    
+    assert len(bounds) == 5 and bounds[0] == 2 and bounds[-1] == len(text)
+    assert all(text[bound - 1:bound] == b'\n' for bound in bounds[:-1])
+
+
+def test_parallel_read_of_small_and_empty_files(tmp_path):
+    assert DataFrame.from_csv(write_csv(tmp_path, "a,b\n1,x\n"), workers=4).to_list() == [[1, 'x']]
+    assert DataFrame.from_csv(write_csv(tmp_path, "a,b\n", 'header.csv'), workers=4).columns == ['a', 'b']
+    assert len(DataFrame.from_csv(write_csv(tmp_path, "", 'empty.csv'), workers=4)) == 0
@@ -0,0 +1,106 @@
+import pytest
+
+from pyql import DataFrame, sql
+from pyql.lazy import Filter, Join, Scan
+from pyql.query import parse_query
+
+
+def test_select_where_order_limit(tables):
+    result = sql("SELECT title, year FROM songs WHERE year >= 1994 AND title LIKE '%o%' "
+                 "ORDER BY year DESC, title LIMIT 2", tables)
+    
+    assert result.to_dict() == {'title': ['Hypnotize', 'Shook Ones'], 'year': [1997, 1995]}
+
+
+def test_predicates_match_dataframe_filters(songs, tables):
+    result = sql("SELECT * FROM songs WHERE artist IN ('Biggie', 'Nas') AND 1995 > year "
+                 "AND plays BETWEEN 5 AND 10", tables)
+    expected = (songs.filter('artist', 'in', ['Biggie', 'Nas']).filter('year', '<', 1995)
+                .filter('plays', 'between', (5, 10)))
+    
+    assert result.to_dict() == expected.to_dict()
+    assert sql("SELECT title FROM songs WHERE plays IS NULL", tables).to_dict() == {'title': ['C.R.E.A.M.']}
+
+
+def test_join_resolves_qualified_and_overlapping_columns(tables):
+    result = sql("SELECT s.title, s.year, a.year AS debut, city FROM songs s "
+                 "JOIN artists a ON s.artist = a.artist WHERE city != 'Queens' ORDER BY s.title",
+                 tables)
+    
+    assert result.to_dict() == {
+        'title': ['C.R.E.A.M.', 'Hypnotize', 'Juicy'],
+        'year': [1993, 1997, 1994],
+        'debut': [1993, 1992, 1992],
+        'city': ['Staten Island', 'Brooklyn', 'Brooklyn'],
+    }
+
+
+def test_outer_joins_keep_unmatched_rows(tables):
+    left = sql("SELECT title, city FROM songs LEFT JOIN artists ON artist = artist ORDER BY title", tables)
+    
+    assert left.to_dict()['city'] == ['Staten Island', 'Brooklyn', 'Brooklyn', 'Queens', None]
+    assert sql("SELECT * FROM artists a RIGHT OUTER JOIN songs s ON a.artist = s.artist", tables).columns == [
+        'title', 'artist', 'year_s', 'plays', 'city', 'year']
+
+
+def test_group_by_with_aggregates(tables):
+    result = sql("SELECT artist, COUNT(*), SUM(plays) AS total, AVG(plays) FROM songs "
+                 "GROUP BY artist ORDER BY total DESC, 1 LIMIT 3", tables)
+    
+    assert result.to_dict() == {
+        'artist': ['Biggie', 'Nas', 'Mobb Deep'],
+        'count(*)': [2, 1, 1],
+        'total': [22, 7, 4],
+        'avg(plays)': [11.0, 7.0, 4.0],
+    }
+
+
+def test_aggregates_without_group_by(tables):
+    result = sql("SELECT COUNT(*) AS n, COUNT(plays), COUNT(DISTINCT artist), MAX(year) FROM songs", tables)
+    
+    assert result.to_dict() == {'n': [5], 'count(plays)': [4], 'count(distinct artist)': [4],
+                                'max(year)': [1997]}
+    assert sql("SELECT COUNT(*) FROM songs WHERE year > 2000", tables).to_dict() == {'count(*)': [0]}
+
+
+def test_plan_pushes_filters_into_the_join(tables):
+    plan = sql("SELECT title FROM songs s JOIN artists a ON s.artist = a.artist "
+               "WHERE a.city = 'Queens' AND s.year = 1994", tables, lazy=True).optimize()
+    
+    while not isinstance(plan, Join):
+        plan = plan.child
+    assert isinstance(plan.left, Filter) and isinstance(plan.right, Filter)
+    assert isinstance(plan.right.child.child, Scan)
+
+
+def test_parse_query_clauses():
+    query = parse_query('select "title", count(*) c from songs as s where year < -1 '
+                        'group by title order by c desc limit 10;')
+    
+    assert query.table == 'songs' and query.alias == 's'
+    assert query.where[0].operator == '<' and query.where[0].value == -1
+    assert query.order_by[0].ascending is False and query.limit == 10
+
+
+@pytest.mark.parametrize('query, error', [
+    ("SELECT title FROM songs WHERE year = 1 OR year = 2", ValueError),
+    ("SELECT year FROM songs s JOIN artists a ON s.artist = a.artist", ValueError),
+    ("SELECT title, COUNT(*) FROM songs", ValueError),
+    ("SELECT title FROM songs WHERE plays = NULL", ValueError),
+    ("SELECT title FROM songs LIMIT", ValueError),
+    ("SELECT missing FROM songs", KeyError),
+    ("SELECT * FROM missing", KeyError),
+])
+def test_invalid_queries(query, error, tables):
+    with pytest.raises(error):
+        sql(query, tables)
+
+
+def test_sort_values():
+    df = DataFrame({'a': [3, None, 1, 3], 'b': ['x', 'y', 'z', 'w']})
+    
+    assert df.sort_values('a').to_dict() == {'a': [1, 3, 3, None], 'b': ['z', 'x', 'w', 'y']}
+    assert df.sort_values(['a', 'b'], ascending=[False, True]).to_list() == [
+        [3, 'w'], [3, 'x'], [1, 'z'], [None, 'y']]
+    df.create_index('a', sorted=True)
+    assert df.sort_values('a').to_dict() == {'a': [1, 3, 3, None], 'b': ['z', 'x', 'w', 'y']}
@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyql import DataFrame
+from web.registry import DataFrameRegistry
+
+
+def write_csv(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self, filepath):
+        self.calls += 1
+        return DataFrame.from_csv(filepath)
+
+
+def test_frames_loaded_by_one_worker_are_read_by_another(tmp_path):
+    csv = write_csv(tmp_path / 'songs.csv', "title,year\nAlpha,1994\nBeta,2001\n")
+    first = DataFrameRegistry(str(tmp_path / 'registry'))
+    second = DataFrameRegistry(str(tmp_path / 'registry'))
+    
+    first.load('songs', csv)
+    
+    assert 'songs' in second and list(second) == ['songs']
+    assert second['songs'].to_dict() == {'title': ['Alpha', 'Beta'], 'year': [1994, 2001]}
+    assert second.describe() == {'songs': {'rows': 2, 'columns': ['title', 'year']}}
+    assert second.version('songs') == first.version('songs') == 1
+    assert second['songs'] is second['songs'] # opened once per process
+
+
+def test_unchanged_files_are_loaded_once(tmp_path):
+    csv = write_csv(tmp_path / 'songs.csv', "title,year\nAlpha,1994\n")
+    loader = CountingLoader()
+    first = DataFrameRegistry(str(tmp_path / 'registry'))
+    second = DataFrameRegistry(str(tmp_path / 'registry'))
+    
+    first.load('songs', csv, loader)
+    second.load('songs', csv, loader)
+    assert loader.calls == 1 and second.version('songs') == 1
+    
+    write_csv(tmp_path / 'songs.csv', "title,year\nAlpha,1994\nBeta,2001\n")
+    second.load('songs', csv, loader)
+    assert loader.calls == 2
+    assert first.version('songs') == 2
+    assert len(first['songs']) == 2
+    assert sorted(os.listdir(tmp_path / 'registry')) == ['2.pyql', 'manifest.json', 'manifest.lock']
+
+
+def test_clear_is_seen_by_every_worker_and_versions_are_not_reused(tmp_path):
+    csv = write_csv(tmp_path / 'songs.csv', "title,year\nAlpha,1994\n")
+    first = DataFrameRegistry(str(tmp_path / 'registry'))
+    second = DataFrameRegistry(str(tmp_path / 'registry'))
+    first.load('songs', csv)
+    songs = second['songs']
+    
+    first.clear()
+    
+    assert 'songs' not in second and len(second) == 0
+    with pytest.raises(KeyError):
+        second['songs']
+    assert songs.to_dict()['title'] == ['Alpha'] # mapped before the clear, still readable
+    second.load('songs', csv)
+    assert first.version('songs') == 2
+
+
+def _load_version(directory, csv):
+    registry = DataFrameRegistry(directory)
+    registry.load('songs', csv)
+    return registry.version('songs')
+
+
+def test_concurrent_loads_from_several_processes_load_once(tmp_path):
+    csv = write_csv(tmp_path / 'songs.csv', "title,year\n" + "Alpha,1994\n" * 1000)
+    directory = str(tmp_path / 'registry')
+    
+    with ProcessPoolExecutor(4) as pool:
+        versions = list(pool.map(_load_version, [directory] * 4, [csv] * 4))
+    
+    assert versions == [1, 1, 1, 1]
+    assert len(DataFrameRegistry(directory)['songs']) == 1000
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX owners and permissions")
+def test_directories_other_users_could_write_to_are_refused(tmp_path):
+    registry = DataFrameRegistry(str(tmp_path / 'registry'))
+    assert os.stat(registry.directory).st_mode & 0o777 == 0o700
+    
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(PermissionError):
+        DataFrameRegistry(str(shared))
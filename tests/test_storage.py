@@ -0,0 +1,62 @@
+import pytest
+
+from pyql.dataframe import DataFrame
+from pyql.storage import StoredColumn
+
+
+def test_roundtrip_keeps_values_and_dtypes(tmp_path, reviews):
+    df = reviews
+    df['mixed'] = [1, 'one', 1.0, True]
+    path = tmp_path / 'songs.pyql'
+    df.to_pyql(path)
+    loaded = DataFrame.read_pyql(path)
+    
+    assert loaded.columns == df.columns
+    assert loaded.to_dict() == df.to_dict()
+    assert [type(value) for value in loaded['mixed']] == [int, str, float, bool]
+    assert {col: loaded.data[col].dtype for col in loaded.columns} == {
+        'artist': 'object', 'year': 'int', 'score': 'float', 'mixed': 'object', 'label': 'category'}
+
+
+def test_columns_are_read_on_first_use(tmp_path, reviews):
+    path = tmp_path / 'songs.pyql'
+    reviews.to_pyql(path)
+    loaded = DataFrame.read_pyql(path, columns=['year', 'label'])
+    
+    assert loaded.columns == ['year', 'label']
+    assert len(loaded) == 4
+    assert isinstance(loaded.data['year'], StoredColumn)
+    assert loaded.data['year']._column is None
+    
+    assert loaded.filter('year', '>', 1993)['label'] == ['Columbia', 'Columbia']
+    assert loaded.data['year']._column is not None
+    
+    with pytest.raises(KeyError):
+        DataFrame.read_pyql(path, columns=['missing'])
+
+
+def test_buffers_are_read_in_place_from_the_map(tmp_path, reviews):
+    path = tmp_path / 'songs.pyql'
+    reviews.to_pyql(path)
+    loaded = DataFrame.read_pyql(path)
+    year = loaded.data['year'].materialize()
+    label = loaded.data['label'].materialize()
+    
+    for buffer in [year.values, year.validity, label.codes, loaded.data['score'].values]:
+        assert isinstance(buffer, memoryview) and buffer.readonly
+    with pytest.raises(TypeError):
+        year.values[0] = 2000
+    assert (year.null_count, label.null_count) == (1, 1)
+    assert loaded.filter('year', 'is_null', None)['artist'] == ['Wu-Tang, Clan']
+    assert loaded.merge(loaded, 'label', 'label', how='outer')['year_x'] == [1994, 1994, None, 1993, 1996, 1996]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'songs.csv'
+    path.write_text('artist,year\nNas,1994\n')
+    with pytest.raises(ValueError):
+        DataFrame.read_pyql(path)
+    
+    df = DataFrame({'pair': [(1, 2), (3, 4)]})
+    with pytest.raises(TypeError):
+        df.to_pyql(tmp_path / 'pairs.pyql')
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+
+from web.cache import ResultCache
+from web.registry import DataFrameRegistry
+
+
+SONGS = "title,artist,year,rating\n" + "".join(
+    f"Song {i},{['Nas', 'Biggie', 'Wu-Tang'][i % 3]},{1990 + i % 10},{'nan' if i == 4 else i / 2}\n"
+    for i in range(30)
+)
+
+
+@pytest.fixture
+def web(tmp_path, monkeypatch):
+    monkeypatch.setenv('PYQL_REGISTRY_DIR', str(tmp_path / 'registry'))
+    from web import app as web_app
+    
+    monkeypatch.setattr(web_app, 'loadedDataFrames', DataFrameRegistry(str(tmp_path / 'registry')))
+    monkeypatch.setattr(web_app, 'resultCache', ResultCache())
+    return web_app
+
+
+@pytest.fixture
+def client(web, tmp_path):
+    path = tmp_path / 'songs.csv'
+    path.write_text(SONGS)
+    client = web.app.test_client()
+    response = client.post('/api/load', json={'filepath': str(path), 'name': 'songs'})
+    assert response.status_code == 200
+    return client
+
+
+def filter_request(**extra):
+    return {'dataframe': 'songs', 'column': 'year', 'operator': '>=', 'value': 1995, **extra}
+
+
+def test_repeated_requests_are_served_from_the_cache(client, web):
+    first = client.post('/api/filter', json=filter_request())
+    second = client.post('/api/filter', json=filter_request())
+    
+    assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+    assert first.get_data() == second.get_data()
+    assert client.post('/api/filter', json=filter_request(limit=1)).headers['X-Cache'] == 'MISS'
+    stats = client.get('/api/cache/stats').get_json()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+
+def test_reloading_a_dataframe_invalidates_its_results(client, tmp_path):
+    assert client.post('/api/filter', json=filter_request()).get_json()['rows'] == 15
+    
+    (tmp_path / 'songs.csv').write_text(SONGS + "Song 30,Nas,1999,1.0\n")
+    client.post('/api/load', json={'filepath': str(tmp_path / 'songs.csv'), 'name': 'songs'})
+    
+    response = client.post('/api/filter', json=filter_request())
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['rows'] == 16
+
+
+def test_offset_and_limit_page_through_results(client):
+    page = client.post('/api/filter', json=filter_request(offset=2, limit=3)).get_json()
+    
+    assert (page['rows'], page['offset'], page['limit'], page['returned_rows']) == (15, 2, 3, 3)
+    assert page['data']['title'] == ['Song 7', 'Song 8', 'Song 9']
+    
+    for bad in [{'offset': -1}, {'limit': -5}, {'limit': 'ten'}]:
+        response = client.post('/api/filter', json=filter_request(**bad))
+        assert response.status_code == 400 and 'error' in response.get_json()
+
+
+def test_streamed_results_are_ndjson_with_headers(client):
+    response = client.post('/api/filter', json=filter_request(stream=True, offset=1, limit=4))
+    
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['X-Total-Rows'] == '15'
+    assert json.loads(response.headers['X-Columns']) == ['title', 'artist', 'year', 'rating']
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['title'] for row in rows] == ['Song 6', 'Song 7', 'Song 8', 'Song 9']
+    assert rows[0] == {'title': 'Song 6', 'artist': 'Nas', 'year': 1996, 'rating': 3.0}
+
+
+def test_responses_serialize_typed_columns(client):
+    loaded = client.get('/api/info/songs').get_json()
+    
+    assert loaded['rows'] == 30 and loaded['shape'] == [30, 4]
+    assert loaded['preview'] == {
+        'title': ['Song 0', 'Song 1', 'Song 2', 'Song 3', 'Song 4'],
+        'artist': ['Nas', 'Biggie', 'Wu-Tang', 'Nas', 'Biggie'],
+        'year': [1990, 1991, 1992, 1993, 1994],
+        'rating': [0.0, 0.5, 1.0, 1.5, None], # NaN is written as null
+    }
+    
+    result = client.post('/api/sql', json={
+        'query': "SELECT artist, COUNT(*) AS n FROM songs GROUP BY artist ORDER BY artist"
+    }).get_json()
+    assert result['columns'] == ['artist', 'n']
+    assert result['data'] == {'artist': ['Biggie', 'Nas', 'Wu-Tang'], 'n': [10, 10, 10]}
+
+
+def test_dataframes_listing_and_clear(client, web):
+    assert client.get('/api/dataframes').get_json() == {
+        'dataframes': {'songs': {'rows': 30, 'columns': ['title', 'artist', 'year', 'rating']}}
+    }
+    
+    assert client.post('/api/clear').get_json()['success']
+    assert client.get('/api/dataframes').get_json() == {'dataframes': {}}
+    assert client.post('/api/filter', json=filter_request()).status_code == 404
+
+
+def test_aggregate_requests_are_validated(client):
+    result = client.post('/api/aggregate', json={
+        'dataframe': 'songs', 'groupby': 'artist', 'column': 'year', 'function': 'count'}).get_json()
+    assert result['data'] == {'artist': ['Nas', 'Biggie', 'Wu-Tang'], 'year': [10, 10, 10]}
+    
+    for bad in [{'groupby': None}, {'groupby': []}, {'groupby': ['artist', 3]},
+                {'column': None}, {'function': None}, {'function': ['max', None]}]:
+        request = {'dataframe': 'songs', 'groupby': 'artist', 'column': 'year', 'function': 'max', **bad}
+        response = client.post('/api/aggregate', json=request)
+        assert response.status_code == 400 and 'error' in response.get_json()
+
+
+def test_text_filters_need_a_string_value(client):
+    response = client.post('/api/filter', json=filter_request(column='artist', operator='startswith', value='Bi'))
+    assert response.get_json()['rows'] == 10
+    
+    for operator in ['startswith', 'contains']:
+        for value in [None, 12]:
+            response = client.post('/api/filter', json=filter_request(column='artist', operator=operator, value=value))
+            assert response.status_code == 400 and 'error' in response.get_json()
+    response = client.post('/api/filter', json={'dataframe': 'songs', 'filters': [
+        {'column': 'artist', 'operator': 'contains'}]})
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from pyql import writers
+from pyql.columns import CategoricalColumn
+from pyql.dataframe import DataFrame
+
+
+def test_iter_batches_splits_rows(reviews):
+    df = reviews
+    batches = list(df.iter_batches(3))
+    
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[1].to_list() == [['say "hi"', 1996, 7.0, 'Columbia']]
+    assert list(df[['artist', 'year']].iter_rows(batch_rows=1)) == [
+        ('Nas', 1994), ('Wu-Tang, Clan', None), (None, 1993), ('say "hi"', 1996)]
+    with pytest.raises(ValueError):
+        list(df.iter_batches(0))
+
+
+def test_to_csv_quotes_fields_and_round_trips(tmp_path, reviews):
+    df = reviews[['artist', 'year']]
+    path = tmp_path / 'songs.csv'
+    df.to_csv(path, batch_rows=2)
+    
+    assert path.read_text().splitlines() == [
+        'artist,year', 'Nas,1994', '"Wu-Tang, Clan",', ',1993', '"say ""hi""",1996']
+    
+    df = DataFrame({'artist': ['Nas', 'Wu-Tang, Clan', 'say "hi"'], 'year': [1994, 1993, 1996]})
+    df.to_csv(path)
+    assert DataFrame.from_csv(str(path)).to_dict() == df.to_dict()
+
+
+def test_to_csv_returns_text_and_writes_file_objects(reviews):
+    df = reviews[['year']]
+    buffer = io.StringIO()
+    df.to_csv(buffer, delimiter=';', header=False)
+    
+    assert buffer.getvalue() == df.to_csv(delimiter=';', header=False) == '1994\n""\n1993\n1996\n'
+    assert DataFrame({'a': []}).to_csv() == 'a\n'
+
+
+def test_to_jsonl_writes_one_object_per_row(reviews):
+    reviews['score'] = [9.5, 8.25, float('nan'), 7.0]
+    lines = reviews.to_jsonl(batch_rows=3).splitlines()
+    
+    assert [json.loads(line) for line in lines] == [
+        {'artist': 'Nas', 'year': 1994, 'score': 9.5, 'label': 'Columbia'},
+        {'artist': 'Wu-Tang, Clan', 'year': None, 'score': 8.25, 'label': 'Bad Boy'},
+        {'artist': None, 'year': 1993, 'score': None, 'label': None},
+        {'artist': 'say "hi"', 'year': 1996, 'score': 7.0, 'label': 'Columbia'},
+    ]
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_columns_json_writes_each_column_type(monkeypatch, use_orjson, reviews):
+    if not use_orjson:
+        monkeypatch.setattr(writers, 'orjson', None)
+    elif writers.orjson is None:
+        pytest.skip('orjson is not installed')
+    df = reviews
+    df['score'] = [9.5, 8.25, float('nan'), 7.0]
+    df['label'] = CategoricalColumn.from_values(['a', None, 'b', 'a'])
+    df['mixed'] = [1, 'two', float('inf'), None]
+    
+    assert json.loads(writers.columns_json(df)) == {
+        'artist': ['Nas', 'Wu-Tang, Clan', None, 'say "hi"'],
+        'year': [1994, None, 1993, 1996],
+        'score': [9.5, 8.25, None, 7.0],
+        'label': ['a', None, 'b', 'a'],
+        'mixed': [1, 'two', None, None],
+    }
+    assert writers.columns_json(df, ['year']) == b'{"year":[1994,null,1993,1996]}'
+    assert writers.dumps({'mean': float('nan'), 'rows': [1, float('-inf')]}) == b'{"mean":null,"rows":[1,null]}'
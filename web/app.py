@@ -1,7 +1,8 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request
+from functools import wraps
 import sys
 import os
-import math
+import json
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -9,50 +10,138 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 app = Flask(__name__,
             static_folder=os.path.join(basedir, 'static'),
             template_folder=os.path.join(basedir, 'templates'))
-loadedDataFrames = {}
 
-from pyql import DataFrame, compare
+from pyql import DataFrame, compare, sql
+from pyql.writers import columns_json, dumps, iter_csv, iter_jsonl
+from web.cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, ResultCache, request_key
+from web.registry import DataFrameRegistry
 
+# loaded once into memory-mapped files shared by every worker process; the
+# directory belongs to this app instance and survives restarts (gunicorn
+# workers keep what was loaded before, POST /api/clear starts from nothing)
+loadedDataFrames = DataFrameRegistry(os.environ.get('PYQL_REGISTRY_DIR',
+                                                    os.path.join(app.instance_path, 'registry')))
 
+# repeated requests are answered from here until a DataFrame they read is reloaded
+resultCache = ResultCache(max_bytes=int(os.environ.get('PYQL_CACHE_BYTES', DEFAULT_MAX_BYTES)),
+                          ttl=float(os.environ.get('PYQL_CACHE_TTL', DEFAULT_TTL)))
 
+MAX_COLUMNS = 10 # columns shown by the load preview and filter results
 
-def limit_columns(data_dict, max_columns=10):
+def json_response(payload, status=200, **frames):
     """
-    Limit the number of columns returned
+    JSON response serialized in a single pass
     
-    Args:
-        data_dict: Dictionary of column data
-        max_columns: Maximum number of columns to return
+    Every DataFrame passed by keyword is written straight from its typed
+    columns under that key (see pyql.writers.columns_json), so rows are
+    never copied into dicts of lists first; NaN and infinities become null.
+    """
+    body = dumps(payload)
+    for key, df in frames.items():
+        separator = b',' if len(body) > 2 else b''
+        body = body[:-1] + separator + dumps(key) + b':' + columns_json(df) + b'}'
+    return Response(body, status=status, mimetype='application/json')
+
+def convert_value(value):
+    """Convert a request value to int or float when it looks numeric"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
+def convert_filter_value(operator, value):
+    """
+    Convert the value of a filter to the types the predicate expects
     
-    Returns:
-        Tuple of (limited_data, total_column_count)
+    'in' takes a list (or a comma separated string), 'between' a pair,
+    'is_null' ignores the value, 'startswith' and 'contains' need a
+    string (ValueError otherwise); everything else is a single value.
+    """
+    if operator in ('in', 'between'):
+        if isinstance(value, str):
+            value = value.split(',')
+        return [convert_value(v.strip() if isinstance(v, str) else v) for v in value or []]
+    if operator == 'is_null':
+        return None
+    if operator in ('startswith', 'contains'):
+        if not isinstance(value, str):
+            raise ValueError(f"'{operator}' needs a string value")
+        return value
+    return convert_value(value)
+
+def is_names(value):
+    """True for a non-empty string or a non-empty list of them (columns, functions)"""
+    if isinstance(value, str):
+        return bool(value)
+    return isinstance(value, list) and bool(value) and all(isinstance(v, str) and v for v in value)
+
+STREAM_BATCH_ROWS = 4096 # rows serialized per chunk of a streamed response
+
+def paginate(df, params):
     """
-    all_columns = list(data_dict.keys())
-    total_columns = len(all_columns)
+    Apply the request's offset and limit
     
-    if total_columns <= max_columns:
-        return data_dict, total_columns
+    Returns:
+        tuple: (page of rows as a view of df, dict describing the page)
+    """
+    offset = int(params.get('offset') or 0)
+    limit = params.get('limit')
+    limit = int(limit) if limit is not None else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError('offset and limit must not be negative')
     
-    # Take first max_columns
-    limited_data = {col: data_dict[col] for col in all_columns[:max_columns]}
+    page = df.slice(offset, offset + limit if limit is not None else None)
+    return page, {'offset': offset, 'limit': limit, 'returned_rows': len(page)}
+
+def stream_rows(df, total_rows):
+    """
+    NDJSON response writing one row object per line, a batch at a time
     
-    return limited_data, total_columns
+    The first batch is sent as soon as it is serialized; the total row
+    count and the column order travel in the X-Total-Rows and X-Columns
+    headers.
+    """
+    return Response(iter_jsonl(df, STREAM_BATCH_ROWS), mimetype='application/x-ndjson', headers={
+        'X-Total-Rows': str(total_rows),
+        'X-Columns': json.dumps(df.columns)
+    })
 
-def clean_data_for_json(data_dict):
-    """Replace inf, -inf, and nan with None for valid JSON"""
-    cleaned = {}
-    for column, values in data_dict.items():
-        cleaned[column] = []
-        for value in values:
-            # Check if value is a float and handle special cases
-            if isinstance(value, float):
-                if math.isinf(value) or math.isnan(value):
-                    cleaned[column].append(None)
-                else:
-                    cleaned[column].append(value)
-            else:
-                cleaned[column].append(value)
-    return cleaned
+def frames_used(params):
+    """Names of the loaded DataFrames a request reads"""
+    if 'query' in params:
+        return list(loadedDataFrames) # SQL may name any of them
+    if 'left' in params or 'right' in params:
+        return [params.get('left'), params.get('right')]
+    return [params.get('dataframe', 'df')]
+
+def cached(view):
+    """
+    Serve repeated requests from the result cache
+    
+    The key is the request path and JSON body plus the version of every
+    DataFrame the request reads; only successful responses are stored.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        params = request.get_json(silent=True) or {}
+        names = frames_used(params)
+        if any(name not in loadedDataFrames for name in names):
+            return view(*args, **kwargs) # the view reports the missing DataFrame
+        
+        key = request_key(request.path, params, {name: loadedDataFrames.version(name) for name in names})
+        body = resultCache.get(key)
+        if body is not None:
+            return Response(body, mimetype='application/json', headers={'X-Cache': 'HIT'})
+        
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            resultCache.put(key, response.get_data(), names)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    return wrapper
 
 @app.route('/')
 def index(): # landing
@@ -66,35 +155,33 @@ def load_data():
         name = data.get('name', 'df')
         
         if not filepath:
-            return jsonify({'error': 'No filepath provided'}), 400
+            return json_response({'error': 'No filepath provided'}), 400
         
         if not os.path.isabs(filepath):
             project_root = os.path.abspath(os.path.join(basedir, '..'))
             filepath = os.path.join(project_root, filepath)
         
-        df = DataFrame.from_csv(filepath)
-        loadedDataFrames[name] = df
+        df = loadedDataFrames.load(name, filepath, DataFrame.from_csv)
+        resultCache.invalidate(name)
         
-        # Get preview and limit columns
-        preview_full = df.head(10).to_dict()
-        preview_cleaned = clean_data_for_json(preview_full)
-        preview_limited, total_cols = limit_columns(preview_cleaned, max_columns=10)
+        # Preview the first rows of the first columns
+        shown = df.columns[:MAX_COLUMNS]
         
-        return jsonify({
+        return json_response({
             'success': True,
             'name': name,
             'rows': len(df),
-            'columns': df.columns[:10],  # Return only first 10 column names
+            'columns': shown,
             'total_columns': len(df.columns),  # Total column count
-            'preview': preview_limited
-        })
+        }, preview=df.head(10)[shown])
     
     except FileNotFoundError:
-        return jsonify({'error': f'File not found: {filepath}'}), 404
+        return json_response({'error': f'File not found: {filepath}'}), 404
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @app.route('/api/filter', methods=['POST'])
+@cached
 def filter_data():
     try:
         data = request.get_json()
@@ -105,7 +192,7 @@ def filter_data():
         logic_op = data.get('logic', 'and')
         
         if df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
         
         df = loadedDataFrames[df_name]
         
@@ -116,16 +203,7 @@ def filter_data():
             for f in filters:
                 column = f.get('column')
                 operator = f.get('operator')
-                value = f.get('value')
-                
-                # Convert value to appropriate type
-                try:
-                    value = int(value)
-                except ValueError:
-                    try:
-                        value = float(value)
-                    except ValueError:
-                        pass
+                value = convert_filter_value(operator, f.get('value'))
                 
                 mask = compare(df, column, operator, value)
                 masks.append(mask)
@@ -143,38 +221,34 @@ def filter_data():
             # Single filter fallback
             column = data.get('column')
             operator = data.get('operator')
-            value = data.get('value')
-            
-            try:
-                value = int(value)
-            except ValueError:
-                try:
-                    value = float(value)
-                except ValueError:
-                    pass
+            value = convert_filter_value(operator, data.get('value'))
             
             mask = compare(df, column, operator, value)
             result_df = df[mask]
         
-        # Clean and limit columns
-        result_dict = result_df.to_dict()
-        result_cleaned = clean_data_for_json(result_dict)
-        result_limited, total_cols = limit_columns(result_cleaned, max_columns=10)
+        page, pagination = paginate(result_df, data)
+        if data.get('stream'):
+            return stream_rows(page, len(result_df))
+        
+        shown = page.columns[:MAX_COLUMNS]
         
-        return jsonify({
+        return json_response({
             'success': True,
             'rows': len(result_df),
-            'total_columns': total_cols,
-            'displayed_columns': len(result_limited),
-            'data': result_limited
-        })
+            **pagination,
+            'total_columns': len(page.columns),
+            'displayed_columns': len(shown)
+        }, data=page[shown])
     
     except KeyError as e:
-        return jsonify({'error': f'Column not found: {str(e)}'}), 400
+        return json_response({'error': f'Column not found: {str(e)}'}), 400
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @app.route('/api/aggregate-simple', methods=['POST'])
+@cached
 def aggregate_simple():
     """Simple aggregation without grouping"""
     try:
@@ -184,12 +258,12 @@ def aggregate_simple():
         func = data.get('function')
         
         if df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
         
         df = loadedDataFrames[df_name]
         
         if column not in df.columns:
-            return jsonify({'error': f'Column "{column}" not found'}), 400
+            return json_response({'error': f'Column "{column}" not found'}), 400
         
         # Perform aggregation
         if func == 'sum':
@@ -203,18 +277,19 @@ def aggregate_simple():
         elif func == 'count':
             result = df.count(column)
         else:
-            return jsonify({'error': f'Unknown function: {func}'}), 400
+            return json_response({'error': f'Unknown function: {func}'}), 400
         
-        return jsonify({
+        return json_response({
             'success': True,
             'result': result,
             'row_count': len(df)
         })
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @app.route('/api/aggregate', methods=['POST'])
+@cached
 def aggregate_data():
     try:
         data = request.get_json()
@@ -223,25 +298,39 @@ def aggregate_data():
         agg_column = data.get('column')
         agg_func = data.get('function')
         
+        if not is_names(group_by):
+            return json_response({'error': 'groupby must be a column name or a list of them'}), 400
+        if not isinstance(agg_column, str) or not agg_column:
+            return json_response({'error': 'No column provided'}), 400
+        if not is_names(agg_func):
+            return json_response({'error': 'function must be a function name or a list of them'}), 400
+        
         if df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
         
         df = loadedDataFrames[df_name]
         grouped = df.groupby(group_by)
         result_df = grouped.agg({agg_column: agg_func})
         
-        return jsonify({
+        page, pagination = paginate(result_df, data)
+        if data.get('stream'):
+            return stream_rows(page, len(result_df))
+        
+        return json_response({
             'success': True,
             'rows': len(result_df),
-            'data': result_df.to_dict()
-        })
+            **pagination
+        }, data=page)
     
     except KeyError as e:
-        return jsonify({'error': f'Column not found: {str(e)}'}), 400
+        return json_response({'error': f'Column not found: {str(e)}'}), 400
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @app.route('/api/join', methods=['POST'])
+@cached
 def join_data():
     try:
         data = request.get_json()
@@ -250,29 +339,38 @@ def join_data():
         left_on = data.get('left_on')
         right_on = data.get('right_on')
         how = data.get('how', 'inner')
+        strategy = data.get('strategy', 'hash')
         
         if left_df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{left_df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{left_df_name}" not loaded'}), 404
         if right_df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{right_df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{right_df_name}" not loaded'}), 404
         
         left_df = loadedDataFrames[left_df_name]
         right_df = loadedDataFrames[right_df_name]
-        result_df = left_df.merge(right_df, left_on=left_on, right_on=right_on, how=how)
+        result_df = left_df.merge(right_df, left_on=left_on, right_on=right_on, how=how,
+                                 strategy=strategy)
+        
+        page, pagination = paginate(result_df, data)
+        if data.get('stream'):
+            return stream_rows(page, len(result_df))
         
-        return jsonify({
+        return json_response({
             'success': True,
             'rows': len(result_df),
-            'columns': result_df.columns,
-            'data': result_df.to_dict()
-        })
+            **pagination,
+            'columns': result_df.columns
+        }, data=page)
     
     except KeyError as e:
-        return jsonify({'error': f'Column not found: {str(e)}'}), 400
+        return json_response({'error': f'Column not found: {str(e)}'}), 400
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
 
 @app.route('/api/select', methods=['POST'])
+@cached
 def select_columns():
     try:
         data = request.get_json()
@@ -280,54 +378,109 @@ def select_columns():
         columns = data.get('columns')
         
         if df_name not in loadedDataFrames:
-            return jsonify({'error': f'DataFrame "{df_name}" not loaded'}), 404
+            return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
         
         df = loadedDataFrames[df_name]
         result_df = df[columns]
         
-        return jsonify({
+        page, pagination = paginate(result_df, data)
+        if data.get('stream'):
+            return stream_rows(page, len(result_df))
+        
+        return json_response({
             'success': True,
             'rows': len(result_df),
-            'data': result_df.to_dict()
-        })
+            **pagination
+        }, data=page)
     
     except KeyError as e:
-        return jsonify({'error': f'Column not found: {str(e)}'}), 400
+        return json_response({'error': f'Column not found: {str(e)}'}), 400
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}), 500
+
+@app.route('/api/sql', methods=['POST'])
+@cached
+def run_sql():
+    """Run a whole SELECT query against the loaded DataFrames in one call"""
+    try:
+        data = request.get_json()
+        query = data.get('query')
+        
+        if not query:
+            return json_response({'error': 'No query provided'}), 400
+        
+        result_df = sql(query, tables=loadedDataFrames)
+        
+        page, pagination = paginate(result_df, data)
+        if data.get('stream'):
+            return stream_rows(page, len(result_df))
+        
+        return json_response({
+            'success': True,
+            'rows': len(result_df),
+            **pagination,
+            'columns': result_df.columns
+        }, data=page)
+    
+    except KeyError as e:
+        return json_response({'error': f'Not found: {str(e)}'}), 400
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    except Exception as e:
+        return json_response({'error': str(e)}), 500
+
+@app.route('/api/export/<df_name>', methods=['GET'])
+def export_dataframe(df_name):
+    """Stream a loaded DataFrame as CSV (?format=csv, default) or JSON lines (?format=jsonl)"""
+    if df_name not in loadedDataFrames:
+        return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
+    
+    df = loadedDataFrames[df_name]
+    export_format = request.args.get('format', 'csv')
+    if export_format == 'csv':
+        chunks, mimetype = iter_csv(df), 'text/csv'
+    elif export_format == 'jsonl':
+        chunks, mimetype = iter_jsonl(df), 'application/x-ndjson'
+    else:
+        return json_response({'error': f'Unknown export format: {export_format}'}), 400
+    
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={df_name}.{export_format}'
+    })
 
 @app.route('/api/dataframes', methods=['GET'])
 def list_dataframes():
-    return jsonify({
-        'dataframes': {
-            name: {
-                'rows': len(df),
-                'columns': df.columns
-            }
-            for name, df in loadedDataFrames.items()
-        }
+    return json_response({
+        'dataframes': loadedDataFrames.describe()
     })
 
 @app.route('/api/clear', methods=['POST'])
 def clear_dataframes():
-    global loadedDataFrames
-    loadedDataFrames = {}
-    return jsonify({'success': True, 'message': 'All DataFrames cleared'})
+    loadedDataFrames.clear()
+    resultCache.invalidate()
+    return json_response({'success': True, 'message': 'All DataFrames cleared'})
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters and memory use of the result cache"""
+    return json_response(resultCache.stats())
 
 @app.route('/api/info/<df_name>', methods=['GET'])
 def dataframe_info(df_name):
     if df_name not in loadedDataFrames:
-        return jsonify({'error': f'DataFrame "{df_name}" not loaded'}), 404
+        return json_response({'error': f'DataFrame "{df_name}" not loaded'}), 404
     
     df = loadedDataFrames[df_name]
-    return jsonify({
+    return json_response({
         'name': df_name,
         'rows': len(df),
         'columns': df.columns,
-        'shape': df.shape(),
-        'preview': df.head(5).to_dict()
-    })
+        'shape': df.shape()
+    }, preview=df.head(5))
 
 if __name__ == '__main__':
+    loadedDataFrames.clear() # the development server is the only process using the registry
     print(f"Server running at: http://localhost:3000")
     app.run(debug=True, port=3000, host='0.0.0.0')
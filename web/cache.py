@@ -0,0 +1,128 @@
+"""
+Result Cache
+LRU cache of serialized API responses, bounded by bytes and entry age
+"""
+
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 300 # seconds
+
+
+class ResultCache:
+    """
+    Least recently used cache of response bodies
+    
+    Entries are evicted oldest-use first once the stored bytes exceed
+    max_bytes, and are treated as missing once older than ttl seconds.
+    Every entry records the DataFrame names it was computed from so that
+    loading or dropping a DataFrame invalidates exactly its results.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        """
+        Initialize cache
+        
+        Args:
+            max_bytes: total size of the stored bodies to stay under
+            ttl: seconds an entry stays valid (None = until evicted)
+            clock: function returning the current time in seconds
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict() # key -> (body, names, expiry)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._lock = Lock()
+    
+    def get(self, key):
+        """Return the cached body for key, or None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, body, names=()):
+        """
+        Store a response body
+        
+        Args:
+            key: cache key (see request_key)
+            body: bytes of the response
+            names: DataFrame names the response was computed from
+        """
+        if len(body) > self.max_bytes:
+            return # would evict everything else and still not fit
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            expiry = self.clock() + self.ttl if self.ttl is not None else None
+            self.entries[key] = (body, frozenset(names), expiry)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+    
+    def invalidate(self, name=None):
+        """Drop the entries computed from DataFrame name (all entries when None)"""
+        with self._lock:
+            if name is None:
+                stale = list(self.entries)
+            else:
+                stale = [key for key, (_, names, _) in self.entries.items() if name in names]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+    
+    def stats(self):
+        """Counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            }
+    
+    def _remove(self, key):
+        body, _, _ = self.entries.pop(key)
+        self.size -= len(body)
+
+
+def request_key(endpoint, params, versions):
+    """
+    Canonical cache key of a request
+    
+    Args:
+        endpoint: request path
+        params: request JSON (any key order)
+        versions: dict mapping the DataFrame names used to their version
+    
+    Returns:
+        str
+    """
+    return json.dumps([endpoint, params, sorted(versions.items())], sort_keys=True,
+                      separators=(',', ':'), default=str)
@@ -0,0 +1,235 @@
+"""
+DataFrame Registry
+Loaded DataFrames shared by every worker process of the web app
+
+Each loaded DataFrame is written once to a .pyql file in the registry
+directory and listed in a JSON manifest next to it, so every worker sees
+the same listing. Workers open the files with mmap and read numeric
+buffers, null masks and category codes in place (see pyql.storage):
+those live once in the OS page cache however many workers read them.
+Text columns that are not categorical are decoded into Python objects
+by each worker that uses them.
+
+Loads are serialized with an exclusive lock on the directory (fcntl, or
+msvcrt on Windows): a DataFrame loaded by one worker is reused by the
+others, and loading the same unchanged file again is a no-op. The
+manifest is replaced atomically, so readers never need the lock.
+
+The directory outlives the server: after a restart the DataFrames loaded
+before are still listed (and are reloaded only if their source file
+changed). Point it at a fresh directory, or call clear(), to start empty.
+Since its files are mapped and served as they are, the directory must be
+private: it is created with mode 0o700, and a directory another user
+owns or could write to is refused.
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+from pyql import DataFrame
+
+MANIFEST = 'manifest.json'
+LOCK = 'manifest.lock'
+
+
+class DataFrameRegistry(Mapping):
+    """
+    Read-only mapping of DataFrame names to DataFrames, backed by a directory
+    
+    Use load() to add or replace a DataFrame and clear() to drop them all.
+    Every DataFrame gets a new version number when it is loaded; versions
+    are never reused, even after a clear.
+    """
+    
+    def __init__(self, directory):
+        """
+        Initialize registry
+        
+        Args:
+            directory: private directory holding the manifest and the .pyql
+                       files (created if missing; share it between the
+                       workers); PermissionError if it is not private
+        """
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+        self._manifest = {'next_version': 1, 'frames': {}}
+        self._stamp = None
+        self._opened = {} # name -> (version, DataFrame) opened by this process
+    
+    def __getitem__(self, name):
+        for _ in range(2):
+            entry = self._entries().get(name)
+            if entry is None:
+                raise KeyError(name)
+            opened = self._opened.get(name)
+            if opened is not None and opened[0] == entry['version']:
+                return opened[1]
+            try:
+                df = DataFrame.read_pyql(os.path.join(self.directory, entry['file']))
+            except FileNotFoundError: # replaced by another worker since the manifest was read
+                self._stamp = None
+                continue
+            self._opened[name] = (entry['version'], df)
+            return df
+        raise KeyError(name)
+    
+    def __iter__(self):
+        return iter(self._entries())
+    
+    def __len__(self):
+        return len(self._entries())
+    
+    def __contains__(self, name):
+        return name in self._entries()
+    
+    def version(self, name):
+        """Version number of a loaded DataFrame (None when not loaded)"""
+        entry = self._entries().get(name)
+        return entry['version'] if entry is not None else None
+    
+    def describe(self):
+        """Dict mapping every name to its row count and columns, without opening the files"""
+        return {name: {'rows': entry['rows'], 'columns': entry['columns']}
+                for name, entry in self._entries().items()}
+    
+    def load(self, name, filepath, loader=DataFrame.from_csv):
+        """
+        Load a file under name, once for all workers
+        
+        If name already holds the same file, unchanged since it was loaded
+        (same size and modification time), nothing is read again.
+        
+        Args:
+            name: DataFrame name
+            filepath: file to load
+            loader: function reading filepath into a DataFrame
+        
+        Returns:
+            the shared (memory-mapped) DataFrame
+        """
+        stat = os.stat(filepath)
+        source = [os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns]
+        
+        with self._locked():
+            manifest = self._read_manifest()
+            previous = manifest['frames'].get(name)
+            if previous is None or previous['source'] != source:
+                df = loader(filepath)
+                version = manifest['next_version']
+                filename = f"{version}.pyql"
+                path = os.path.join(self.directory, filename)
+                df.to_pyql(path + '.tmp')
+                os.replace(path + '.tmp', path)
+                
+                manifest['next_version'] = version + 1
+                manifest['frames'][name] = {
+                    'file': filename,
+                    'version': version,
+                    'rows': len(df),
+                    'columns': list(df.columns),
+                    'source': source,
+                }
+                self._write_manifest(manifest)
+                if previous is not None:
+                    # workers that already mapped the old file keep reading it
+                    self._remove_file(previous)
+        return self[name]
+    
+    def clear(self):
+        """Drop every DataFrame, for all workers"""
+        with self._locked():
+            manifest = self._read_manifest()
+            frames, manifest['frames'] = manifest['frames'], {}
+            self._write_manifest(manifest)
+            for entry in frames.values():
+                self._remove_file(entry)
+        self._opened.clear()
+    
+    def _entries(self):
+        """Current manifest entries, re-read only when the manifest file changed"""
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST))
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._stamp or stamp is None:
+            self._manifest = self._read_manifest()
+            self._stamp = stamp
+            frames = self._manifest['frames']
+            self._opened = {name: opened for name, opened in self._opened.items()
+                            if name in frames and frames[name]['version'] == opened[0]}
+        return self._manifest['frames']
+    
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST), encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {'next_version': 1, 'frames': {}}
+    
+    def _write_manifest(self, manifest):
+        """Replace the manifest atomically (caller holds the lock)"""
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        os.replace(path + '.tmp', path)
+    
+    def _remove_file(self, entry):
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except FileNotFoundError:
+            pass
+        except PermissionError: # Windows cannot delete a file a worker still maps
+            pass
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the registry's exclusive lock"""
+        with open(os.path.join(self.directory, LOCK), 'a') as lock:
+            _lock_file(lock)
+            try:
+                yield
+            finally:
+                _unlock_file(lock)
+
+
+def _lock_file(file):
+    """Block until this process holds the exclusive lock on an open file"""
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError: # LK_LOCK gives up after 10 seconds; a load can take longer
+            continue
+
+
+def _unlock_file(file):
+    """Release the lock taken by _lock_file"""
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _check_private(directory):
+    """Refuse a directory another user owns or could write files into"""
+    if not hasattr(os, 'getuid'): # no POSIX owners and modes (Windows)
+        return
+    stat = os.stat(directory)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        raise PermissionError(f"Registry directory {directory} must belong to the current user "
+                              f"and not be writable by group or others")
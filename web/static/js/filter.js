@@ -2,6 +2,21 @@
 // FILTER ACTION - Data Filtering
 // ========================================
 
+// file_name[Column] <operator> <value>: symbol operators may touch their
+// value, word operators need whitespace around them, only is_null takes no value
+const FILTER_REGEX = /^\w*\[([^\]]+)\](?:\s*([><=!]+)\s*(\S.*)|\s+(in|between|startswith|contains)\s+(\S.*)|\s+(is_null))\s*$/;
+
+// Split one filter into [column, operator, value], or null when malformed
+function matchFilter(text) {
+    const match = text.trim().match(FILTER_REGEX);
+    if (!match) return null;
+    
+    const [, column, symbolOp, symbolValue, wordOp, wordValue, nullOp] = match;
+    if (nullOp) return [column, nullOp, ''];
+    if (wordOp) return [column, wordOp, wordValue.trim()];
+    return [column, symbolOp, symbolValue.trim()];
+}
+
 // Override validation from main.js
 validateFilterInput = function(input) {
     if (!loadedDataFrame) {
@@ -21,8 +36,7 @@ validateFilterInput = function(input) {
     }
     
     // Single filter validation
-    const filterRegex = /^\w*\[([^\]]+)\]\s*([><=!]+)\s*(.+)$/;
-    const match = input.match(filterRegex);
+    const match = matchFilter(input);
     
     if (!match) {
         return { 
@@ -31,7 +45,7 @@ validateFilterInput = function(input) {
         };
     }
     
-    const [, column, operator, value] = match;
+    const [column, operator] = match;
     
     if (!loadedDataFrame.columns.includes(column)) {
         return { 
@@ -40,7 +54,7 @@ validateFilterInput = function(input) {
         };
     }
     
-    const validOperators = ['>', '>=', '<', '<=', '==', '!='];
+    const validOperators = ['>', '>=', '<', '<=', '==', '!=', 'in', 'between', 'startswith', 'contains', 'is_null'];
     if (!validOperators.includes(operator)) {
         return { 
             valid: false, 
@@ -74,13 +88,12 @@ function parseCompoundFilter(input) {
     
     // Parse each filter part
     const filters = [];
-    const filterRegex = /^\w*\[([^\]]+)\]\s*([><=!]+)\s*(.+)$/;
     
     for (const part of parts) {
-        const match = part.trim().match(filterRegex);
+        const match = matchFilter(part);
         if (!match) return null;
         
-        const [, column, operator, value] = match;
+        const [column, operator, value] = match;
         
         // Validate column exists
         if (!loadedDataFrame.columns.includes(column)) {
@@ -90,7 +103,7 @@ function parseCompoundFilter(input) {
         filters.push({
             column: column,
             operator: operator,
-            value: value.trim()
+            value: value
         });
     }
     
@@ -126,22 +139,21 @@ executeFilter = async function(input) {
         };
     } else {
         // Parse single filter
-        const filterRegex = /\[([^\]]+)\]\s*([><=!]+)\s*(.+)$/;
-        const match = input.match(filterRegex);
+        const match = matchFilter(input);
         
         if (!match) {
             showError('Invalid filter syntax');
             return;
         }
         
-        const [, column, operator, value] = match;
+        const [column, operator, value] = match;
         
         requestBody = {
             dataframe: dfName,
             filters: [{
                 column: column,
                 operator: operator,
-                value: value.trim()
+                value: value
             }],
             logic: 'and'
         };